@@ -1,13 +1,13 @@
 import itertools
 import math
-import shutil
-from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
 
+from backup_store import backup_file
+
 
 MISSING_TOKENS = {"", "---", "--", "#VALUE!", "nan", "None"}
 
@@ -154,9 +154,15 @@ def select_green_row(group_df: pd.DataFrame):
     return best["idx"], best["pct"]
 
 
-def process_sheet(df: pd.DataFrame):
+def process_sheet(df: pd.DataFrame, size_keys=None):
+    """
+    Duplicate flags and green selection per Size Key. With size_keys, only
+    those groups are re-selected and the existing Size Key column is kept
+    (append-only ingest: rows of other keys keep their markings).
+    """
     out = df.copy()
-    out["Size Key"] = build_size_key(out)
+    if size_keys is None:
+        out["Size Key"] = build_size_key(out)
     out["Duplicate Count"] = out.groupby("Size Key")["Size Key"].transform("count")
     out["Duplicate?"] = out["Duplicate Count"].apply(
         lambda n: "Duplicate" if int(n) > 1 else "Unique"
@@ -167,10 +173,16 @@ def process_sheet(df: pd.DataFrame):
     if "Recommended % Marked" not in out.columns:
         out["Recommended % Marked"] = ""
 
-    out["Likely Insulation % Increase"] = ""
-    out["Recommended % Marked"] = ""
+    if size_keys is None:
+        out["Likely Insulation % Increase"] = ""
+        out["Recommended % Marked"] = ""
+        groups = out.groupby("Size Key", sort=False)
+    else:
+        touched = out["Size Key"].isin(size_keys)
+        out.loc[touched, ["Likely Insulation % Increase", "Recommended % Marked"]] = ""
+        groups = out[touched].groupby("Size Key", sort=False)
 
-    for _, grp in out.groupby("Size Key", sort=False):
+    for _, grp in groups:
         selected_idx, likely_pct = select_green_row(grp)
         if selected_idx is None:
             continue
@@ -292,10 +304,7 @@ def compute_top5_factor_labels(sheets):
             }
         )
 
-    summary_df = pd.DataFrame(summary_rows).sort_values(
-        ["support_score", "row_count"], ascending=[False, False]
-    )
-    top5 = summary_df.head(5)["factor_value"].tolist()
+    summary_df, top5 = rank_factor_bins(summary_rows)
     rank_map = {f: i + 1 for i, f in enumerate(top5)}
 
     # map row -> label
@@ -310,12 +319,23 @@ def compute_top5_factor_labels(sheets):
         else:
             row_labels[key] = ""
 
+    return {"labels": row_labels, "reliability": row_reliability, "top5": top5}, summary_df
+
+
+def rank_factor_bins(summary_rows):
+    """Factor_Top5_Summary frame (rank 1-5 by support, then row count) and the top-5 bins."""
+    summary_df = pd.DataFrame(summary_rows).sort_values(
+        ["support_score", "row_count"], ascending=[False, False]
+    )
+    top5 = summary_df.head(5)["factor_value"].tolist()
+    rank_map = {f: i + 1 for i, f in enumerate(top5)}
+
     # summary with rank
     summary_df["rank"] = summary_df["factor_value"].map(rank_map).fillna("")
     summary_df = summary_df.sort_values(
         by=["rank", "support_score"], ascending=[True, False], na_position="last"
     )
-    return {"labels": row_labels, "reliability": row_reliability, "top5": top5}, summary_df
+    return summary_df, top5
 
 
 def apply_row_labels(sheets, label_data):
@@ -326,6 +346,8 @@ def apply_row_labels(sheets, label_data):
             df["Top 5 Likely Factor"] = ""
         if "Factor Reliability Score" not in df.columns:
             df["Factor Reliability Score"] = ""
+        # mixed ""/float column: keep object dtype (string dtype rejects floats)
+        df["Factor Reliability Score"] = df["Factor Reliability Score"].astype(object)
         for idx in df.index:
             key = (sheet_name, idx)
             df.at[idx, "Top 5 Likely Factor"] = labels.get(key, "")
@@ -392,9 +414,7 @@ def main():
     if not path.exists():
         raise FileNotFoundError(f"Workbook not found: {path}")
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = path.with_suffix(f".xlsx.bak_{ts}")
-    shutil.copy2(path, backup_path)
+    backup = backup_file(path)
 
     xls = pd.ExcelFile(path)
     source_sheets = [s for s in xls.sheet_names if s != "Factor_Top5_Summary"]
@@ -422,7 +442,7 @@ def main():
     apply_formatting(out_path)
 
     print("Workbook updated:", out_path)
-    print("Backup created:", backup_path)
+    print(f"Backup: {backup['sha256'][:12]} ({'unchanged, not stored again' if backup['skipped'] else 'stored'})")
     for s in source_sheets:
         df = sheets[s]
         dup = (df["Duplicate?"] == "Duplicate").sum()
@@ -0,0 +1,208 @@
+"""
+Content-addressed backup store for workbooks and CSVs.
+
+Each backup is stored once by SHA-256 of its content, gzip-compressed, under
+backups/objects/<aa>/<sha256>.gz. backups/manifest.json records every version
+(artifact name, hash, sizes, time). Backing up a file whose content equals the
+artifact's latest version is skipped; identical content across artifacts
+shares one object. Retention keeps the last KEEP_LAST versions per artifact
+plus everything newer than KEEP_DAYS; unreferenced objects are deleted.
+
+Usage:
+  python backup_store.py list [artifact]
+  python backup_store.py backup <path>
+  python backup_store.py restore <artifact> [@index|sha-prefix] [dest]   (@-1 = latest, @0 = oldest)
+  python backup_store.py prune [keep_last] [keep_days]
+  python backup_store.py import-legacy [--delete]   (existing *.bak_YYYYmmdd_HHMMSS files)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE = Path(r"c:\Projects\Palej Calculation App")
+STORE_DIR = BASE / "backups"
+KEEP_LAST = 10
+KEEP_DAYS = 30
+CHUNK = 1 << 20
+LEGACY_RE = re.compile(r"^(?P<name>.+)\.bak_(?P<ts>\d{8}_\d{6})$")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def object_path(sha: str, store: Path = STORE_DIR) -> Path:
+    return store / "objects" / sha[:2] / f"{sha}.gz"
+
+
+def load_manifest(store: Path = STORE_DIR) -> list[dict]:
+    path = store / "manifest.json"
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(entries: list[dict], store: Path = STORE_DIR):
+    store.mkdir(parents=True, exist_ok=True)
+    tmp = store / "manifest.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=1)
+    os.replace(tmp, store / "manifest.json")
+
+
+def versions(entries: list[dict], artifact: str) -> list[dict]:
+    return sorted((e for e in entries if e["artifact"] == artifact), key=lambda e: e["created"])
+
+
+def _store_object(path: Path, sha: str, store: Path) -> int:
+    obj = object_path(sha, store)
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_suffix(".tmp")
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, CHUNK)
+        os.replace(tmp, obj)
+    return obj.stat().st_size
+
+
+def backup_file(path, store: Path = STORE_DIR, created: datetime | None = None, artifact: str | None = None) -> dict:
+    """
+    Record the current content of path. Returns the manifest entry, with
+    skipped=True when it equals the artifact's latest stored version.
+    """
+    path = Path(path)
+    artifact = artifact or path.name
+    sha = file_sha256(path)
+    entries = load_manifest(store)
+    history = versions(entries, artifact)
+    if history and history[-1]["sha256"] == sha:
+        return {**history[-1], "skipped": True}
+
+    entry = {
+        "artifact": artifact,
+        "sha256": sha,
+        "size": path.stat().st_size,
+        "stored_size": _store_object(path, sha, store),
+        "created": (created or datetime.now()).isoformat(timespec="seconds"),
+    }
+    entries.append(entry)
+    save_manifest(prune(entries, store=store), store)
+    return {**entry, "skipped": False}
+
+
+def prune(entries: list[dict], keep_last: int = KEEP_LAST, keep_days: int = KEEP_DAYS, store: Path = STORE_DIR) -> list[dict]:
+    """Apply retention to manifest entries and delete objects no longer referenced."""
+    cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec="seconds")
+    kept = []
+    for artifact in sorted({e["artifact"] for e in entries}):
+        history = versions(entries, artifact)
+        recent = history[-keep_last:] if keep_last > 0 else []
+        kept.extend(e for e in history if e in recent or e["created"] >= cutoff)
+
+    live = {e["sha256"] for e in kept}
+    for e in entries:
+        obj = object_path(e["sha256"], store)
+        if e["sha256"] not in live and obj.exists():
+            obj.unlink()
+    return kept
+
+
+def find_version(entries: list[dict], artifact: str, ref: str | None = None) -> dict:
+    """
+    ref: None = latest, '@<int>' = index into history (negative from end), else
+    sha prefix. Content that came back (A -> B -> A) has several entries with
+    one sha; the latest of them is returned.
+    """
+    history = versions(entries, artifact)
+    if not history:
+        raise KeyError(f"No backups for {artifact}")
+    if ref is None:
+        return history[-1]
+    if re.fullmatch(r"@-?\d+", ref):
+        return history[int(ref[1:])]
+    matches = [e for e in history if e["sha256"].startswith(ref.lower())]
+    shas = {e["sha256"] for e in matches}
+    if len(shas) != 1:
+        raise KeyError(f"{len(shas)} versions of {artifact} match {ref}")
+    return matches[-1]
+
+
+def restore(artifact: str, ref: str | None = None, dest=None, store: Path = STORE_DIR) -> Path:
+    """Write a stored version to dest (default BASE/artifact); a current file of that artifact is backed up first."""
+    entry = find_version(load_manifest(store), artifact, ref)
+    dest = Path(dest) if dest else BASE / artifact
+    if dest.exists() and dest.name == artifact:
+        backup_file(dest, store, artifact=artifact)
+    tmp = dest.with_name(dest.name + ".restore_tmp")
+    with gzip.open(object_path(entry["sha256"], store), "rb") as src, open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst, CHUNK)
+    os.replace(tmp, dest)
+    return dest
+
+
+def import_legacy(folder: Path = BASE, store: Path = STORE_DIR, delete: bool = False) -> list[dict]:
+    """Move existing <name>.bak_<timestamp> copies into the store (oldest first)."""
+    found = []
+    for path in folder.iterdir():
+        m = LEGACY_RE.match(path.name)
+        if m and path.is_file():
+            found.append((datetime.strptime(m.group("ts"), "%Y%m%d_%H%M%S"), m.group("name"), path))
+    results = []
+    for created, name, path in sorted(found):
+        entry = backup_file(path, store, created=created, artifact=name)
+        results.append({**entry, "legacy": path.name})
+        if delete:
+            path.unlink()
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    cmd, args = sys.argv[1], [a for a in sys.argv[2:] if not a.startswith("--")]
+
+    if cmd == "list":
+        entries = load_manifest()
+        shown = versions(entries, args[0]) if args else sorted(entries, key=lambda e: (e["artifact"], e["created"]))
+        for e in shown:
+            print(f"{e['created']}  {e['sha256'][:12]}  {e['size']:>10}  {e['stored_size']:>10}  {e['artifact']}")
+        objects = {e["sha256"]: e["stored_size"] for e in entries}
+        print(f"{len(entries)} versions, {len(objects)} objects, {sum(objects.values()) / 1e6:.2f} MB stored")
+    elif cmd == "backup":
+        e = backup_file(Path(args[0]))
+        print(f"{'Unchanged' if e['skipped'] else 'Stored'}: {e['artifact']} {e['sha256'][:12]}")
+    elif cmd == "restore":
+        dest = restore(args[0], args[1] if len(args) > 1 else None, args[2] if len(args) > 2 else None)
+        print(f"Restored: {dest}")
+    elif cmd == "prune":
+        keep_last = int(args[0]) if args else KEEP_LAST
+        keep_days = int(args[1]) if len(args) > 1 else KEEP_DAYS
+        entries = load_manifest()
+        kept = prune(entries, keep_last, keep_days)
+        save_manifest(kept)
+        print(f"Pruned {len(entries) - len(kept)} versions, {len(kept)} kept")
+    elif cmd == "import-legacy":
+        results = import_legacy(delete="--delete" in sys.argv)
+        for r in results:
+            print(f"{'dup ' if r['skipped'] else 'new '} {r['legacy']} -> {r['sha256'][:12]}")
+        print(f"Imported {len(results)} legacy backups ({sum(not r['skipped'] for r in results)} new versions)")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Speed and accuracy benchmark for the extract_all_lines PDF backends.
+
+Every bundled insulation PDF (PDF_PREFIXES) is read by each LINE_BACKENDS
+backend; the lines go through the normal month/header/parse_data_line loop.
+Reported per PDF and backend: pages/sec (best of REPEATS runs), lines, parsed
+rows, and a row-level diff against the reference backend (pdfplumber):
+rows missing, rows extra, and whether the row order is identical.
+
+The summary names the fastest backend whose rows are identical on every PDF.
+
+Usage: python benchmark_pdf_backends.py [repeats] [--show-diff]
+"""
+
+import sys
+import time
+from collections import Counter
+
+import pdfplumber
+
+from build_phase1_master_workbook import BASE
+from extract_insulation_pdf import LINE_BACKENDS, extract_all_lines, is_header_line, is_month_header, parse_data_line
+from watch_insulation_pdfs import PDF_PREFIXES
+
+REFERENCE = "pdfplumber"
+REPEATS = 3
+SHOW_DIFF_ROWS = 5
+
+
+def parse_lines(lines: list[str]) -> list:
+    """parse_pdf_rows for the 'text' method, on already extracted lines."""
+    current_month = ""
+    entries = []
+    for line in lines:
+        month = is_month_header(line)
+        if month:
+            current_month = month
+            continue
+        if is_header_line(line):
+            continue
+        entry = parse_data_line(line, current_month)
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def time_backend(pdf_path: str, backend: str, repeats: int) -> tuple[float, list[str]]:
+    best, lines = float("inf"), []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        lines = extract_all_lines(pdf_path, backend)
+        best = min(best, time.perf_counter() - t0)
+    return best, lines
+
+
+def row_diff(reference: list, rows: list) -> dict:
+    ref, got = Counter(reference), Counter(rows)
+    return {
+        "missing": list((ref - got).elements()),
+        "extra": list((got - ref).elements()),
+        "same_order": reference == rows,
+    }
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    repeats = int(args[0]) if args else REPEATS
+    show_diff = "--show-diff" in sys.argv
+
+    pdfs = sorted(p for p in BASE.glob("*.pdf") if p.name.strip().lower() in PDF_PREFIXES)
+    if not pdfs:
+        raise FileNotFoundError(f"No insulation PDFs found in {BASE}")
+
+    totals = {b: {"pages": 0, "seconds": 0.0, "identical": True} for b in LINE_BACKENDS}
+    print(f"{'PDF':<30} {'backend':<11} {'pages':>5} {'sec':>7} {'pages/s':>8} {'lines':>6} {'rows':>5} {'missing':>7} {'extra':>5} {'order':>5}")
+    for pdf_path in pdfs:
+        with pdfplumber.open(pdf_path) as pdf:
+            pages = len(pdf.pages)
+        reference = None
+        for backend in [REFERENCE] + [b for b in LINE_BACKENDS if b != REFERENCE]:
+            try:
+                seconds, lines = time_backend(str(pdf_path), backend, repeats)
+            except ImportError as exc:
+                print(f"{pdf_path.name:<30} {backend:<11} skipped ({exc})")
+                totals[backend]["identical"] = False
+                continue
+            rows = parse_lines(lines)
+            reference = rows if backend == REFERENCE else reference
+            diff = row_diff(reference, rows)
+            identical = not diff["missing"] and not diff["extra"] and diff["same_order"]
+
+            totals[backend]["pages"] += pages
+            totals[backend]["seconds"] += seconds
+            totals[backend]["identical"] &= identical
+            print(
+                f"{pdf_path.name:<30} {backend:<11} {pages:>5} {seconds:>7.3f} {pages / seconds:>8.1f} "
+                f"{len(lines):>6} {len(rows):>5} {len(diff['missing']):>7} {len(diff['extra']):>5} "
+                f"{'same' if diff['same_order'] else 'diff':>5}"
+            )
+            if show_diff and not identical:
+                for row in diff["missing"][:SHOW_DIFF_ROWS]:
+                    print(f"    - {tuple(row)}")
+                for row in diff["extra"][:SHOW_DIFF_ROWS]:
+                    print(f"    + {tuple(row)}")
+
+    print()
+    ranked = []
+    for backend, t in totals.items():
+        if t["seconds"] <= 0:
+            continue
+        rate = t["pages"] / t["seconds"]
+        ranked.append((rate, backend, t["identical"]))
+        print(f"{backend:<11} {t['pages']} pages in {t['seconds']:.3f}s = {rate:.1f} pages/s, rows {'identical' if t['identical'] else 'DIFFER'}")
+    usable = [(rate, backend) for rate, backend, identical in ranked if identical]
+    if usable:
+        rate, backend = max(usable)
+        print(f"Fastest backend with identical rows: {backend} ({rate:.1f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
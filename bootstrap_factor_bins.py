@@ -0,0 +1,136 @@
+"""
+Bootstrap confidence for the top-5 factor bins of one family workbook.
+
+Rows are resampled with replacement thousands of times. Each replicate is a
+multinomial count vector, so bin support for a whole chunk of replicates is one
+matrix product (replicates x rows) @ (rows x bins). Chunks run across a process
+pool with independent SeedSequence streams, so results are reproducible for a
+given seed regardless of worker count.
+
+Row reliability is the compute_top5_factor_labels score on the full data
+(normalisation is not re-fitted per replicate).
+
+Columns added to Factor_Top5_Summary:
+  boot_support_ci_low / boot_support_ci_high   2.5% / 97.5% support percentiles
+  boot_top5_freq     share of replicates where the bin is in the top 5
+  boot_rank1_freq    share of replicates where the bin is rank 1
+  boot_median_rank   median rank across replicates
+
+Usage: python bootstrap_factor_bins.py <family|workbook.xlsx> [replicates] [seed]
+Example: python bootstrap_factor_bins.py DFG 5000 42
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_phase1_master_workbook import SOURCE_FILES, SOURCE_SHEETS
+from factor_features import BUCKET_STEP, REL_WEIGHTS, build_reliability_features, factor_bin_index
+
+DEFAULT_REPLICATES = 2000
+DEFAULT_SEED = 20260216
+CHUNK_REPLICATES = 250
+CI = (2.5, 97.5)
+
+
+def _bootstrap_chunk(args):
+    """Worker: (support, rank) arrays of shape (reps, bins) for one seeded chunk."""
+    weighted_onehot, onehot, reps, seed_seq = args
+    rng = np.random.default_rng(seed_seq)
+    n = onehot.shape[0]
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=reps).astype(float)
+    support = counts @ weighted_onehot
+    rows = counts @ onehot
+    # rank by support desc, then row count desc (same order as compute_top5_factor_labels)
+    order = np.lexsort((-rows, -np.round(support, 6)), axis=1)
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(np.arange(1, order.shape[1] + 1), order.shape), axis=1)
+    # bins with no rows in this replicate cannot rank
+    rank[rows == 0] = order.shape[1] + 1
+    return support, rank.astype(np.int16)
+
+
+def bootstrap_bins(sheets: dict, replicates=DEFAULT_REPLICATES, seed=DEFAULT_SEED, workers=None) -> pd.DataFrame:
+    """Per factor bin bootstrap statistics for one family's 4 tabs."""
+    feats = build_reliability_features(sheets)
+    if len(feats["factor"]) == 0:
+        return pd.DataFrame()
+    reliability = feats["features"] @ REL_WEIGHTS
+    bin_ids, inv = np.unique(factor_bin_index(feats["factor"]), return_inverse=True)
+    onehot = np.zeros((len(inv), len(bin_ids)))
+    onehot[np.arange(len(inv)), inv] = 1.0
+    weighted = onehot * reliability[:, None]
+
+    sizes = [CHUNK_REPLICATES] * (replicates // CHUNK_REPLICATES)
+    if replicates % CHUNK_REPLICATES:
+        sizes.append(replicates % CHUNK_REPLICATES)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(weighted, onehot, reps, s) for reps, s in zip(sizes, seeds)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(_bootstrap_chunk, jobs))
+    support = np.vstack([r[0] for r in results])
+    rank = np.vstack([r[1] for r in results])
+
+    lo, hi = np.percentile(support, CI, axis=0)
+    return pd.DataFrame(
+        {
+            "factor_value": np.round(bin_ids * BUCKET_STEP, 2),
+            "boot_support_ci_low": np.round(lo, 6),
+            "boot_support_ci_high": np.round(hi, 6),
+            "boot_top5_freq": np.round((rank <= 5).mean(axis=0), 4),
+            "boot_rank1_freq": np.round((rank == 1).mean(axis=0), 4),
+            "boot_median_rank": np.median(rank, axis=0),
+        }
+    )
+
+
+def add_bootstrap_columns(summary_df: pd.DataFrame, boot_df: pd.DataFrame) -> pd.DataFrame:
+    """Merge bootstrap statistics into a Factor_Top5_Summary frame on factor_value."""
+    out = summary_df.drop(columns=[c for c in boot_df.columns if c != "factor_value" and c in summary_df.columns])
+    key = pd.to_numeric(out["factor_value"], errors="coerce").round(2)
+    merged = out.assign(_key=key).merge(
+        boot_df.rename(columns={"factor_value": "_key"}), on="_key", how="left"
+    )
+    return merged.drop(columns=["_key"])
+
+
+def resolve_workbook(arg: str) -> Path:
+    families = dict(SOURCE_FILES)
+    return families[arg] if arg in families else Path(arg)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python bootstrap_factor_bins.py <family|workbook.xlsx> [replicates] [seed]")
+        sys.exit(1)
+    path = resolve_workbook(sys.argv[1])
+    replicates = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REPLICATES
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_SEED
+    if not path.exists():
+        raise FileNotFoundError(f"Workbook not found: {path}")
+
+    xl = pd.ExcelFile(path)
+    sheets = {s: pd.read_excel(xl, sheet_name=s, dtype=str).fillna("") for s in SOURCE_SHEETS if s in xl.sheet_names}
+    summary = pd.read_excel(xl, sheet_name="Factor_Top5_Summary") if "Factor_Top5_Summary" in xl.sheet_names else None
+    xl.close()
+    if summary is None or summary.empty:
+        raise ValueError(f"No Factor_Top5_Summary sheet in {path}")
+
+    boot = bootstrap_bins(sheets, replicates, seed)
+    summary = add_bootstrap_columns(summary, boot)
+    with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+        summary.to_excel(writer, sheet_name="Factor_Top5_Summary", index=False)
+
+    print(f"Workbook updated: {path} ({replicates} replicates, seed {seed})")
+    cols = ["factor_value", "rank", "support_score", "boot_support_ci_low", "boot_support_ci_high",
+            "boot_top5_freq", "boot_rank1_freq", "boot_median_rank"]
+    print(summary[[c for c in cols if c in summary.columns]].head(8).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Precompute a dense insulation-percentage grid over the catalog size range.
+
+Grid axes (catalog ranges from AI_CONTEXT.md):
+- strips: width 4.00-20.00 mm x thickness 0.90-6.25 mm, 0.05 mm steps
+- wires:  0-12 SWG diameters plus 2.00-10.00 mm in 0.05 mm steps
+- material density (Aluminium, Copper) x covering thickness (COVERINGS)
+
+Insulation % is linear in factor, so the stored arrays hold % at factor = 1.0
+and the accessor scales by the requested factor. The union of every family's
+top-5 factor bins is saved in the metadata for enumeration.
+
+Output (memory-mapped .npy + JSON metadata):
+  insulation_grid/strip_pct.npy  shape (material, covering, width, thickness)
+  insulation_grid/wire_pct.npy   shape (material, covering, diameter)
+  insulation_grid/grid_meta.json
+
+Usage: python build_insulation_grid.py [out_dir]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_phase1_master_workbook import BASE, SOURCE_FILES
+from calc_engine import DENSITIES, strip_percent_increase, wire_percent_increase
+from run_insulation_pipeline import SWG_TO_MM
+
+GRID_DIR = BASE / "insulation_grid"
+STEP_MM = 0.05
+STRIP_WIDTH_RANGE = (4.0, 20.0)
+STRIP_THICKNESS_RANGE = (0.90, 6.25)
+WIRE_MM_RANGE = (2.0, 10.0)
+WIRE_SWG_RANGE = range(0, 13)
+
+# Default coverings from engine.ts presets plus the SOP 0.50 fallback
+COVERINGS = [0.05, 0.10, 0.12, 0.20, 0.30, 0.35, 0.40, 0.45, 0.50, 0.55, 0.60, 0.70, 0.80, 0.85, 1.00]
+
+# Used when no family workbook has a Factor_Top5_Summary (engine.ts preset factors)
+FALLBACK_FACTORS = [0.70, 0.85, 0.95, 1.00, 1.30, 1.35, 1.40, 1.45, 1.50, 1.70, 1.80, 1.95]
+
+
+def axis(lo, hi, step=STEP_MM):
+    n = int(round((hi - lo) / step)) + 1
+    return np.round(lo + step * np.arange(n), 4)
+
+
+def wire_diameters():
+    swg = [SWG_TO_MM[g] for g in WIRE_SWG_RANGE]
+    return np.unique(np.round(np.concatenate([swg, axis(*WIRE_MM_RANGE)]), 4))
+
+
+def top_factor_bins() -> list[float]:
+    bins = set()
+    for _, path in SOURCE_FILES:
+        if not path.exists() or "Factor_Top5_Summary" not in pd.ExcelFile(path).sheet_names:
+            continue
+        summary = pd.read_excel(path, sheet_name="Factor_Top5_Summary", dtype=str).fillna("")
+        ranked = summary[summary.get("rank", pd.Series("", index=summary.index)).astype(str).str.strip() != ""]
+        for v in pd.to_numeric(ranked["factor_value"], errors="coerce").dropna():
+            bins.add(round(float(v), 2))
+    return sorted(bins) or FALLBACK_FACTORS
+
+
+def build_grid(out_dir: Path = GRID_DIR) -> dict:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    materials = list(DENSITIES)
+    density = np.array([DENSITIES[m] for m in materials])
+    coverings = np.array(COVERINGS)
+    widths = axis(*STRIP_WIDTH_RANGE)
+    thicknesses = axis(*STRIP_THICKNESS_RANGE)
+    diameters = wire_diameters()
+
+    strip = np.lib.format.open_memmap(
+        out_dir / "strip_pct.npy", mode="w+", dtype=np.float32,
+        shape=(len(materials), len(coverings), len(widths), len(thicknesses)),
+    )
+    # one covering slice at a time keeps peak memory to a single (material, width, thickness) block
+    for ci, cov in enumerate(coverings):
+        strip[:, ci] = strip_percent_increase(
+            widths[None, :, None], thicknesses[None, None, :], cov, 1.0, density[:, None, None]
+        )
+    strip.flush()
+
+    wire = np.lib.format.open_memmap(
+        out_dir / "wire_pct.npy", mode="w+", dtype=np.float32,
+        shape=(len(materials), len(coverings), len(diameters)),
+    )
+    wire[:] = wire_percent_increase(diameters[None, None, :], coverings[None, :, None], 1.0, density[:, None, None])
+    wire.flush()
+
+    meta = {
+        "value": "insulation % increase at factor = 1.0 (scale linearly by factor)",
+        "materials": materials,
+        "densities": density.tolist(),
+        "coverings": coverings.tolist(),
+        "widths": widths.tolist(),
+        "thicknesses": thicknesses.tolist(),
+        "diameters": diameters.tolist(),
+        "factor_bins": top_factor_bins(),
+    }
+    (out_dir / "grid_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+def _bracket(axis_vals, x):
+    """Lower index and fractional weight of x within a sorted axis (clamped to range)."""
+    x = np.clip(np.asarray(x, dtype=float), axis_vals[0], axis_vals[-1])
+    lo = np.clip(np.searchsorted(axis_vals, x, side="right") - 1, 0, len(axis_vals) - 2)
+    span = axis_vals[lo + 1] - axis_vals[lo]
+    frac = np.where(span > 0, (x - axis_vals[lo]) / span, 0.0)
+    return lo, frac
+
+
+class InsulationGrid:
+    """
+    Read-only accessor over the memory-mapped grid.
+    Lookups are vectorised: pass arrays of sizes to price a whole list in one call.
+    Values between grid nodes are interpolated linearly on covering and size axes.
+    """
+
+    def __init__(self, grid_dir: Path = GRID_DIR):
+        self.meta = json.loads((grid_dir / "grid_meta.json").read_text(encoding="utf-8"))
+        self.strip = np.load(grid_dir / "strip_pct.npy", mmap_mode="r")
+        self.wire = np.load(grid_dir / "wire_pct.npy", mmap_mode="r")
+        self.materials = {m: i for i, m in enumerate(self.meta["materials"])}
+        self.coverings = np.array(self.meta["coverings"])
+        self.widths = np.array(self.meta["widths"])
+        self.thicknesses = np.array(self.meta["thicknesses"])
+        self.diameters = np.array(self.meta["diameters"])
+        self.factor_bins = self.meta["factor_bins"]
+
+    def _material_index(self, material):
+        mats = np.atleast_1d(np.asarray(material, dtype=object))
+        return np.array(
+            [self.materials["Aluminium" if str(m).strip().upper().startswith("AL") else "Copper"] for m in mats]
+        )
+
+    def strip_pct(self, width, thickness, covering, factor, material="Aluminium"):
+        m = self._material_index(material)
+        c0, cf = _bracket(self.coverings, covering)
+        w0, wf = _bracket(self.widths, width)
+        t0, tf = _bracket(self.thicknesses, thickness)
+        out = 0.0
+        for dc, wc in ((0, 1 - cf), (1, cf)):
+            for dw, ww in ((0, 1 - wf), (1, wf)):
+                for dt, wt in ((0, 1 - tf), (1, tf)):
+                    out = out + wc * ww * wt * self.strip[m, c0 + dc, w0 + dw, t0 + dt]
+        return out * np.asarray(factor, dtype=float)
+
+    def wire_pct(self, dia, covering, factor, material="Aluminium"):
+        m = self._material_index(material)
+        c0, cf = _bracket(self.coverings, covering)
+        d0, df = _bracket(self.diameters, dia)
+        out = 0.0
+        for dc, wc in ((0, 1 - cf), (1, cf)):
+            for dd, wd in ((0, 1 - df), (1, df)):
+                out = out + wc * wd * self.wire[m, c0 + dc, d0 + dd]
+        return out * np.asarray(factor, dtype=float)
+
+    def expected_pct_table(self, width, thickness, covering, material="Aluminium") -> pd.DataFrame:
+        """Expected insulation % of one strip size for every stored top factor bin."""
+        unit = float(np.asarray(self.strip_pct(width, thickness, covering, 1.0, material)).ravel()[0])
+        return pd.DataFrame(
+            {"factor_value": self.factor_bins, "expected_pct": [round(unit * f, 6) for f in self.factor_bins]}
+        )
+
+
+def main():
+    out_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else GRID_DIR
+    meta = build_grid(out_dir)
+    strip_nodes = len(meta["materials"]) * len(meta["coverings"]) * len(meta["widths"]) * len(meta["thicknesses"])
+    wire_nodes = len(meta["materials"]) * len(meta["coverings"]) * len(meta["diameters"])
+    print(f"Saved grid to {out_dir}")
+    print(f"  strip nodes: {strip_nodes}, wire nodes: {wire_nodes}")
+    print(f"  top factor bins: {meta['factor_bins']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -117,16 +117,11 @@ def sheet_out_name(insulation_name: str, base_sheet_name: str) -> str:
     return f"{insulation_name}_{suffix_map[base_sheet_name]}"
 
 
-def mark_top3_factor_green(workbook_path: Path, sheet_name: str, top3_bins: Iterable[float]):
+def fill_top3_factor(ws, top3_bins: Iterable[float]):
     bins = set(round(float(x), 6) for x in top3_bins)
-    if not bins:
-        return
-    wb = load_workbook(workbook_path)
-    ws = wb[sheet_name]
     headers = {ws.cell(row=1, column=c).value: c for c in range(1, ws.max_column + 1)}
     factor_col = headers.get("factor")
-    if not factor_col:
-        wb.save(workbook_path)
+    if not bins or not factor_col:
         return
     for r in range(2, ws.max_row + 1):
         cell = ws.cell(row=r, column=factor_col)
@@ -137,6 +132,14 @@ def mark_top3_factor_green(workbook_path: Path, sheet_name: str, top3_bins: Iter
         b = round(factor_bin(v), 6)
         if b in bins:
             cell.fill = GREEN_FILL
+
+
+def mark_top3_factor_green(workbook_path: Path, sheet_name: str, top3_bins: Iterable[float]):
+    top3_bins = list(top3_bins)
+    if not top3_bins:
+        return
+    wb = load_workbook(workbook_path)
+    fill_top3_factor(wb[sheet_name], top3_bins)
     wb.save(workbook_path)
 
 
@@ -156,12 +159,11 @@ def main():
             out_sheet = sheet_out_name(insulation_name, src_sheet)
             sheets_to_write.append((out_sheet, final_df, top3_bins))
 
+    # Top-3 fills go on the open sheets, so the workbook is saved once
     with pd.ExcelWriter(OUT_PATH, engine="openpyxl") as writer:
-        for out_sheet, df, _ in sheets_to_write:
+        for out_sheet, df, top3 in sheets_to_write:
             df.to_excel(writer, sheet_name=out_sheet, index=False)
-
-    for out_sheet, _, top3 in sheets_to_write:
-        mark_top3_factor_green(OUT_PATH, out_sheet, top3)
+            fill_top3_factor(writer.sheets[out_sheet], top3)
 
     print(f"Created: {OUT_PATH}")
     print(f"Total tabs: {len(sheets_to_write)}")
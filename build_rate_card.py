@@ -0,0 +1,234 @@
+"""
+Precompute the price/weight rate card for every catalog combination.
+
+Axes:
+- sizes: catalog strips (AI_CONTEXT.md: width 4-20 mm, thickness 0.90-6.25 mm,
+  area 3.6-75 sqmm; WIDTH_STEP x THICKNESS_STEP grid) and round wires 0-12 SWG,
+  unioned with every size produced in the consolidated master workbook
+  (off-grid strips, other SWG gauges, wires given as a diameter in mm)
+- insulation family (SOURCE_FILES) with its engine.ts default covering
+  (FAMILY_PRESETS) for the size's shape
+- material (Aluminium, Copper; densities as in add_factor_column / engine.ts)
+- top factor bins of the family (the top-3 bins highlighted in the
+  consolidated workbook; engine.ts preset factor when a family has none)
+
+Values per combination: bare weight and insulated weight (kg/km, i.e. g/m)
+and insulation % increase (engine.ts formulas via calc_engine). Bare weight
+depends only on material and size, and insulated weight is by definition
+bare x (1 + % / 100), so the table stores bare weight once per (material,
+size) and % per combination; the loader returns all three.
+
+Output, loaded once by the dashboard (src/lib/rateCard.ts):
+  public/rate_card.json  metadata: axes, factor bins, coverings, section layout
+  public/rate_card.bin   little-endian sections listed in the metadata:
+    width_or_dia  float32 (size)          mm; sizes are strips, then SWG wires, then mm wires
+    thickness     float32 (size)          mm, 0 for wires
+    bare_kg_km    float32 (material, size)
+    insulation_pct  uint16 (family, material, rank, size)  hundredths of %
+
+Usage: python build_rate_card.py [out_dir]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apply_markings_and_top5_factor import parse_num
+from build_phase1_master_workbook import BASE, OUT_PATH, SOURCE_FILES, top3_factor_bins
+from calc_engine import DENSITIES, WIRE_AREA_K, default_thickness, insulation_factor, strip_percent_increase, wire_percent_increase
+from run_insulation_pipeline import SWG_TO_MM
+
+OUT_DIR = BASE / "public"
+JSON_NAME = "rate_card.json"
+BIN_NAME = "rate_card.bin"
+
+STRIP_WIDTH_RANGE = (4.0, 20.0)
+STRIP_THICKNESS_RANGE = (0.90, 6.25)
+STRIP_AREA_RANGE = (3.6, 75.0)
+WIDTH_STEP = 0.10
+THICKNESS_STEP = 0.05
+WIRE_SWG_RANGE = range(0, 13)
+TOP_BINS = 3
+PCT_SCALE = 100
+
+# Family -> engine.ts INSULATION_TYPES preset used for the default covering (and fallback factor)
+FAMILY_PRESETS = {
+    "DFG": "Dfg 225 yarn",
+    "Poly": "Polyester",
+    "PolyCotton": "Poly + Cotton",
+    "PolyDFG": "Poly + Dfg 225",
+    "PolyPaper": "Poly + Paper",
+    "EnamelDFG": "Enamel + Dfg 900",
+    "Cotton": "Cotton 32s ( mainly alu )",
+}
+MATERIAL_KEYS = {"Aluminium": "ALUMINIUM", "Copper": "COPPER"}
+
+
+def axis(lo, hi, step):
+    n = int(round((hi - lo) / step)) + 1
+    return np.round(lo + step * np.arange(n), 4)
+
+
+def observed_sizes(path: Path = OUT_PATH) -> dict:
+    """Strips (width, thickness), SWG gauges and mm wire diameters in the master tabs (empty when missing)."""
+    observed = {"strips": set(), "swg": set(), "mm": set()}
+    if not path.exists():
+        return observed
+    xl = pd.ExcelFile(path)
+    for tab in xl.sheet_names:
+        df = pd.read_excel(xl, sheet_name=tab, dtype=str).fillna("")
+        for _, row in df.iterrows():
+            width, thickness = parse_num(row.get("Width")), parse_num(row.get("Thickness"))
+            value, unit = parse_num(row.get("Wire Value")), str(row.get("Wire Unit", "")).strip().upper()
+            if width and thickness:
+                observed["strips"].add((round(width, 2), round(thickness, 2)))
+            elif value is not None and unit == "SWG" and int(value) in SWG_TO_MM:
+                observed["swg"].add(int(value))
+            elif value and unit == "MM":
+                observed["mm"].add(round(value, 2))
+    xl.close()
+    return observed
+
+
+def catalog_sizes(observed: dict | None = None) -> dict:
+    """
+    Strip (width, thickness) pairs inside the catalog area range plus observed
+    strips, then SWG wires (0-12 plus observed gauges), then observed mm wires.
+    """
+    observed = observed or {"strips": set(), "swg": set(), "mm": set()}
+    w, t = np.meshgrid(axis(*STRIP_WIDTH_RANGE, WIDTH_STEP), axis(*STRIP_THICKNESS_RANGE, THICKNESS_STEP), indexing="ij")
+    area = np.round(w * t, 6)
+    keep = (area >= STRIP_AREA_RANGE[0]) & (area <= STRIP_AREA_RANGE[1]) & (t <= w)
+    grid = set(zip(np.round(w[keep], 2).tolist(), np.round(t[keep], 2).tolist()))
+    strips = np.array(sorted(grid | observed["strips"]), dtype=float).reshape(-1, 2)
+    swg = sorted(set(WIRE_SWG_RANGE) | observed["swg"])
+    mm = sorted(observed["mm"])
+    dia = np.array([SWG_TO_MM[g] for g in swg] + mm, dtype=float)
+    return {
+        "is_wire": np.r_[np.zeros(len(strips), dtype=bool), np.ones(len(dia), dtype=bool)],
+        "width_or_dia": np.r_[strips[:, 0], dia],
+        "thickness": np.r_[strips[:, 1], np.zeros(len(dia))],
+        "swg": swg,
+        "mm": mm,
+        "off_grid_strips": len(observed["strips"] - grid),
+    }
+
+
+def family_factor_bins() -> dict:
+    """{family: [factor bins]} from each family workbook's Factor_Top5_Summary (top 3 by support)."""
+    bins = {}
+    for family, path in SOURCE_FILES:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing source workbook: {path}")
+        xl = pd.ExcelFile(path)
+        summary = (
+            pd.read_excel(xl, sheet_name="Factor_Top5_Summary", dtype=str).fillna("")
+            if "Factor_Top5_Summary" in xl.sheet_names
+            else pd.DataFrame()
+        )
+        xl.close()
+        bins[family] = [round(b, 2) for b in top3_factor_bins(summary)][:TOP_BINS]
+    return bins
+
+
+def build_rate_card(out_dir: Path = OUT_DIR) -> dict:
+    sizes = catalog_sizes(observed_sizes())
+    families = list(FAMILY_PRESETS)
+    materials = list(MATERIAL_KEYS)
+    density = np.array([DENSITIES[m] for m in materials])
+    is_wire = sizes["is_wire"]
+    x, t = sizes["width_or_dia"], sizes["thickness"]
+
+    bins = family_factor_bins()
+    factors = np.empty((len(families), len(materials), TOP_BINS))
+    coverings = np.empty((len(families), len(x)))
+    for fi, family in enumerate(families):
+        preset = FAMILY_PRESETS[family]
+        for mi, material in enumerate(materials):
+            ranked = bins.get(family) or [insulation_factor(preset, MATERIAL_KEYS[material])]
+            factors[fi, mi] = (ranked + ranked[-1:] * TOP_BINS)[:TOP_BINS]
+        coverings[fi] = np.where(is_wire, default_thickness(preset, "WIRE"), default_thickness(preset, "STRIP"))
+
+    bare_area = np.where(is_wire, WIRE_AREA_K * x * x, x * t)
+    bare_kg_km = bare_area[None, :] * density[:, None]  # mm^2 x g/cm^3 = g/m = kg/km
+
+    # (family, material, rank, size) in one broadcast per shape
+    cov = coverings[:, None, None, :]
+    f = factors[..., None]
+    d = density[None, :, None, None]
+    pct = np.where(
+        is_wire,
+        wire_percent_increase(x, cov, f, d),
+        strip_percent_increase(x, t, cov, f, d),
+    )
+
+    sections = [
+        ("width_or_dia", x.astype("<f4"), None),
+        ("thickness", t.astype("<f4"), None),
+        ("bare_kg_km", bare_kg_km.astype("<f4"), None),
+        ("insulation_pct", np.round(pct * PCT_SCALE).astype("<u2"), PCT_SCALE),
+    ]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    layout = []
+    offset = 0
+    with open(out_dir / BIN_NAME, "wb") as fh:
+        for name, arr, scale in sections:
+            pad = (-offset) % 4
+            fh.write(b"\0" * pad)
+            offset += pad
+            fh.write(arr.tobytes())
+            layout.append(
+                {"name": name, "dtype": "float32" if arr.dtype.kind == "f" else "uint16", "shape": list(arr.shape),
+                 "offset": offset, **({"scale": scale} if scale else {})}
+            )
+            offset += arr.nbytes
+
+    meta = {
+        "units": {"width_or_dia": "mm", "thickness": "mm", "weight": "kg/km", "insulation_pct": "% increase over bare weight"},
+        "binary": BIN_NAME,
+        "bytes": offset,
+        "families": families,
+        "family_presets": FAMILY_PRESETS,
+        "materials": materials,
+        "densities": density.tolist(),
+        "strip_count": int((~is_wire).sum()),
+        "wire_swg": sizes["swg"],
+        "wire_mm": sizes["mm"],
+        "coverings": {
+            fam: {"STRIP": default_thickness(p, "STRIP"), "WIRE": default_thickness(p, "WIRE")}
+            for fam, p in FAMILY_PRESETS.items()
+        },
+        "factor_bins": np.round(factors, 4).tolist(),
+        "catalog": {
+            "strip_width": list(STRIP_WIDTH_RANGE),
+            "strip_thickness": list(STRIP_THICKNESS_RANGE),
+            "strip_area": list(STRIP_AREA_RANGE),
+            "width_step": WIDTH_STEP,
+            "thickness_step": THICKNESS_STEP,
+            "observed_off_grid_strips": sizes["off_grid_strips"],
+        },
+        "sections": layout,
+    }
+    (out_dir / JSON_NAME).write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+    return meta
+
+
+def main():
+    out_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else OUT_DIR
+    meta = build_rate_card(out_dir)
+    n_sizes = meta["strip_count"] + len(meta["wire_swg"]) + len(meta["wire_mm"])
+    combos = len(meta["families"]) * len(meta["materials"]) * TOP_BINS * n_sizes
+    print(f"Saved rate card to {out_dir / JSON_NAME} + {BIN_NAME} ({meta['bytes'] / 1e6:.2f} MB)")
+    print(
+        f"  sizes: {meta['strip_count']} strips ({meta['catalog']['observed_off_grid_strips']} observed off-grid)"
+        f" + {len(meta['wire_swg'])} SWG wires + {len(meta['wire_mm'])} mm wires, combinations: {combos}"
+    )
+    for family, row in zip(meta["families"], meta["factor_bins"]):
+        print(f"  {family}: factor bins Alu {row[0]}, Cu {row[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Prebuilt size search index for the dashboard search page.
+
+Documents: every row of the consolidated master workbook (OUT_PATH, one tab
+per family x material x shape) plus the rows of fabrication_data.jsonl
+(export_fabrication.py). Each document is keyed by a normalized size token:
+  strips  "10.00 X 2.0"  -> "10.00X2.00"
+  wires   "10 swg"       -> "10SWG",  "5.6 mm" -> "5.60MM"
+Unparseable sizes keep their upper-cased, space-free text.
+
+Layout (public/search_index.json, loaded once by src/lib/searchIndex.ts):
+  tokens         sorted unique size tokens (prefix search = binary search + scan)
+  token_offsets  docs are sorted by token, so token i owns docs
+                 [token_offsets[i], token_offsets[i + 1])
+  docs           columnar: size, family / insulation / material / source as
+                 indexes into the name lists, pct, factor, month, tab
+  postings       sorted doc ids per insulation type and per material
+
+Typeahead "4.50 X 2" normalizes to the prefix "4.50X2" (complete numbers padded
+like the tokens, the number being typed left as is) and resolves to a token range.
+
+Usage: python build_search_index.py [out_dir]
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from build_phase1_master_workbook import BASE, OUT_PATH, SOURCE_FILES, SOURCE_SHEETS, sheet_out_name
+
+OUT_DIR = BASE / "public"
+JSON_NAME = "search_index.json"
+FABRICATION_PATH = BASE / "fabrication_data.jsonl"
+
+STRIP_SIZE = re.compile(r"^(\d+(?:\.\d*)?)X(\d+(?:\.\d*)?)$")
+WIRE_SIZE = re.compile(r"^(\d+(?:\.\d*)?)(MM|SWG)$")
+MATERIALS = {"ALU": "Aluminium", "ALUMINIUM": "Aluminium", "COP": "Copper", "COPPER": "Copper"}
+TAB_SOURCES = {sheet_out_name(family, sheet): family for family, _ in SOURCE_FILES for sheet in SOURCE_SHEETS}
+
+
+def size_token(size: str) -> str:
+    """Normalized size: strips 'W.WWXT.TT', wires 'D.DDMM' / 'NSWG'."""
+    text = "".join(str(size).split()).upper().replace("×", "X").replace("*", "X")
+    m = STRIP_SIZE.match(text)
+    if m:
+        return f"{float(m.group(1)):.2f}X{float(m.group(2)):.2f}"
+    m = WIRE_SIZE.match(text)
+    if m:
+        value = float(m.group(1))
+        return f"{value:.2f}MM" if m.group(2) == "MM" else f"{value:g}SWG"
+    return text
+
+
+def material_name(value) -> str:
+    return MATERIALS.get(str(value or "").strip().upper(), "")
+
+
+def num(value, digits: int):
+    try:
+        x = float(str(value).strip())
+    except ValueError:
+        return None
+    return round(x, digits) if x == x else None
+
+
+def load_master_tabs(path: Path = OUT_PATH) -> dict:
+    if not path.exists():
+        raise FileNotFoundError(f"Missing master workbook: {path}")
+    xl = pd.ExcelFile(path)
+    tabs = {tab: pd.read_excel(xl, sheet_name=tab, dtype=str).fillna("") for tab in xl.sheet_names}
+    xl.close()
+    return tabs
+
+
+def master_docs(tabs: dict) -> list[dict]:
+    docs = []
+    for tab, df in tabs.items():
+        family = TAB_SOURCES.get(tab)
+        if family is None or df.empty:
+            continue
+        pct = df["Likely Insulation % Increase"] if "Likely Insulation % Increase" in df else df["Insulation_Pct"]
+        for size, ins, material, p, factor, month in zip(
+            df["Size"], df["Type_of_Insulation"], df["Material"], pct, df.get("factor", [""] * len(df)), df["Month"]
+        ):
+            docs.append(
+                {
+                    "size": str(size).strip(), "family": family, "insulation": str(ins).strip(),
+                    "material": material_name(material), "pct": num(p, 2), "factor": num(factor, 4),
+                    "month": str(month).strip(), "source": "master", "tab": tab,
+                }
+            )
+    return docs
+
+
+def fabrication_docs(path: Path = FABRICATION_PATH) -> list[dict]:
+    """
+    Rows of fabrication_data.jsonl. Its source workbook has one extra column,
+    so most rows carry Alu/Cop in totalInsulation and the weights one field
+    later (material = bare, bareWeight = final); both layouts are read.
+    """
+    if not path.exists():
+        return []
+    docs = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            material = material_name(row.get("material"))
+            if material:
+                bare, final = num(row.get("bareWeight"), 6), num(row.get("finalQuantity"), 6)
+            else:
+                material = material_name(row.get("totalInsulation"))
+                bare, final = num(row.get("material"), 6), num(row.get("bareWeight"), 6)
+            pct = round((final - bare) / bare * 100, 2) if bare and final is not None else None
+            insulation = str(row.get("insulationType", "")).strip()  # one sheet per insulation family
+            docs.append(
+                {
+                    "size": str(row.get("size", "")).strip(), "family": insulation, "insulation": insulation,
+                    "material": material, "pct": pct, "factor": None,
+                    "month": str(row.get("date", "")).strip(), "source": "fabrication", "tab": "",
+                }
+            )
+    return docs
+
+
+def build_search_index(docs: list[dict], out_dir: Path = OUT_DIR) -> dict:
+    """Write JSON_NAME for docs (master_docs + fabrication_docs) and return it."""
+    for doc in docs:
+        doc["token"] = size_token(doc["size"])
+    docs = [d for d in docs if d["token"]]
+    docs.sort(key=lambda d: (d["token"], d["family"], d["material"], d["insulation"]))
+
+    names = {
+        key: sorted({d[key] for d in docs}) for key in ("family", "insulation", "material", "source")
+    }
+    ids = {key: {name: i for i, name in enumerate(values)} for key, values in names.items()}
+
+    tokens, offsets = [], []
+    for i, doc in enumerate(docs):
+        if not tokens or tokens[-1] != doc["token"]:
+            tokens.append(doc["token"])
+            offsets.append(i)
+    offsets.append(len(docs))
+
+    postings = {key: [[] for _ in names[key]] for key in ("insulation", "material")}
+    for i, doc in enumerate(docs):
+        for key in postings:
+            postings[key][ids[key][doc[key]]].append(i)
+
+    index = {
+        "version": 1,
+        "doc_count": len(docs),
+        "families": names["family"],
+        "insulations": names["insulation"],
+        "materials": names["material"],
+        "sources": names["source"],
+        "tokens": tokens,
+        "token_offsets": offsets,
+        "docs": {
+            "size": [d["size"] for d in docs],
+            "family": [ids["family"][d["family"]] for d in docs],
+            "insulation": [ids["insulation"][d["insulation"]] for d in docs],
+            "material": [ids["material"][d["material"]] for d in docs],
+            "source": [ids["source"][d["source"]] for d in docs],
+            "pct": [d["pct"] for d in docs],
+            "factor": [d["factor"] for d in docs],
+            "month": [d["month"] for d in docs],
+            "tab": [d["tab"] for d in docs],
+        },
+        "postings": postings,
+    }
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / JSON_NAME).write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+    return index
+
+
+def main():
+    out_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else OUT_DIR
+    master = master_docs(load_master_tabs())
+    fabrication = fabrication_docs()
+    index = build_search_index(master + fabrication, out_dir)
+    size = (out_dir / JSON_NAME).stat().st_size
+    print(f"Saved search index to {out_dir / JSON_NAME} ({size / 1e3:.1f} kB)")
+    print(f"  docs: {len(master)} master + {len(fabrication)} fabrication, size tokens: {len(index['tokens'])}")
+    print(f"  insulations: {', '.join(index['insulations'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Vectorised NumPy versions of the insulation formulas in src/lib/calculators/engine.ts.
+Every function accepts scalars or broadcastable arrays and returns arrays.
+
+calculate_* mirror the engine.ts calculators one to one and return a dict of
+arrays (engine.ts result fields in snake_case, all broadcast to one shape), so
+thousands of size / material / covering combinations are one call.
+verify_calc_engine.py checks parity with engine.ts.
+"""
+
+import numpy as np
+
+# Densities from app (engine.ts CONSTANTS.DENSITY)
+DENSITY_ALU = 2.709
+DENSITY_CU = 8.89
+DENSITIES = {"Aluminium": DENSITY_ALU, "Copper": DENSITY_CU}
+
+# Circular area constant used by engine.ts (pi / 4 rounded)
+WIRE_AREA_K = 0.785
+
+# engine.ts CONSTANTS.PRODUCTION / CONSTANTS.LME
+PRODUCTION_SPEED_M_HR = 256
+LME_PREMIUM = 190
+LME_MULTIPLIER_CSP = 1.055
+LME_MULTIPLIER_WWMAI = 1.106
+LME_HANDLING_CHARGES = 4250
+
+# engine.ts CONSTANTS.INSULATION_TYPES (same keys, so the table can be diffed against the TS source)
+_POLY_DFG = {
+    "isDualLayer": True,
+    "layer1Name": "Polyester",
+    "layer2Name": "Fiberglass",
+    "defaultLayer1Thickness": 0.35,
+    "defaultLayer2Thickness": 0.50,
+    "kVOptions": [
+        {"label": "8 kV", "factorAlu": 1.45, "factorCu": 1.45},
+        {"label": "18 kV", "factorAlu": 1.35, "factorCu": 1.45},
+    ],
+    "defaultKV": "8 kV",
+}
+INSULATION_TYPES = [
+    {"name": "Dfg 225 yarn", "factorAlu": 1.45, "factorCu": 1.45, "defaultThickness": 0.50},
+    {"name": "Dfg 450 yarn", "factorAlu": 1.50, "factorCu": 1.70, "defaultThickness": 0.50},
+    {"name": "Dfg 900 yarn", "factorAlu": 1.50, "factorCu": 1.70, "defaultThickness": 0.50},
+    {"name": "Polyester", "factorAlu": 1.40, "factorCu": 1.30, "defaultThicknessStrip": 0.50, "defaultThicknessWire": 0.40},
+    {"name": "Poly + Dfg 225", **_POLY_DFG},
+    {"name": "Poly + Dfg 450", **_POLY_DFG},
+    {"name": "Poly + Dfg 900", **_POLY_DFG},
+    {"name": "Poly + Cotton", "isDualLayer": True, "factorAlu": 1.30, "factorCu": 1.95, "layer1Name": "Polyester", "layer2Name": "Cotton", "defaultLayer1Thickness": 0.35, "defaultLayer2Thickness": 0.50},
+    {"name": "Cotton 32s ( mainly alu )", "factor": 0.70, "defaultThicknessStrip": 0.60, "defaultThicknessWire": 0.50},
+    {"name": "Cotton 42s ( mainly cu )", "factor": 1.80, "defaultThickness": 0.50},
+    {"name": "Enamel", "factor": 1.0, "defaultThickness": 0.12},
+    {"name": "Enamel + Dfg 900", "isDualLayer": True, "factor": 0.85, "layer1Name": "Enamel", "layer2Name": "Fiberglass", "defaultLayer1Thickness": 0.10, "defaultLayer2Thickness": 0.50},
+    {"name": "Kapton + Dfg 900", "isDualLayer": True, "factor": 1.0, "layer1Name": "Kapton", "layer2Name": "Fiberglass", "defaultLayer1Thickness": 0.05, "defaultLayer2Thickness": 0.50},
+    {"name": "Poly + Paper", "factor": 0.95, "defaultThicknessStrip": 0.50, "defaultThicknessWire": 0.40},
+    {"name": "Paper", "factor": 1.0, "defaultThickness": 0.50},
+    {"name": "Mica", "factor": 1.0, "defaultThickness": 0.50},
+    {"name": "Nomex", "factor": 1.0, "defaultThickness": 0.50},
+]
+INSULATION_BY_NAME = {t["name"]: t for t in INSULATION_TYPES}
+MATERIAL_DENSITY = {"ALUMINIUM": DENSITY_ALU, "COPPER": DENSITY_CU}
+
+
+def strip_areas(width, thickness, covering):
+    """(bareArea, insulatedArea) for a rectangular strip."""
+    width = np.asarray(width, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+    covering = np.asarray(covering, dtype=float)
+    bare = width * thickness
+    insulated = (width + covering) * (thickness + covering)
+    return bare, insulated
+
+
+def wire_areas(dia, covering):
+    """(bareArea, insulatedArea) for a round wire."""
+    dia = np.asarray(dia, dtype=float)
+    covering = np.asarray(covering, dtype=float)
+    bare = WIRE_AREA_K * dia * dia
+    insulated = WIRE_AREA_K * (dia + covering) * (dia + covering)
+    return bare, insulated
+
+
+def percent_increase(bare, insulated, factor, density):
+    """PercentageIncrease = (InsulatedArea - BareArea) x FACTOR x 100 / (BareArea x DENSITY)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (insulated - bare) * np.asarray(factor, dtype=float) * 100 / (bare * np.asarray(density, dtype=float))
+
+
+def reverse_factor(bare, insulated, pct, density):
+    """FACTOR = (BareArea x DENSITY x pct) / ((InsulatedArea - BareArea) x 100); NaN where delta <= 0."""
+    delta = insulated - bare
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (bare * np.asarray(density, dtype=float) * np.asarray(pct, dtype=float)) / (delta * 100)
+    return np.where(delta > 0, f, np.nan)
+
+
+def strip_percent_increase(width, thickness, covering, factor, density):
+    bare, insulated = strip_areas(width, thickness, covering)
+    return percent_increase(bare, insulated, factor, density)
+
+
+def wire_percent_increase(dia, covering, factor, density):
+    bare, insulated = wire_areas(dia, covering)
+    return percent_increase(bare, insulated, factor, density)
+
+
+def strip_factor(width, thickness, covering, pct, density):
+    bare, insulated = strip_areas(width, thickness, covering)
+    return reverse_factor(bare, insulated, pct, density)
+
+
+def wire_factor(dia, covering, pct, density):
+    bare, insulated = wire_areas(dia, covering)
+    return reverse_factor(bare, insulated, pct, density)
+
+
+def strip_covering_for_pct(width, thickness, pct, factor, density):
+    """
+    Inverse of strip_percent_increase for covering c (closed form):
+      (w + c)(t + c) - wt = D,  D = pct x wt x density / (100 x factor)
+      c = (-(w + t) + sqrt((w + t)^2 + 4D)) / 2
+    """
+    width = np.asarray(width, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta = np.asarray(pct, dtype=float) * width * thickness * np.asarray(density, dtype=float) / (
+            100 * np.asarray(factor, dtype=float)
+        )
+        s = width + thickness
+        return (-s + np.sqrt(s * s + 4 * delta)) / 2
+
+
+def wire_covering_for_pct(dia, pct, factor, density):
+    """
+    Inverse of wire_percent_increase for covering c (closed form):
+      0.785((d + c)^2 - d^2) = D,  D = pct x 0.785 d^2 x density / (100 x factor)
+      c = d x (sqrt(1 + pct x density / (100 x factor)) - 1)
+    """
+    dia = np.asarray(dia, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.asarray(pct, dtype=float) * np.asarray(density, dtype=float) / (100 * np.asarray(factor, dtype=float))
+        return dia * (np.sqrt(1 + ratio) - 1)
+
+
+def insulation_factor(name: str, material: str, kv: str | None = None) -> float:
+    """engine.ts getInsulationFactor; material is "ALUMINIUM" or "COPPER"."""
+    t = INSULATION_BY_NAME[name]
+    if kv and t.get("kVOptions"):
+        opt = next((o for o in t["kVOptions"] if o["label"] == kv), None)
+        if opt:
+            if material == "ALUMINIUM" and "factorAlu" in opt:
+                return opt["factorAlu"]
+            if material == "COPPER" and "factorCu" in opt:
+                return opt["factorCu"]
+            if "factor" in opt:
+                return opt["factor"]
+    if "factorAlu" in t and material == "ALUMINIUM":
+        return t["factorAlu"]
+    if "factorCu" in t and material == "COPPER":
+        return t["factorCu"]
+    return t.get("factor", 1.0)
+
+
+def default_thickness(name: str, shape: str) -> float:
+    """engine.ts getDefaultThickness; shape is "STRIP" or "WIRE"."""
+    t = INSULATION_BY_NAME[name]
+    if "defaultLayer1Thickness" in t and "defaultLayer2Thickness" in t:
+        return t["defaultLayer1Thickness"] + t["defaultLayer2Thickness"]
+    if "defaultThicknessStrip" in t and shape == "STRIP":
+        return t["defaultThicknessStrip"]
+    if "defaultThicknessWire" in t and shape == "WIRE":
+        return t["defaultThicknessWire"]
+    return t.get("defaultThickness", 0.0)
+
+
+def resolve_presets(names, materials, shapes, kvs=None):
+    """
+    (factor, density, default covering) arrays for parallel sequences of
+    insulation type names, materials and shapes; each distinct combination is
+    resolved once.
+    """
+    kvs = [None] * len(names) if kvs is None else kvs
+    cache = {}
+    out = np.empty((len(names), 3))
+    for i, key in enumerate(zip(names, materials, shapes, kvs)):
+        if key not in cache:
+            name, material, shape, kv = key
+            cache[key] = (insulation_factor(name, material, kv), MATERIAL_DENSITY[material], default_thickness(name, shape))
+        out[i] = cache[key]
+    return out[:, 0], out[:, 1], out[:, 2]
+
+
+def _results(**fields) -> dict:
+    arrays = [np.asarray(v, dtype=float) for v in fields.values()]
+    shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    return {k: np.broadcast_to(a, shape) for k, a in zip(fields, arrays)}
+
+
+def _production(bare, density, qty_per_spool, bare_wt_reqd):
+    """metersPerSpool, productionKgHr, totalHoursReqd shared by all calculators."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        meters_per_spool = (np.asarray(qty_per_spool, dtype=float) * 1000) / (bare * density)
+        production_kg_hr = (bare * density * PRODUCTION_SPEED_M_HR) / 1000
+        return meters_per_spool, production_kg_hr, bare_wt_reqd / production_kg_hr
+
+
+def calculate_strip_insulation(width, thickness, insulation_thickness, factor, density, final_wt_reqd, qty_per_spool) -> dict:
+    """engine.ts calculateStripInsulation."""
+    width = np.asarray(width, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+    insulation_thickness = np.asarray(insulation_thickness, dtype=float)
+    density = np.asarray(density, dtype=float)
+    bare, insulated = strip_areas(width, thickness, insulation_thickness)
+    pct = percent_increase(bare, insulated, factor, density)
+    bare_wt_reqd = (np.asarray(final_wt_reqd, dtype=float) / (100 + pct)) * 100
+    meters, kg_hr, hours = _production(bare, density, qty_per_spool, bare_wt_reqd)
+    return _results(
+        bare_area=bare,
+        insulated_area=insulated,
+        bare_wt_reqd=bare_wt_reqd,
+        percent_increase=pct,
+        meters_per_spool=meters,
+        production_kg_hr=kg_hr,
+        total_hours_reqd=hours,
+        covered_width_or_dia=width + insulation_thickness,
+        covered_thickness=thickness + insulation_thickness,
+    )
+
+
+def calculate_wire_insulation(dia, insulation_thickness, factor, density, final_wt_reqd, qty_per_spool) -> dict:
+    """engine.ts calculateWireInsulation."""
+    dia = np.asarray(dia, dtype=float)
+    insulation_thickness = np.asarray(insulation_thickness, dtype=float)
+    density = np.asarray(density, dtype=float)
+    bare, insulated = wire_areas(dia, insulation_thickness)
+    pct = percent_increase(bare, insulated, factor, density)
+    bare_wt_reqd = (np.asarray(final_wt_reqd, dtype=float) / (100 + pct)) * 100
+    meters, kg_hr, hours = _production(bare, density, qty_per_spool, bare_wt_reqd)
+    return _results(
+        bare_area=bare,
+        insulated_area=insulated,
+        bare_wt_reqd=bare_wt_reqd,
+        percent_increase=pct,
+        meters_per_spool=meters,
+        production_kg_hr=kg_hr,
+        total_hours_reqd=hours,
+        covered_width_or_dia=dia + insulation_thickness,
+    )
+
+
+def _dual_layer(bare, poly_area, dfg_area, poly_factor, dfg_factor, density, final_wt_reqd):
+    """Layer percentages and weights of the engine.ts dual-layer calculators (DFG over poly)."""
+    final_wt_reqd = np.asarray(final_wt_reqd, dtype=float)
+    poly_pct = percent_increase(bare, poly_area, poly_factor, density)
+    dfg_pct = percent_increase(poly_area, dfg_area, dfg_factor, density)
+    weight_after_poly = (final_wt_reqd / (100 + dfg_pct)) * 100
+    bare_wt_reqd = (weight_after_poly / (100 + poly_pct)) * 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_pct = ((final_wt_reqd - bare_wt_reqd) / bare_wt_reqd) * 100
+    return poly_pct, dfg_pct, weight_after_poly, bare_wt_reqd, total_pct
+
+
+def calculate_dual_layer_strip_insulation(
+    width, thickness, poly_cov, dfg_cov, poly_factor, dfg_factor, density, final_wt_reqd, qty_per_spool
+) -> dict:
+    """engine.ts calculateDualLayerStripInsulation."""
+    width = np.asarray(width, dtype=float)
+    thickness = np.asarray(thickness, dtype=float)
+    poly_cov = np.asarray(poly_cov, dtype=float)
+    dfg_cov = np.asarray(dfg_cov, dtype=float)
+    density = np.asarray(density, dtype=float)
+    bare, poly_area = strip_areas(width, thickness, poly_cov)
+    dfg_area = (width + poly_cov + dfg_cov) * (thickness + poly_cov + dfg_cov)
+    poly_pct, dfg_pct, weight_after_poly, bare_wt_reqd, total_pct = _dual_layer(
+        bare, poly_area, dfg_area, poly_factor, dfg_factor, density, final_wt_reqd
+    )
+    meters, kg_hr, hours = _production(bare, density, qty_per_spool, bare_wt_reqd)
+    return _results(
+        bare_area=bare,
+        insulated_area=dfg_area,
+        bare_wt_reqd=bare_wt_reqd,
+        percent_increase=total_pct,
+        meters_per_spool=meters,
+        production_kg_hr=kg_hr,
+        total_hours_reqd=hours,
+        covered_width_or_dia=width + poly_cov + dfg_cov,
+        covered_thickness=thickness + poly_cov + dfg_cov,
+        poly_percent=poly_pct,
+        dfg_percent=dfg_pct,
+        weight_after_poly=weight_after_poly,
+    )
+
+
+def calculate_dual_layer_wire_insulation(dia, poly_cov, dfg_cov, poly_factor, dfg_factor, density, final_wt_reqd, qty_per_spool) -> dict:
+    """engine.ts calculateDualLayerWireInsulation."""
+    dia = np.asarray(dia, dtype=float)
+    poly_cov = np.asarray(poly_cov, dtype=float)
+    dfg_cov = np.asarray(dfg_cov, dtype=float)
+    density = np.asarray(density, dtype=float)
+    bare, poly_area = wire_areas(dia, poly_cov)
+    dfg_area = WIRE_AREA_K * (dia + poly_cov + dfg_cov) * (dia + poly_cov + dfg_cov)
+    poly_pct, dfg_pct, weight_after_poly, bare_wt_reqd, total_pct = _dual_layer(
+        bare, poly_area, dfg_area, poly_factor, dfg_factor, density, final_wt_reqd
+    )
+    meters, kg_hr, hours = _production(bare, density, qty_per_spool, bare_wt_reqd)
+    return _results(
+        bare_area=bare,
+        insulated_area=dfg_area,
+        bare_wt_reqd=bare_wt_reqd,
+        percent_increase=total_pct,
+        meters_per_spool=meters,
+        production_kg_hr=kg_hr,
+        total_hours_reqd=hours,
+        covered_width_or_dia=dia + poly_cov + dfg_cov,
+        poly_percent=poly_pct,
+        dfg_percent=dfg_pct,
+        weight_after_poly=weight_after_poly,
+    )
+
+
+def calculate_factor(width, thickness, covering, percentage_increase, density):
+    """
+    engine.ts calculateFactor. Unlike strip_factor, a zero covering is not
+    masked (inf / nan, as in the TS code).
+    """
+    bare, insulated = strip_areas(width, thickness, covering)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (bare * np.asarray(density, dtype=float) * np.asarray(percentage_increase, dtype=float)) / (
+            (insulated - bare) * 100
+        )
+
+
+def calculate_lme_copper(lme, sbi_rate) -> dict:
+    """engine.ts calculateLMECopper."""
+    lme_plus_premium = np.asarray(lme, dtype=float) + LME_PREMIUM
+    sbi_rate = np.asarray(sbi_rate, dtype=float)
+    return _results(
+        lme_plus_premium=lme_plus_premium,
+        csp_rate=(lme_plus_premium * LME_MULTIPLIER_CSP * sbi_rate + LME_HANDLING_CHARGES) / 1000,
+        wwmai_rate=(lme_plus_premium * LME_MULTIPLIER_WWMAI * sbi_rate + LME_HANDLING_CHARGES) / 1000,
+    )
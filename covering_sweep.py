@@ -0,0 +1,109 @@
+"""
+Covering-thickness sensitivity sweep for the reverse-engineered factor.
+
+Instead of editing COVERING_MM in add_factor_column.py and re-running the whole
+script per value, every row's factor is recomputed for a whole vector of
+coverings in one broadcast (rows x coverings), and the top-5 factor bins are
+ranked for every covering with one weighted bincount.
+
+Reliability weights are covering-independent, so they are computed once per
+family with factor_features (same scores as compute_top5_factor_labels).
+
+Output: compact table per family and sheet ('All' = family-level ranking used
+by the pipeline) with median factor and top-5 bins for every covering.
+
+Usage: python covering_sweep.py [min_mm] [max_mm] [step_mm] [out.csv]
+Example: python covering_sweep.py 0.30 0.80 0.05
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_phase1_master_workbook import BASE, SOURCE_FILES, SOURCE_SHEETS
+from calc_engine import strip_factor, wire_factor
+from factor_features import REL_WEIGHTS, bin_support, build_reliability_features, factor_bin_index, top_bins
+from solve_covering import sheet_arrays
+
+OUT_PATH = BASE / "covering_sensitivity.csv"
+DEFAULT_RANGE = (0.30, 0.80, 0.05)
+
+
+def covering_vector(lo, hi, step):
+    n = int(round((hi - lo) / step)) + 1
+    return np.round(lo + step * np.arange(n), 4)
+
+
+def factor_matrix(df: pd.DataFrame, is_wire: bool, coverings: np.ndarray) -> np.ndarray:
+    """(rows, coverings) reverse factor for one sheet, broadcast over the covering vector."""
+    a = sheet_arrays(df, is_wire)
+    cov = coverings[None, :]
+    if is_wire:
+        return wire_factor(a["dia"][:, None], cov, a["pct"][:, None], a["density"][:, None])
+    return strip_factor(a["width"][:, None], a["thickness"][:, None], cov, a["pct"][:, None], a["density"][:, None])
+
+
+def sweep_family(family: str, sheets: dict, coverings: np.ndarray) -> pd.DataFrame:
+    matrices = {name: factor_matrix(df, "Wire" in name, coverings) for name, df in sheets.items()}
+    # validity (pct, size, density present) does not depend on covering: use the first column
+    feats = build_reliability_features(sheets, {name: m[:, 0] for name, m in matrices.items()})
+    if len(feats["factor"]) == 0:
+        return pd.DataFrame()
+    reliability = feats["features"] @ REL_WEIGHTS
+
+    rows_f = np.empty((len(feats["factor"]), len(coverings)))
+    for name, df in sheets.items():
+        sel = feats["sheet"] == name
+        if sel.any():
+            rows_f[sel] = matrices[name][df.index.get_indexer(feats["index"][sel])]
+    bins = factor_bin_index(rows_f)
+
+    out = []
+    scopes = [("All", np.ones(len(rows_f), dtype=bool))] + [(s, feats["sheet"] == s) for s in sheets]
+    for scope, mask in scopes:
+        if not mask.any():
+            continue
+        ids, support, count = bin_support(bins[mask], reliability[mask])
+        ranked = top_bins(ids, support, count)
+        medians = np.median(rows_f[mask], axis=0)
+        for j, cov in enumerate(coverings):
+            top = ranked[j]
+            rec = {
+                "family": family,
+                "sheet": scope,
+                "covering_mm": float(cov),
+                "rows": int(mask.sum()),
+                "median_factor": round(float(medians[j]), 6),
+                "top1_share": round(top[0][1] / support[j].sum(), 4) if top and support[j].sum() > 0 else "",
+            }
+            for r in range(5):
+                rec[f"top{r + 1}"] = top[r][0] if r < len(top) else ""
+            out.append(rec)
+    return pd.DataFrame(out)
+
+
+def main():
+    lo, hi, step = (float(x) for x in sys.argv[1:4]) if len(sys.argv) > 3 else DEFAULT_RANGE
+    out_path = Path(sys.argv[4]) if len(sys.argv) > 4 else OUT_PATH
+    coverings = covering_vector(lo, hi, step)
+
+    tables = []
+    for family, path in SOURCE_FILES:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing source workbook: {path}")
+        xl = pd.ExcelFile(path)
+        sheets = {s: pd.read_excel(xl, sheet_name=s, dtype=str).fillna("") for s in SOURCE_SHEETS if s in xl.sheet_names}
+        tables.append(sweep_family(family, sheets, coverings))
+
+    table = pd.concat(tables, ignore_index=True)
+    table.to_csv(out_path, index=False)
+    print(f"Coverings: {coverings.tolist()}")
+    print(f"Saved: {out_path}")
+    family_view = table[table["sheet"] == "All"]
+    print(family_view[["family", "covering_mm", "median_factor", "top1", "top2", "top3", "top1_share"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Nearest-neighbour factor / likely % estimates for sizes with no production history.
+
+Each family workbook ({PREFIX}_Data.xlsx) is indexed per tab:
+- strips on (Width, Thickness) in mm
+- wires on diameter in mm (SWG via swg_to_mm)
+
+An unseen size is estimated from its k nearest observed size keys, weighted by
+inverse distance x the row reliability from compute_top5_factor_labels.
+
+Usage:
+  python estimate_missing_sizes.py <family> <size> <material>
+  python estimate_missing_sizes.py <family> --batch <price_list.csv> [out.csv]
+Example:
+  python estimate_missing_sizes.py DFG "9.50 X 2.40" Alu
+  python estimate_missing_sizes.py Poly --batch price_list.csv
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apply_markings_and_top5_factor import compute_top5_factor_labels, parse_num
+from build_phase1_master_workbook import SOURCE_FILES, SOURCE_SHEETS
+from run_insulation_pipeline import swg_to_mm
+
+K_NEIGHBOURS = 4
+QUERY_CHUNK = 4096
+EXACT_TOL_MM = 1e-6
+
+STRIP_RE = re.compile(r"^(\d+\.?\d*)\s*[X×*]\s*(\d+\.?\d*)$", re.IGNORECASE)
+WIRE_MM_RE = re.compile(r"^(\d+\.?\d*)\s*mm$", re.IGNORECASE)
+WIRE_SWG_RE = re.compile(r"^(\d+/0|\d+)\s*swg$", re.IGNORECASE)
+
+
+def parse_size_text(text):
+    """
+    Parse a quoted size such as '4.50 X 2', '5.60 mm' or '9 swg'.
+    Returns (shape, coords) with shape 'Strip'/'Wire', or (None, None).
+    """
+    s = str(text or "").strip()
+    m = STRIP_RE.match(s)
+    if m:
+        return "Strip", (float(m.group(1)), float(m.group(2)))
+    m = WIRE_MM_RE.match(s)
+    if m:
+        return "Wire", (float(m.group(1)),)
+    m = WIRE_SWG_RE.match(s)
+    if m:
+        dia = swg_to_mm(m.group(1))
+        return ("Wire", (dia,)) if dia is not None else (None, None)
+    return None, None
+
+
+def sheet_for(shape, material):
+    mat = "Aluminium" if str(material).strip().upper().startswith("AL") else "Copper"
+    return f"{mat} {shape}s"
+
+
+def row_coords(row, is_wire):
+    if is_wire:
+        raw = row.get("Wire Value")
+        if str(row.get("Wire Unit", "")).strip().upper() == "SWG":
+            dia = swg_to_mm(raw)
+        else:
+            dia = parse_num(raw)
+        return None if dia is None else (dia,)
+    w = parse_num(row.get("Width"))
+    t = parse_num(row.get("Thickness"))
+    return None if w is None or t is None else (w, t)
+
+
+class SizeIndex:
+    """
+    Reliability-weighted kNN over observed size keys of one tab.
+    Queries are answered in vectorised chunks, so batch lookups of a full price
+    list cost one distance matrix per chunk rather than one scan per size.
+    """
+
+    def __init__(self, keys, coords, factor, likely, weight):
+        self.keys = np.asarray(keys, dtype=object)
+        self.coords = np.asarray(coords, dtype=float)
+        self.factor = np.asarray(factor, dtype=float)
+        self.likely = np.asarray(likely, dtype=float)
+        self.weight = np.asarray(weight, dtype=float)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_sheet(cls, df: pd.DataFrame, reliability: dict, is_wire: bool):
+        """Collapse rows to one point per Size Key (reliability-weighted factor)."""
+        acc = {}
+        for idx, row in df.iterrows():
+            factor = parse_num(row.get("factor"))
+            likely = parse_num(row.get("Likely Insulation % Increase"))
+            coords = row_coords(row, is_wire)
+            if factor is None or coords is None:
+                continue
+            w = max(reliability.get(idx, 0.0), 1e-6)
+            key = str(row.get("Size Key", row.get("Size", ""))).strip()
+            a = acc.setdefault(key, {"coords": coords, "fw": 0.0, "w": 0.0, "likely": likely})
+            a["fw"] += factor * w
+            a["w"] += w
+            if a["likely"] is None:
+                a["likely"] = likely
+
+        keys = list(acc)
+        dims = 1 if is_wire else 2
+        coords = np.array([acc[k]["coords"] for k in keys], dtype=float).reshape(-1, dims)
+        factor = [acc[k]["fw"] / acc[k]["w"] for k in keys]
+        likely = [np.nan if acc[k]["likely"] is None else acc[k]["likely"] for k in keys]
+        weight = [acc[k]["w"] for k in keys]
+        return cls(keys, coords, factor, likely, weight)
+
+    def query(self, points, k=K_NEIGHBOURS):
+        """Return (distances, indices) of the k nearest size keys, nearest first."""
+        pts = np.asarray(points, dtype=float).reshape(-1, self.coords.shape[1])
+        k = min(k, len(self))
+        dist_out = np.empty((len(pts), k))
+        idx_out = np.empty((len(pts), k), dtype=np.intp)
+        for start in range(0, len(pts), QUERY_CHUNK):
+            chunk = pts[start : start + QUERY_CHUNK]
+            d2 = ((chunk[:, None, :] - self.coords[None, :, :]) ** 2).sum(axis=2)
+            if k < len(self):
+                part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(k), (len(chunk), k))
+            part_d2 = np.take_along_axis(d2, part, axis=1)
+            order = np.argsort(part_d2, axis=1, kind="stable")
+            idx_out[start : start + len(chunk)] = np.take_along_axis(part, order, axis=1)
+            dist_out[start : start + len(chunk)] = np.sqrt(np.take_along_axis(part_d2, order, axis=1))
+        return dist_out, idx_out
+
+    def estimate(self, points, k=K_NEIGHBOURS) -> pd.DataFrame:
+        """Inverse-distance x reliability weighted factor and likely % per query point."""
+        n = len(np.asarray(points).reshape(-1, self.coords.shape[1]))
+        if len(self) == 0:
+            return pd.DataFrame(
+                {
+                    "est_factor": np.full(n, np.nan),
+                    "est_likely_pct": np.full(n, np.nan),
+                    "nearest_size_key": [""] * n,
+                    "nearest_distance_mm": np.full(n, np.nan),
+                    "neighbours_used": np.zeros(n, dtype=int),
+                    "exact_match": np.zeros(n, dtype=bool),
+                }
+            )
+        dist, idx = self.query(points, k)
+        exact = dist[:, 0] <= EXACT_TOL_MM
+        w = self.weight[idx] / np.maximum(dist, EXACT_TOL_MM)
+        # exact hits use only the observed key itself
+        w[exact] = 0.0
+        w[exact, 0] = 1.0
+
+        factor = (w * self.factor[idx]).sum(axis=1) / w.sum(axis=1)
+        likely_vals = self.likely[idx]
+        lw = np.where(np.isnan(likely_vals), 0.0, w)
+        lw_sum = lw.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            likely = np.where(lw_sum > 0, (lw * np.nan_to_num(likely_vals)).sum(axis=1) / lw_sum, np.nan)
+
+        return pd.DataFrame(
+            {
+                "est_factor": np.round(factor, 6),
+                "est_likely_pct": np.round(likely, 6),
+                "nearest_size_key": self.keys[idx[:, 0]],
+                "nearest_distance_mm": np.round(dist[:, 0], 4),
+                "neighbours_used": np.where(exact, 1, idx.shape[1]),
+                "exact_match": exact,
+            }
+        )
+
+
+def build_family_indexes(path: Path) -> dict:
+    """Read one family workbook and return {sheet_name: SizeIndex}."""
+    sheets = {}
+    xl = pd.ExcelFile(path)
+    for s in SOURCE_SHEETS:
+        if s in xl.sheet_names:
+            sheets[s] = pd.read_excel(path, sheet_name=s, dtype=str).fillna("")
+    label_data, _ = compute_top5_factor_labels(sheets)
+    reliability = label_data.get("reliability", {})
+
+    indexes = {}
+    for name, df in sheets.items():
+        rel = {idx: val for (s, idx), val in reliability.items() if s == name}
+        indexes[name] = SizeIndex.from_sheet(df, rel, "Wire" in name)
+    return indexes
+
+
+def estimate_price_list(indexes: dict, price_df: pd.DataFrame, k=K_NEIGHBOURS) -> pd.DataFrame:
+    """
+    Batch mode: price_df needs 'Size' and 'Material' columns.
+    Rows are grouped per target tab so each tab answers one vectorised query.
+    """
+    out = price_df.copy()
+    for col in ["est_factor", "est_likely_pct", "nearest_size_key", "nearest_distance_mm", "neighbours_used", "exact_match"]:
+        out[col] = pd.Series("", index=out.index, dtype=object)
+
+    targets = {}
+    for idx, row in price_df.iterrows():
+        shape, coords = parse_size_text(row.get("Size"))
+        if shape is None:
+            continue
+        targets.setdefault(sheet_for(shape, row.get("Material", "")), []).append((idx, coords))
+
+    for sheet, items in targets.items():
+        index = indexes.get(sheet)
+        if index is None or len(index) == 0:
+            continue
+        est = index.estimate([c for _, c in items], k)
+        est.index = [i for i, _ in items]
+        for col in est.columns:
+            out.loc[est.index, col] = est[col].values
+    return out
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python estimate_missing_sizes.py <family> <size> <material>")
+        print("       python estimate_missing_sizes.py <family> --batch <price_list.csv> [out.csv]")
+        sys.exit(1)
+
+    family = sys.argv[1]
+    workbooks = dict(SOURCE_FILES)
+    if family not in workbooks:
+        raise ValueError(f"Unknown family: {family} (expected one of {', '.join(workbooks)})")
+    path = workbooks[family]
+    if not path.exists():
+        raise FileNotFoundError(f"Missing source workbook: {path}")
+    indexes = build_family_indexes(path)
+
+    if sys.argv[2] == "--batch":
+        in_path = Path(sys.argv[3])
+        out_path = Path(sys.argv[4]) if len(sys.argv) > 4 else in_path.with_name(f"{in_path.stem}_estimated.csv")
+        price_df = pd.read_csv(in_path, dtype=str).fillna("")
+        result = estimate_price_list(indexes, price_df)
+        result.to_csv(out_path, index=False)
+        filled = result["est_factor"].astype(str).str.strip().ne("").sum()
+        print(f"Estimated {filled}/{len(result)} sizes -> {out_path}")
+        return
+
+    size, material = sys.argv[2], sys.argv[3]
+    shape, coords = parse_size_text(size)
+    if shape is None:
+        raise ValueError(f"Could not parse size: {size}")
+    sheet = sheet_for(shape, material)
+    est = indexes[sheet].estimate([coords]).iloc[0]
+    print(f"{family} / {sheet} / {size}")
+    for col, val in est.items():
+        print(f"  {col}: {val}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,24 +10,16 @@ Output:
   1. DFG_Aluminium_Strips.csv - sorted by Width asc, Thickness asc
   2. DFG_Copper_Strips.csv   - sorted by Width asc, Thickness asc
   3. DFG_Wires.csv           - sorted by MM asc first, then SWG asc
+  4. DFG_parse_report.json   - ParseStats counters, per-page timing, rejected samples
 """
 
-import pdfplumber
 import pandas as pd
 import re
 import os
+import sys
+import time
 
-
-def extract_all_lines(pdf_path: str) -> list[str]:
-    """Extract all text lines from all pages of the PDF."""
-    all_lines = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                for line in text.split('\n'):
-                    all_lines.append(line.strip())
-    return all_lines
+from extract_insulation_pdf import ParsedRow, ParseStats, iter_page_lines, report_summary, sorted_partitions
 
 
 def is_month_header(line: str) -> str | None:
@@ -53,17 +45,23 @@ def is_header_line(line: str) -> bool:
     return False
 
 
-def parse_data_line(line: str, current_month: str) -> dict | None:
-    """Parse a single data line into a structured dict with ALL columns."""
+def parse_data_line(line: str, current_month: str, stats: ParseStats | None = None) -> ParsedRow | None:
+    """Parse a single data line into a ParsedRow with ALL columns (rejections counted in stats)."""
     if not line or is_header_line(line):
+        if stats is not None:
+            stats.reject('header' if line else 'empty', line)
         return None
 
     # Must contain DFG and a material marker
     if 'DFG' not in line.upper():
+        if stats is not None:
+            stats.reject('no_keyword', line)
         return None
 
     material_match = re.search(r'\b(Alu|Cop|ALU|COP)\b', line)
     if not material_match:
+        if stats is not None:
+            stats.reject('no_material', line)
         return None
 
     material_pos = material_match.start()
@@ -73,6 +71,8 @@ def parse_data_line(line: str, current_month: str) -> dict | None:
     # Split line into: before-DFG | DFG | between-DFG-and-material | material | after-material
     dfg_match = re.search(r'\bDFG\b', line)
     if not dfg_match:
+        if stats is not None:
+            stats.reject('no_keyword', line)
         return None
 
     before_dfg = line[:dfg_match.start()].strip()
@@ -145,6 +145,8 @@ def parse_data_line(line: str, current_month: str) -> dict | None:
         size_type = 'Wire'
     else:
         print(f"  [WARN] Could not parse size from: '{before_dfg}' in line: {line}")
+        if stats is not None:
+            stats.reject('no_size', line)
         return None
 
     # --- Parse insulation thickness values from between DFG and material ---
@@ -208,28 +210,31 @@ def parse_data_line(line: str, current_month: str) -> dict | None:
         final_qty = tokens[1]
     elif len(tokens) == 1:
         bare_wt = tokens[0]
-
-    return {
-        'Month': current_month,
-        'Covering_No': serial_no,
-        'Size': size_raw,
-        'Size_Type': size_type,
-        'Width': width,
-        'Thickness': thickness,
-        'Wire_Value': wire_value,
-        'Wire_Unit': wire_unit,
-        'Type_of_Insulation': 'DFG',
-        'Insulation_1': ins1,
-        'Insulation_2': ins2,
-        'Total_Insulation': total_ins,
-        'Material': material,
-        'Actual_Bare_Wt_kg': bare_wt,
-        'Final_Dis_Qty': final_qty,
-        'Insulation_Wt': ins_wt,
-        'Scrap': scrap,
-        'Insulation_Pct': ins_pct,
-        'Invoice_No_GST2526': invoice_no,
-    }
+    if stats is not None:
+        stats.counts[f'tail_tokens_{len(tokens)}'] += 1
+
+    intern = sys.intern
+    return ParsedRow(
+        Month=current_month,
+        Covering_No=serial_no,
+        Size=intern(size_raw),
+        Size_Type=size_type,
+        Width=intern(width),
+        Thickness=intern(thickness),
+        Wire_Value=intern(wire_value),
+        Wire_Unit=wire_unit,
+        Type_of_Insulation='DFG',
+        Insulation_1=intern(ins1),
+        Insulation_2=intern(ins2),
+        Total_Insulation=intern(total_ins),
+        Material=material,
+        Actual_Bare_Wt_kg=bare_wt,
+        Final_Dis_Qty=final_qty,
+        Insulation_Wt=ins_wt,
+        Scrap=scrap,
+        Insulation_Pct=ins_pct,
+        Invoice_No_GST2526=invoice_no,
+    )
 
 
 def main():
@@ -239,59 +244,45 @@ def main():
         print(f"Error: PDF file not found at {pdf_path}")
         return
 
-    print("Step 1: Extracting text from PDF...")
-    lines = extract_all_lines(pdf_path)
-    print(f"  Total lines extracted: {len(lines)}")
-
-    print("Step 2: Parsing data lines...")
+    print("Step 1-2: Extracting and parsing data lines page by page...")
+    stats = ParseStats()
     current_month = ''
     all_entries = []
 
-    for line in lines:
-        month = is_month_header(line)
-        if month:
-            current_month = month
-            print(f"  Month: {current_month}")
-            continue
-
-        if is_header_line(line):
-            continue
-
-        entry = parse_data_line(line, current_month)
-        if entry:
-            all_entries.append(entry)
+    started = mark = time.perf_counter()
+    for page_no, lines in enumerate(iter_page_lines(pdf_path), 1):
+        parse_start = time.perf_counter()
+        page_rows = len(all_entries)
+        for line in lines:
+            month = is_month_header(line)
+            if month:
+                stats.counts['month_headers'] += 1
+                current_month = sys.intern(month)
+                print(f"  Month: {current_month}")
+                continue
+
+            if is_header_line(line):
+                stats.counts['header_skips'] += 1
+                continue
+
+            entry = parse_data_line(line, current_month, stats)
+            if entry:
+                all_entries.append(entry)
+        done = time.perf_counter()
+        stats.page(page_no, len(lines), len(all_entries) - page_rows, parse_start - mark, done - parse_start)
+        mark = done
+    stats.counts['rows'] += len(all_entries)
+    stats.seconds = time.perf_counter() - started
+    print(f"  Total lines extracted: {stats.counts['lines']}")
 
     print(f"\n  Total entries parsed: {len(all_entries)}")
 
     # Create master DataFrame
-    df = pd.DataFrame(all_entries)
-
-    # Split into categories
-    strips = df[df['Size_Type'] == 'Strip'].copy()
-    wires = df[df['Size_Type'] == 'Wire'].copy()
+    df = pd.DataFrame.from_records(all_entries, columns=ParsedRow._fields)
 
-    al_strips = strips[strips['Material'] == 'Aluminium'].copy()
-    cu_strips = strips[strips['Material'] == 'Copper'].copy()
-
-    # Convert Width/Thickness to float for sorting
-    al_strips['Width'] = al_strips['Width'].astype(float)
-    al_strips['Thickness'] = al_strips['Thickness'].astype(float)
-    al_strips = al_strips.sort_values(['Width', 'Thickness']).reset_index(drop=True)
-
-    cu_strips['Width'] = cu_strips['Width'].astype(float)
-    cu_strips['Thickness'] = cu_strips['Thickness'].astype(float)
-    cu_strips = cu_strips.sort_values(['Width', 'Thickness']).reset_index(drop=True)
-
-    # Sort wires: mm first (ascending), then SWG (ascending)
-    def wire_sort_key(row):
-        if row['Wire_Unit'] == 'mm':
-            return (0, float(row['Wire_Value']), 0)
-        else:  # SWG
-            return (1, 0, float(row['Wire_Value']))
-
-    wires['_sort'] = wires.apply(wire_sort_key, axis=1)
-    wires = wires.sort_values('_sort').reset_index(drop=True)
-    wires = wires.drop(columns=['_sort'])
+    # Split into categories and sort (strips: Width, Thickness; wires: mm first, then SWG)
+    parts = sorted_partitions(df)
+    al_strips, cu_strips, wires = parts['al_strips'], parts['cu_strips'], parts['wires']
 
     # Define output columns
     strip_cols = [
@@ -325,10 +316,15 @@ def main():
     print(f"    - Copper       : {len(wires[wires['Material'] == 'Copper'])}")
     print(f"  TOTAL            : {len(all_entries)} entries")
 
+    report_path = os.path.join(output_dir, 'DFG_parse_report.json')
+    report = stats.write(report_path, pdf=os.path.basename(pdf_path), prefix='DFG', method='text', backend='pdfplumber')
+    print(f"  Parse: {report_summary(report)}")
+
     print("\n  Files saved:")
     print(f"    - DFG_Aluminium_Strips.csv ({len(al_strips)} rows)")
     print(f"    - DFG_Copper_Strips.csv ({len(cu_strips)} rows)")
     print(f"    - DFG_Wires.csv ({len(wires)} rows)")
+    print("    - DFG_parse_report.json")
 
     # Verification: print first few rows of each
     print("\n" + "=" * 60)
@@ -3,10 +3,18 @@ Universal extractor for insulation PDFs (poly, poly cotton, polydfg, poly paper,
 Extracts all columns, preserves structure, outputs 4 CSVs per PDF.
 """
 
+import json
 import os
 import re
+import sys
+import time
+from array import array
+from collections import Counter
+from hashlib import blake2b
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
 import pandas as pd
 import pdfplumber
 
@@ -29,18 +37,282 @@ INSULATION_KEYWORDS = [
     "Paper",
     "Cotton",
 ]
-
-
-def extract_all_lines(pdf_path: str) -> list[str]:
-    """Extract all text lines from all pages of the PDF."""
-    all_lines = []
+# Fuzzy fallback for unseen OCR variants ("Polyestr", "Cottom"): alphabetic
+# keywords of at least FUZZY_MIN_LEN letters match a line token within an edit
+# budget of 1 (2 from FUZZY_WIDE_LEN letters). Shorter codes (EN, Mpc, DFG) stay exact.
+FUZZY_MIN_LEN = 4
+FUZZY_WIDE_LEN = 8
+
+# Column header words (consecutive on one header line) that locate each x-band
+# for word-based extraction; band edges are midpoints between header centres.
+COLUMN_ANCHORS = [
+    ("Covering_No", ["No."]),
+    ("Invoice_Date", ["Invoice", "Date"]),
+    ("Size", ["Size"]),
+    ("Type_of_Insulation", ["Type", "of"]),
+    ("Insulation_1", ["Insulation", "-1"]),
+    ("Insulation_2", ["Insulation", "-", "2"]),
+    ("Total_Insulation", ["Total", "Insulation"]),
+    ("Material", ["Alu", "/", "Cop"]),
+    ("Actual_Bare_Wt_kg", ["Actual", "Bare", "wt"]),
+    ("Final_Dis_Qty", ["Final", "Dis.Qty."]),
+    ("Insulation_Wt", ["Insulation", "wt"]),
+    ("Scrap", ["Scrap"]),
+    ("Insulation_Pct", ["Per", "%"]),
+    ("Invoice_No_GST2526", ["GST2526-"]),
+]
+LINE_TOLERANCE = 3.0
+# pypdfium2 inserts generated spaces between glyphs; only gaps wider than this split words
+GENERATED_SPACE_GAP = 1.5
+# Rejected lines kept per reason in the parse report
+REJECT_SAMPLES = 5
+# Per-family seen set of row digests (RowDeduper.save / load)
+ROW_HASHES_NAME = "{prefix}_row_hashes.bin"
+# Fields that identify a production row for duplicate detection (Size_Type,
+# Width, Thickness and Wire_* are derived from Size)
+DEDUPE_FIELDS = (
+    "Month",
+    "Invoice_No_GST2526",
+    "Size",
+    "Material",
+    "Type_of_Insulation",
+    "Covering_No",
+    "Insulation_1",
+    "Insulation_2",
+    "Total_Insulation",
+    "Actual_Bare_Wt_kg",
+    "Final_Dis_Qty",
+    "Insulation_Wt",
+    "Scrap",
+    "Insulation_Pct",
+)
+MONTHS = {
+    m: i + 1
+    for i, m in enumerate(
+        [
+            "january", "february", "march", "april", "may", "june",
+            "july", "august", "september", "october", "november", "december",
+        ]
+    )
+}
+
+
+class ParsedRow(NamedTuple):
+    """One parsed production entry (fields in CSV column order, all strings)."""
+
+    Month: str
+    Covering_No: str
+    Size: str
+    Size_Type: str
+    Width: str
+    Thickness: str
+    Wire_Value: str
+    Wire_Unit: str
+    Type_of_Insulation: str
+    Insulation_1: str
+    Insulation_2: str
+    Total_Insulation: str
+    Material: str
+    Actual_Bare_Wt_kg: str
+    Final_Dis_Qty: str
+    Insulation_Wt: str
+    Scrap: str
+    Insulation_Pct: str
+    Invoice_No_GST2526: str
+
+
+def _pages_pdfplumber(pdf_path: str):
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
-            if text:
-                for line in text.split("\n"):
-                    all_lines.append(line.strip())
-    return all_lines
+            yield [line.strip() for line in text.split("\n")] if text else []
+
+
+def _pages_pypdfium2(pdf_path: str):
+    """
+    Same lines as extract_text, rebuilt from pdfium char boxes: chars join a word
+    while on the same baseline and within LINE_TOLERANCE of the previous glyph;
+    spaces in the PDF split words, spaces pdfium inserts only when the gap
+    exceeds GENERATED_SPACE_GAP.
+    """
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for page in pdf:
+            height = page.get_height()
+            textpage = page.get_textpage()
+            n = textpage.count_chars()
+            words = []  # [top, x0, x1, chars, last_char_x0]
+            cur, generated = None, False
+            for i, ch in enumerate(textpage.get_text_range(0, n)[:n]):
+                if ch.isspace():
+                    if pdfium_c.FPDFText_IsGenerated(textpage.raw, i):
+                        generated = True
+                    else:
+                        cur = None
+                    continue
+                top = height - textpage.get_charbox(i, loose=True)[3]
+                x0, _, x1, _ = textpage.get_charbox(i)
+                gap = GENERATED_SPACE_GAP if generated else LINE_TOLERANCE
+                generated = False
+                if cur and abs(top - cur[0]) <= LINE_TOLERANCE and cur[4] <= x0 <= cur[2] + gap:
+                    cur[2], cur[4] = x1, x0
+                    cur[3].append(ch)
+                else:
+                    cur = [top, x0, x1, [ch], x0]
+                    words.append(cur)
+            textpage.close()
+            page.close()
+
+            lines = []
+            for word in sorted(words, key=lambda w: w[0]):
+                if lines and word[0] - lines[-1][-1][0] <= LINE_TOLERANCE:
+                    lines[-1].append(word)
+                else:
+                    lines.append([word])
+            yield [" ".join("".join(w[3]) for w in sorted(line, key=lambda w: w[1])) for line in lines]
+    finally:
+        pdf.close()
+
+
+# backend -> generator of per-page line lists
+LINE_BACKENDS = {
+    "pdfplumber": _pages_pdfplumber,
+    "pypdfium2": _pages_pypdfium2,
+}
+
+
+def iter_page_lines(pdf_path: str, backend: str = "pdfplumber"):
+    """Yield the text lines of each page, in page order, with the given LINE_BACKENDS entry."""
+    if backend not in LINE_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    return LINE_BACKENDS[backend](pdf_path)
+
+
+def extract_all_lines(pdf_path: str, backend: str = "pdfplumber") -> list[str]:
+    """Extract all text lines from all pages of the PDF with the given LINE_BACKENDS entry."""
+    return [line for lines in iter_page_lines(pdf_path, backend) for line in lines]
+
+
+class ParseStats:
+    """
+    Counters for every branch of the line parser, per-page timing and a few
+    rejected lines per reason. Counting is one dict increment per branch taken,
+    so it stays on for every parse.
+
+    counts: lines, month_headers, header_skips, skipped_month_lines, rows,
+    rejects by reason (empty, header, no_material, no_keyword, no_size,
+    duplicate), duplicate_kept (repeats flagged but not dropped) and the
+    numeric tail shape of parsed rows (tail_tokens_<n>; 5 = all columns,
+    4 = Scrap missing). fuzzy_keyword counts keywords recovered by the fuzzy
+    fallback; fuzzy_variants lists each variant seen, as alias candidates.
+    """
+
+    REJECT_REASONS = ("empty", "header", "no_material", "no_keyword", "no_size", "duplicate")
+
+    def __init__(self, sample_size: int = REJECT_SAMPLES):
+        self.counts = Counter()
+        self.pages = []
+        self.samples = {}
+        self.fuzzy_variants = Counter()
+        self.sample_size = sample_size
+        self.seconds = 0.0
+
+    def reject(self, reason: str, line: str):
+        self.counts[reason] += 1
+        kept = self.samples.setdefault(reason, [])
+        if len(kept) < self.sample_size:
+            kept.append(line)
+
+    def fuzzy(self, variant: str, keyword: str):
+        self.counts["fuzzy_keyword"] += 1
+        self.fuzzy_variants[f"{variant} -> {keyword}"] += 1
+
+    def page(self, page_no: int, lines: int, rows: int, extract_s: float, parse_s: float):
+        self.counts["lines"] += lines
+        self.pages.append(
+            {"page": page_no, "lines": lines, "rows": rows, "extract_s": round(extract_s, 6), "parse_s": round(parse_s, 6)}
+        )
+
+    def report(self, **meta) -> dict:
+        counts = dict(sorted(self.counts.items()))
+        extract_s = sum(p["extract_s"] for p in self.pages)
+        parse_s = sum(p["parse_s"] for p in self.pages)
+        return {
+            **meta,
+            "seconds": round(self.seconds, 6),
+            "pages": len(self.pages),
+            "pages_per_sec": round(len(self.pages) / self.seconds, 2) if self.seconds and self.pages else None,
+            "extract_s": round(extract_s, 6),
+            "parse_s": round(parse_s, 6),
+            "rows": counts.get("rows", 0),
+            "rejected": sum(counts.get(r, 0) for r in self.REJECT_REASONS),
+            "counts": counts,
+            "slowest_pages": sorted(self.pages, key=lambda p: -(p["extract_s"] + p["parse_s"]))[:5],
+            "per_page": self.pages,
+            "rejected_samples": self.samples,
+            "fuzzy_variants": dict(self.fuzzy_variants.most_common()),
+        }
+
+    def write(self, path: str, **meta) -> dict:
+        report = self.report(**meta)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        return report
+
+
+class RowDeduper:
+    """
+    Streaming exact-duplicate filter over parsed rows (page-break repeats,
+    months exported into two PDFs). Each row is reduced to an 8-byte blake2b
+    digest of its normalized DEDUPE_FIELDS (month as month_key, whitespace
+    removed, upper case, trailing decimal zeros dropped); the seen set holds
+    only digests, so a check is O(1) and the saved set is 8 bytes per row.
+    drop=False keeps repeats and only counts them.
+    """
+
+    def __init__(self, digests=(), drop: bool = True):
+        self.seen = set(digests)
+        self.drop = drop
+
+    @classmethod
+    def load(cls, path: str, drop: bool = True) -> "RowDeduper":
+        """Seen set saved by save(); a missing file gives an empty set."""
+        digests = array("Q")
+        if os.path.exists(path):
+            with open(path, "rb") as fh:
+                digests.frombytes(fh.read())
+        return cls(digests, drop)
+
+    def save(self, path: str):
+        with open(path, "wb") as fh:
+            array("Q", sorted(self.seen)).tofile(fh)
+
+    @staticmethod
+    def digest(row: ParsedRow) -> int:
+        parts = []
+        for field in DEDUPE_FIELDS:
+            raw = str(getattr(row, field))
+            value = "".join(raw.split()).upper()
+            if field == "Month":
+                value = month_key(raw) or value
+            elif "." in value and value.replace(".", "", 1).isdigit():
+                value = value.rstrip("0").rstrip(".")
+            parts.append(value)
+        return int.from_bytes(blake2b("\x1f".join(parts).encode(), digest_size=8).digest(), "little")
+
+    def seen_before(self, row: ParsedRow) -> bool:
+        """True for a repeat; otherwise the row is added to the seen set."""
+        key = self.digest(row)
+        if key in self.seen:
+            return True
+        self.seen.add(key)
+        return False
+
+    def __len__(self):
+        return len(self.seen)
 
 
 def is_month_header(line: str) -> str | None:
@@ -52,6 +324,14 @@ def is_month_header(line: str) -> str | None:
     return None
 
 
+def month_key(month: str) -> str:
+    """'June Month 2025' / 'August 2025' -> '2025-06' / '2025-08' (sortable)."""
+    m = re.match(r"^\s*([A-Za-z]+)\D*(\d{4})", str(month or ""))
+    if not m or m.group(1).lower() not in MONTHS:
+        return ""
+    return f"{m.group(2)}-{MONTHS[m.group(1).lower()]:02d}"
+
+
 def is_header_line(line: str) -> bool:
     """Detect repeated header lines to skip."""
     skip_patterns = [
@@ -68,17 +348,109 @@ def is_header_line(line: str) -> bool:
     return False
 
 
+KEYWORD_PATTERNS = [(kw, re.compile(rf"(?<![A-Z0-9]){re.escape(kw.upper())}(?![A-Z0-9])")) for kw in INSULATION_KEYWORDS]
+WORD_TOKEN = re.compile(r"(?<![A-Z0-9])[A-Z]+(?![A-Z0-9])")
+
+
 def find_insulation_keyword(line: str) -> tuple[str | None, int, int]:
     """Return (keyword, start, end) or (None, 0, 0)."""
     line_upper = line.upper()
-    for kw in INSULATION_KEYWORDS:
-        pattern = rf"(?<![A-Z0-9]){re.escape(kw.upper())}(?![A-Z0-9])"
-        m = re.search(pattern, line_upper)
+    for kw, pattern in KEYWORD_PATTERNS:
+        m = pattern.search(line_upper)
         if m:
             return (kw, m.start(), m.end())
     return (None, 0, 0)
 
 
+def fuzzy_budget(word: str) -> int:
+    if not word.isalpha() or len(word) < FUZZY_MIN_LEN:
+        return 0
+    return 2 if len(word) >= FUZZY_WIDE_LEN else 1
+
+
+def deletes(word: str, depth: int) -> set[str]:
+    """word and every string reachable from it by up to depth character deletions."""
+    out, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def build_fuzzy_index(keywords: list[str]) -> dict[str, list[str]]:
+    """
+    Deletion-neighbourhood index: every deletion variant of each fuzzy keyword
+    (within its budget) -> keywords in INSULATION_KEYWORDS order. Two words
+    within edit distance k share a variant with at most k deletions each.
+    """
+    index = {}
+    for kw in keywords:
+        budget = fuzzy_budget(kw)
+        for variant in deletes(kw.upper(), budget) if budget else ():
+            index.setdefault(variant, []).append(kw)
+    return index
+
+
+FUZZY_INDEX = build_fuzzy_index(INSULATION_KEYWORDS)
+FUZZY_MAX_BUDGET = max(map(fuzzy_budget, INSULATION_KEYWORDS))
+FUZZY_LENGTHS = (
+    min(len(kw) - fuzzy_budget(kw) for kw in INSULATION_KEYWORDS if fuzzy_budget(kw)),
+    max(len(kw) + fuzzy_budget(kw) for kw in INSULATION_KEYWORDS if fuzzy_budget(kw)),
+)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (insert, delete, substitute, swap adjacent)."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def find_fuzzy_keyword(line: str) -> tuple[str | None, int, int]:
+    """
+    Fallback when find_insulation_keyword finds nothing: the line token closest
+    to a fuzzy keyword within its budget (ties: keyword order, then leftmost).
+    Each token costs a bounded number of index lookups, so a line is O(length).
+    Return (keyword, start, end) or (None, 0, 0).
+    """
+    best = None
+    lo, hi = FUZZY_LENGTHS
+    for m in WORD_TOKEN.finditer(line.upper()):
+        token = m.group()
+        if not lo <= len(token) <= hi:
+            continue
+        candidates = {kw for variant in deletes(token, FUZZY_MAX_BUDGET) for kw in FUZZY_INDEX.get(variant, ())}
+        for kw in candidates:
+            budget = fuzzy_budget(kw)
+            if abs(len(token) - len(kw)) > budget:
+                continue
+            dist = edit_distance(token, kw.upper())
+            if dist <= budget:
+                rank = (dist, INSULATION_KEYWORDS.index(kw), m.start())
+                if best is None or rank < best[0]:
+                    best = (rank, kw, m.start(), m.end())
+    if best is None:
+        return (None, 0, 0)
+    return (best[1], best[2], best[3])
+
+
+def match_insulation_keyword(text: str, stats: ParseStats | None = None) -> tuple[str | None, int, int]:
+    """Exact keyword match, else the fuzzy fallback (counted as fuzzy_keyword with its variant)."""
+    kw, start, end = find_insulation_keyword(text)
+    if kw:
+        return (kw, start, end)
+    kw, start, end = find_fuzzy_keyword(text)
+    if kw and stats is not None:
+        stats.fuzzy(text[start:end], kw)
+    return (kw, start, end)
+
+
 def normalize_insulation_type(raw_kw: str, full_line: str) -> str:
     """
     Normalize OCR/coded insulation markers to semantic insulation labels.
@@ -181,21 +553,32 @@ def parse_size_from_before(before: str) -> tuple[str, str, str, str, str, str]:
     return serial_no, size_raw, size_type, width, thickness, wire_value, wire_unit
 
 
-def parse_data_line(line: str, current_month: str) -> dict | None:
-    """Parse a single data line into a structured dict."""
+def parse_data_line(line: str, current_month: str, stats: ParseStats | None = None) -> ParsedRow | None:
+    """
+    Parse a single data line into a ParsedRow.
+    Low-cardinality strings (size, type, insulation tokens) are interned so
+    repeated values share one object across rows.
+    With stats, the rejection reason or the numeric tail shape is counted.
+    """
     if not line or is_header_line(line):
+        if stats is not None:
+            stats.reject("header" if line else "empty", line)
         return None
 
     material_match = re.search(r"\b(Alu|Cop|ALU|COP)\b", line)
     if not material_match:
+        if stats is not None:
+            stats.reject("no_material", line)
         return None
 
     material_pos = material_match.start()
     material_raw = material_match.group(1)
     material = "Aluminium" if material_raw.upper() == "ALU" else "Copper"
 
-    kw, kw_start, kw_end = find_insulation_keyword(line)
+    kw, kw_start, kw_end = match_insulation_keyword(line, stats)
     if not kw:
+        if stats is not None:
+            stats.reject("no_keyword", line)
         return None
 
     before = line[:kw_start].strip()
@@ -205,6 +588,8 @@ def parse_data_line(line: str, current_month: str) -> dict | None:
     result = parse_size_from_before(before)
     serial_no, size_raw, size_type, width, thickness, wire_value, wire_unit = result
     if not size_raw:
+        if stats is not None:
+            stats.reject("no_size", line)
         return None
 
     # Parse insulation tokens
@@ -231,58 +616,332 @@ def parse_data_line(line: str, current_month: str) -> dict | None:
     if len(tokens) == 4:
         scrap = ""
         ins_pct = tokens[3]
+    if stats is not None:
+        stats.counts[f"tail_tokens_{len(tokens)}"] += 1
+
+    intern = sys.intern
+    return ParsedRow(
+        Month=current_month,
+        Covering_No=serial_no,
+        Size=intern(size_raw),
+        Size_Type=size_type,
+        Width=intern(width),
+        Thickness=intern(thickness),
+        Wire_Value=intern(wire_value),
+        Wire_Unit=wire_unit,
+        Type_of_Insulation=intern(normalize_insulation_type(kw, line)),
+        Insulation_1=intern(ins1),
+        Insulation_2=intern(ins2),
+        Total_Insulation=intern(total_ins),
+        Material=material,
+        Actual_Bare_Wt_kg=bare_wt,
+        Final_Dis_Qty=final_qty,
+        Insulation_Wt=ins_wt,
+        Scrap=scrap,
+        Insulation_Pct=ins_pct,
+        Invoice_No_GST2526=invoice_no,
+    )
+
+
+def group_word_lines(words: list[dict], tolerance: float = LINE_TOLERANCE) -> list[list[dict]]:
+    """Group words into visual lines by their top coordinate, each sorted left to right."""
+    lines = []
+    for w in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(w["top"] - lines[-1][0]["top"]) <= tolerance:
+            lines[-1].append(w)
+        else:
+            lines.append([w])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def detect_column_bands(words: list[dict]) -> tuple[list[tuple[str, float]], float] | None:
+    """
+    Locate COLUMN_ANCHORS in the page header.
+    Returns ([(column, right_edge), ...] left to right, header_bottom) or None.
+    """
+    centres = {}
+    bottom = 0.0
+    for line in group_word_lines(words):
+        texts = [w["text"] for w in line]
+        for col, seq in COLUMN_ANCHORS:
+            if col in centres:
+                continue
+            for i in range(len(texts) - len(seq) + 1):
+                if texts[i : i + len(seq)] == seq:
+                    centres[col] = (line[i]["x0"] + line[i + len(seq) - 1]["x1"]) / 2
+                    bottom = max(bottom, max(w["bottom"] for w in line))
+                    break
+        if len(centres) == len(COLUMN_ANCHORS):
+            break
+    if len(centres) < len(COLUMN_ANCHORS):
+        return None
+    ordered = sorted(centres.items(), key=lambda kv: kv[1])
+    edges = [(a[0], (a[1] + b[1]) / 2) for a, b in zip(ordered, ordered[1:])]
+    edges.append((ordered[-1][0], float("inf")))
+    return edges, bottom
 
-    return {
-        "Month": current_month,
-        "Covering_No": serial_no,
-        "Size": size_raw,
-        "Size_Type": size_type,
-        "Width": width,
-        "Thickness": thickness,
-        "Wire_Value": wire_value,
-        "Wire_Unit": wire_unit,
-        "Type_of_Insulation": normalize_insulation_type(kw, line),
-        "Insulation_1": ins1,
-        "Insulation_2": ins2,
-        "Total_Insulation": total_ins,
-        "Material": material,
-        "Actual_Bare_Wt_kg": bare_wt,
-        "Final_Dis_Qty": final_qty,
-        "Insulation_Wt": ins_wt,
-        "Scrap": scrap,
-        "Insulation_Pct": ins_pct,
-        "Invoice_No_GST2526": invoice_no,
-    }
 
+def extract_table_cells(pdf_path: str):
+    """
+    Word-based extraction: one extract_words() per page (no text layout); bands
+    come from the header words in the top third, rows are the words below the
+    header, each assigned to a column x-band by its centre.
+    Yields one list per page of ("month", text) and ("row", {column: cell, "_line": text})
+    items, in page order.
+    """
+    bands = None
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            items = []
+            words = page.extract_words()
+            found = detect_column_bands([w for w in words if w["top"] < page.height / 3])
+            top = 0.0
+            if found:
+                bands, top = found
+            if bands is None:
+                yield items
+                continue
+            for line in group_word_lines([w for w in words if w["top"] > top]):
+                text = " ".join(w["text"] for w in line)
+                month = is_month_header(text)
+                if month:
+                    items.append(("month", month))
+                    continue
+                cells = {col: [] for col, _ in bands}
+                for w in line:
+                    centre = (w["x0"] + w["x1"]) / 2
+                    col = next(col for col, edge in bands if centre < edge)
+                    cells[col].append(w["text"])
+                row = {col: " ".join(parts) for col, parts in cells.items()}
+                row["_line"] = text
+                items.append(("row", row))
+            yield items
+
+
+def parse_cells(cells: dict, current_month: str, stats: ParseStats | None = None) -> ParsedRow | None:
+    """
+    Build a ParsedRow from column cells (explicit empty cells, no token guessing).
+    A leading layer count in the Type cell ("3 Poly") is reported as Covering_No
+    when that cell is empty, as parse_data_line does.
+    """
+    material_raw = cells.get("Material", "").strip().upper()
+    if material_raw not in {"ALU", "COP"}:
+        if stats is not None:
+            stats.reject("no_material", cells.get("_line", ""))
+        return None
+    type_cell = cells.get("Type_of_Insulation", "")
+    kw, kw_start, _ = match_insulation_keyword(type_cell, stats)
+    if not kw:
+        if stats is not None:
+            stats.reject("no_keyword", cells.get("_line", ""))
+        return None
+    serial_no, size_raw, size_type, width, thickness, wire_value, wire_unit = parse_size_from_before(
+        cells.get("Size", "")
+    )
+    if not size_raw:
+        if stats is not None:
+            stats.reject("no_size", cells.get("_line", ""))
+        return None
+    covering = cells.get("Covering_No", "").strip()
+    if not covering:
+        lead = type_cell[:kw_start].strip()
+        covering = lead if lead.isdigit() else serial_no
+
+    intern = sys.intern
+    return ParsedRow(
+        Month=current_month,
+        Covering_No=covering,
+        Size=intern(size_raw),
+        Size_Type=size_type,
+        Width=intern(width),
+        Thickness=intern(thickness),
+        Wire_Value=intern(wire_value),
+        Wire_Unit=wire_unit,
+        Type_of_Insulation=intern(normalize_insulation_type(kw, cells.get("_line", ""))),
+        Insulation_1=intern(cells.get("Insulation_1", "")),
+        Insulation_2=intern(cells.get("Insulation_2", "")),
+        Total_Insulation=intern(cells.get("Total_Insulation", "")),
+        Material="Aluminium" if material_raw == "ALU" else "Copper",
+        Actual_Bare_Wt_kg=cells.get("Actual_Bare_Wt_kg", ""),
+        Final_Dis_Qty=cells.get("Final_Dis_Qty", ""),
+        Insulation_Wt=cells.get("Insulation_Wt", ""),
+        Scrap=cells.get("Scrap", ""),
+        Insulation_Pct=cells.get("Insulation_Pct", ""),
+        Invoice_No_GST2526=cells.get("Invoice_No_GST2526", "").replace(" ", ""),
+    )
+
+
+def parse_pdf_rows(
+    pdf_path: str,
+    method: str = "text",
+    backend: str = "pdfplumber",
+    skip_months: frozenset = frozenset(),
+    stats: ParseStats | None = None,
+    dedupe: RowDeduper | None = None,
+) -> list[ParsedRow]:
+    """
+    All parsed entries of a PDF; method 'text' (lines from the LINE_BACKENDS
+    backend) or 'words' (pdfplumber column bands). Sections whose month_key is
+    in skip_months are not parsed (append-only ingest of new months).
+    stats (ParseStats) receives branch counters and per-page timing.
+    dedupe (RowDeduper) drops or flags rows already seen in this or earlier PDFs.
+    """
+    stats = stats if stats is not None else ParseStats()
+    counts = stats.counts
 
-def process_pdf(pdf_path: str, prefix: str, output_dir: str) -> dict:
-    """Extract, sort, and save CSVs. Returns dict with paths and counts."""
-    lines = extract_all_lines(pdf_path)
+    def is_new(entry: ParsedRow, line: str) -> bool:
+        if dedupe is None or not dedupe.seen_before(entry):
+            return True
+        if dedupe.drop:
+            stats.reject("duplicate", line)
+            return False
+        counts["duplicate_kept"] += 1
+        return True
+
+    clock = time.perf_counter
+    started = mark = clock()
     current_month = ""
-    all_entries = []
-
-    for line in lines:
-        month = is_month_header(line)
-        if month:
-            current_month = month
-            continue
-        if is_header_line(line):
-            continue
-        entry = parse_data_line(line, current_month)
-        if entry:
-            all_entries.append(entry)
+    skipping = month_key(current_month) in skip_months
+    entries = []
+    if method == "words":
+        for page_no, items in enumerate(extract_table_cells(pdf_path), 1):
+            parse_start = clock()
+            page_rows = len(entries)
+            for kind, value in items:
+                if kind == "month":
+                    counts["month_headers"] += 1
+                    current_month = sys.intern(value)
+                    skipping = month_key(current_month) in skip_months
+                    continue
+                if skipping:
+                    counts["skipped_month_lines"] += 1
+                    continue
+                entry = parse_cells(value, current_month, stats)
+                if entry and is_new(entry, value.get("_line", "")):
+                    entries.append(entry)
+            done = clock()
+            stats.page(page_no, len(items), len(entries) - page_rows, parse_start - mark, done - parse_start)
+            mark = done
+        counts["rows"] += len(entries)
+        stats.seconds += clock() - started
+        return entries
+    if method != "text":
+        raise ValueError(f"Unknown extraction method: {method}")
+
+    for page_no, lines in enumerate(iter_page_lines(pdf_path, backend), 1):
+        parse_start = clock()
+        page_rows = len(entries)
+        for line in lines:
+            month = is_month_header(line)
+            if month:
+                counts["month_headers"] += 1
+                current_month = sys.intern(month)
+                skipping = month_key(current_month) in skip_months
+                continue
+            if skipping:
+                counts["skipped_month_lines"] += 1
+                continue
+            if is_header_line(line):
+                counts["header_skips"] += 1
+                continue
+            entry = parse_data_line(line, current_month, stats)
+            if entry and is_new(entry, line):
+                entries.append(entry)
+        done = clock()
+        stats.page(page_no, len(lines), len(entries) - page_rows, parse_start - mark, done - parse_start)
+        mark = done
+    counts["rows"] += len(entries)
+    stats.seconds += clock() - started
+    return entries
+
+
+def sorted_partitions(df: pd.DataFrame) -> dict:
+    """
+    Split parsed rows into output partitions with one stable lexsort.
+    Strips: Aluminium then Copper, each by Width asc, Thickness asc (numeric,
+    unparseable last; Width/Thickness become numeric). Wires: mm first by
+    value asc, then SWG by gauge asc (unparseable values count as 0).
+    Returns al_strips, cu_strips (index reset), wires (all, index reset) and
+    al_wires, cu_wires (subsets of wires keeping its index).
+    """
+    shape = df["Size_Type"].map({"Strip": 0, "Wire": 1}).fillna(2).to_numpy()
+    material = df["Material"].map({"Aluminium": 0, "Copper": 1}).fillna(2).to_numpy()
+    is_strip = shape == 0
+    width = pd.to_numeric(df["Width"], errors="coerce").to_numpy(dtype=float)
+    thickness = pd.to_numeric(df["Thickness"], errors="coerce").to_numpy(dtype=float)
+    wire_value = pd.to_numeric(df["Wire_Value"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    is_mm = (df["Wire_Unit"] == "mm").to_numpy()
+
+    order = np.lexsort(
+        (
+            np.where(is_strip, thickness, np.where(is_mm, 0, wire_value)),
+            np.where(is_strip, width, np.where(is_mm, wire_value, 0)),
+            np.where(is_strip, 0, np.where(is_mm, 0, 1)),
+            np.where(is_strip, material, 0),
+            shape,
+        )
+    )
+    ordered = df.iloc[order]
+    shape, material = shape[order], material[order]
+    width, thickness = width[order], thickness[order]
+
+    parts = {}
+    for key, code in (("al_strips", 0), ("cu_strips", 1)):
+        sel = (shape == 0) & (material == code)
+        part = ordered[sel].reset_index(drop=True)
+        if len(part) > 0:
+            part["Width"] = width[sel]
+            part["Thickness"] = thickness[sel]
+        parts[key] = part
+    wires = ordered[shape == 1].reset_index(drop=True)
+    parts["wires"] = wires
+    parts["al_wires"] = wires[wires["Material"] == "Aluminium"].copy()
+    parts["cu_wires"] = wires[wires["Material"] == "Copper"].copy()
+    return parts
+
+
+def report_summary(report: dict) -> str:
+    """One-line digest of a ParseStats report."""
+    counts = report["counts"]
+    rejects = ", ".join(f"{r} {counts[r]}" for r in ParseStats.REJECT_REASONS if counts.get(r))
+    return (
+        f"{report['pages']} pages in {report['seconds']:.2f}s, {counts.get('lines', 0)} lines, "
+        f"{report['rows']} rows, rejected {report['rejected']}" + (f" ({rejects})" if rejects else "")
+        + (f", fuzzy keywords {counts['fuzzy_keyword']}" if counts.get("fuzzy_keyword") else "")
+    )
+
+
+def process_pdf(
+    pdf_path: str,
+    prefix: str,
+    output_dir: str,
+    method: str = "text",
+    backend: str = "pdfplumber",
+    dedupe: RowDeduper | None = None,
+) -> dict:
+    """
+    Extract, sort, and save CSVs plus the parse report ({prefix}_parse_report.json).
+    Exact duplicate rows are dropped. dedupe is the seen set shared by the PDFs
+    of one prefix (rows an earlier PDF already gave are dropped too); a fresh
+    one when None. It is saved as {prefix}_row_hashes.bin so append-only
+    ingests of later PDFs can extend it.
+    Returns dict with paths, counts and the report.
+    """
+    stats = ParseStats()
+    dedupe = dedupe if dedupe is not None else RowDeduper()
+    all_entries = parse_pdf_rows(pdf_path, method, backend, stats=stats, dedupe=dedupe)
+    os.makedirs(output_dir, exist_ok=True)
+    dedupe.save(os.path.join(output_dir, ROW_HASHES_NAME.format(prefix=prefix)))
+    report_path = os.path.join(output_dir, f"{prefix}_parse_report.json")
+    report = stats.write(report_path, pdf=os.path.basename(pdf_path), prefix=prefix, method=method, backend=backend)
 
     if not all_entries:
-        return {"total": 0, "paths": []}
+        return {"total": 0, "paths": [], "report": report, "report_path": report_path}
 
-    df = pd.DataFrame(all_entries)
-    strips = df[df["Size_Type"] == "Strip"].copy()
-    wires = df[df["Size_Type"] == "Wire"].copy()
-
-    al_strips = strips[strips["Material"] == "Aluminium"].copy()
-    cu_strips = strips[strips["Material"] == "Copper"].copy()
-    al_wires = wires[wires["Material"] == "Aluminium"].copy()
-    cu_wires = wires[wires["Material"] == "Copper"].copy()
+    df = pd.DataFrame.from_records(all_entries, columns=ParsedRow._fields)
+    parts = sorted_partitions(df)
+    al_strips, cu_strips = parts["al_strips"], parts["cu_strips"]
+    al_wires, cu_wires = parts["al_wires"], parts["cu_wires"]
 
     strip_cols = [
         "Month", "Covering_No", "Size", "Width", "Thickness",
@@ -297,39 +956,7 @@ def process_pdf(pdf_path: str, prefix: str, output_dir: str) -> dict:
         "Insulation_Wt", "Scrap", "Insulation_Pct", "Invoice_No_GST2526",
     ]
 
-    # Sort strips
-    if len(al_strips) > 0:
-        al_strips["Width"] = pd.to_numeric(al_strips["Width"], errors="coerce")
-        al_strips["Thickness"] = pd.to_numeric(al_strips["Thickness"], errors="coerce")
-        al_strips = al_strips.sort_values(["Width", "Thickness"]).reset_index(drop=True)
-    if len(cu_strips) > 0:
-        cu_strips["Width"] = pd.to_numeric(cu_strips["Width"], errors="coerce")
-        cu_strips["Thickness"] = pd.to_numeric(cu_strips["Thickness"], errors="coerce")
-        cu_strips = cu_strips.sort_values(["Width", "Thickness"]).reset_index(drop=True)
-
-    # Sort wires
-    def wire_sort_key(row):
-        if row["Wire_Unit"] == "mm":
-            try:
-                v = float(row["Wire_Value"])
-            except (ValueError, TypeError):
-                v = 0
-            return (0, v, 0)
-        try:
-            v = float(row["Wire_Value"])
-        except (ValueError, TypeError):
-            v = 0
-        return (1, 0, v)
-
-    if len(wires) > 0:
-        wires["_sort"] = wires.apply(wire_sort_key, axis=1)
-        wires = wires.sort_values("_sort").reset_index(drop=True)
-        wires = wires.drop(columns=["_sort"])
-        al_wires = wires[wires["Material"] == "Aluminium"].copy()
-        cu_wires = wires[wires["Material"] == "Copper"].copy()
-
     paths = []
-    os.makedirs(output_dir, exist_ok=True)
 
     al_strips[strip_cols].to_csv(os.path.join(output_dir, f"{prefix}_Aluminium_Strips.csv"), index=False)
     paths.append(f"{prefix}_Aluminium_Strips.csv")
@@ -348,21 +975,29 @@ def process_pdf(pdf_path: str, prefix: str, output_dir: str) -> dict:
         "cu_wires": len(cu_wires),
         "paths": [os.path.join(output_dir, p) for p in paths],
         "dfs": {"al_strips": al_strips, "cu_strips": cu_strips, "al_wires": al_wires, "cu_wires": cu_wires},
+        "report": report,
+        "report_path": report_path,
     }
 
 
 def main():
-    import sys
     base = Path(r"c:\Projects\Palej Calculation App")
-    if len(sys.argv) < 3:
-        print("Usage: python extract_insulation_pdf.py <pdf_path> <prefix>")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print("Usage: python extract_insulation_pdf.py <pdf_path> <prefix> [--words | --pdfium]")
         print("Example: python extract_insulation_pdf.py 'poly data.pdf' Poly")
         sys.exit(1)
-    pdf_path = sys.argv[1]
-    prefix = sys.argv[2]
+    pdf_path = args[0]
+    prefix = args[1]
     if not os.path.isabs(pdf_path):
         pdf_path = str(base / pdf_path)
-    result = process_pdf(pdf_path, prefix, str(base))
+    result = process_pdf(
+        pdf_path,
+        prefix,
+        str(base),
+        method="words" if "--words" in sys.argv else "text",
+        backend="pypdfium2" if "--pdfium" in sys.argv else "pdfplumber",
+    )
     print(f"Extracted {result['total']} entries")
     print(f"  Aluminium Strips: {result['al_strips']}")
     print(f"  Copper Strips: {result['cu_strips']}")
@@ -370,6 +1005,8 @@ def main():
     print(f"  Copper Wires: {result['cu_wires']}")
     for p in result["paths"]:
         print(f"  Saved: {p}")
+    print(f"Parse report: {result['report_path']}")
+    print(f"  {report_summary(result['report'])}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""
+Vectorised per-row features behind compute_top5_factor_labels.
+
+build_reliability_features() turns one family's 4 tabs into NumPy arrays with the
+same normalised scores apply_markings_and_top5_factor uses (kg, total, scrap,
+match to likely %, completeness), so reliability for any weight vector is a
+single matrix product and factor-bin support is a bincount.
+"""
+
+import numpy as np
+import pandas as pd
+
+from apply_markings_and_top5_factor import (
+    MISSING_TOKENS,
+    REL_W_COMPLETE,
+    REL_W_KG,
+    REL_W_MATCH,
+    REL_W_SCRAP,
+    REL_W_TOTAL,
+)
+
+BUCKET_STEP = 0.05
+FEATURE_NAMES = ["kg", "total", "scrap", "match", "complete"]
+REL_WEIGHTS = np.array([REL_W_KG, REL_W_TOTAL, REL_W_SCRAP, REL_W_MATCH, REL_W_COMPLETE])
+CORE_COLS = [
+    "Insulation Per %",
+    "factor",
+    "Actual Bare wt",
+    "Final Dis.Qty.",
+    "Scrap",
+    "Likely Insulation % Increase",
+]
+
+
+def num_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Column parsed like parse_num (missing tokens / unparseable -> NaN)."""
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    s = df[col].astype(str).str.strip()
+    return pd.to_numeric(s.where(~s.isin(MISSING_TOKENS), ""), errors="coerce").to_numpy(dtype=float)
+
+
+def present_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return (~df[col].astype(str).str.strip().isin(MISSING_TOKENS)).to_numpy()
+
+
+def minmax(vals: np.ndarray) -> np.ndarray:
+    """Same as apply_markings normalize(): all-equal input scores 1.0."""
+    if len(vals) == 0:
+        return vals
+    mn, mx = vals.min(), vals.max()
+    if np.isclose(mn, mx):
+        return np.ones_like(vals)
+    return (vals - mn) / (mx - mn)
+
+
+def build_reliability_features(sheets: dict, factor_overrides: dict | None = None) -> dict:
+    """
+    Rows of every sheet concatenated; only rows with factor and pct are kept ("valid").
+    factor_overrides: optional {sheet_name: factor array} replacing the 'factor' column
+    (used by sweeps that recompute factor at other coverings).
+
+    Returns dict with:
+      sheet, index      row identity (sheet name, DataFrame index)
+      factor, pct, likely, kg, scrap_rate
+      features          (n, 5) normalised scores in FEATURE_NAMES order
+    """
+    parts = []
+    for name, df in sheets.items():
+        factor = num_column(df, "factor") if not factor_overrides else np.asarray(factor_overrides[name], dtype=float)
+        kg = np.nan_to_num(num_column(df, "Actual Bare wt"), nan=0.0)
+        scrap = num_column(df, "Scrap")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scrap_rate = np.where(~np.isnan(scrap) & (kg > 0), scrap / np.where(kg > 0, kg, 1.0), np.nan)
+        present = sum(present_column(df, c).astype(int) for c in CORE_COLS if c != "factor")
+        present = present + (~np.isnan(factor)).astype(int)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "sheet": name,
+                    "index": df.index.to_numpy(),
+                    "factor": factor,
+                    "pct": num_column(df, "Insulation Per %"),
+                    "likely": num_column(df, "Likely Insulation % Increase"),
+                    "kg": kg,
+                    "total": np.nan_to_num(num_column(df, "Final Dis.Qty."), nan=0.0),
+                    "scrap_rate": scrap_rate,
+                    "completeness": present / len(CORE_COLS),
+                }
+            )
+        )
+    rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["factor", "pct"])
+    valid = rows[rows["factor"].notna() & rows["pct"].notna()].reset_index(drop=True)
+
+    rates = valid["scrap_rate"].to_numpy(dtype=float)
+    observed = ~np.isnan(rates)
+    if observed.any():
+        filled = np.where(observed, rates, rates[observed].max() * 1.1)
+        scrap_scores = 1.0 - minmax(filled)
+    else:
+        scrap_scores = np.full(len(valid), 0.5)
+
+    likely = valid["likely"].to_numpy(dtype=float)
+    pct = valid["pct"].to_numpy(dtype=float)
+    base = np.maximum(1.0, np.abs(likely) * 0.25)
+    with np.errstate(invalid="ignore"):
+        match = np.where(np.isnan(likely), 0.5, np.maximum(0.0, 1.0 - np.abs(pct - likely) / base))
+
+    features = np.column_stack(
+        [
+            minmax(valid["kg"].to_numpy(dtype=float)),
+            minmax(valid["total"].to_numpy(dtype=float)),
+            scrap_scores,
+            match,
+            valid["completeness"].to_numpy(dtype=float),
+        ]
+    ) if len(valid) else np.zeros((0, len(FEATURE_NAMES)))
+
+    return {
+        "sheet": valid["sheet"].to_numpy(dtype=object),
+        "index": valid["index"].to_numpy(),
+        "factor": valid["factor"].to_numpy(dtype=float),
+        "pct": pct,
+        "likely": likely,
+        "kg": valid["kg"].to_numpy(dtype=float),
+        "scrap_rate": rates,
+        "features": features,
+    }
+
+
+def factor_bin_index(factor) -> np.ndarray:
+    """Integer bin id: factor_bin = id x BUCKET_STEP (round-half-even like round())."""
+    return np.rint(np.asarray(factor, dtype=float) / BUCKET_STEP).astype(np.int64)
+
+
+def bin_support(bins: np.ndarray, weights: np.ndarray):
+    """
+    Support and row count per factor bin for every column at once.
+    bins: (n, m) int bin ids; weights: (n, m) or (n,) reliability.
+    Returns (bin_ids, support (m, k), count (m, k)).
+    """
+    bins = np.asarray(bins)
+    if bins.ndim == 1:
+        bins = bins[:, None]
+    n, m = bins.shape
+    weights = np.broadcast_to(np.asarray(weights, dtype=float).reshape(n, -1), (n, m))
+    bin_ids, inv = np.unique(bins, return_inverse=True)
+    inv = inv.reshape(n, m)
+    k = len(bin_ids)
+    flat = (inv + np.arange(m)[None, :] * k).ravel()
+    support = np.bincount(flat, weights=weights.ravel(), minlength=m * k).reshape(m, k)
+    count = np.bincount(flat, minlength=m * k).reshape(m, k)
+    return bin_ids, support, count
+
+
+def top_bins(bin_ids, support, count, top_n=5):
+    """Top bins per column ordered by support desc, then row count desc (as compute_top5)."""
+    ranked = []
+    for j in range(support.shape[0]):
+        live = count[j] > 0
+        ids, sup, cnt = bin_ids[live], support[j][live], count[j][live]
+        order = np.lexsort((ids, -cnt, -np.round(sup, 6)))[:top_n]
+        ranked.append([(round(float(ids[i] * BUCKET_STEP), 2), float(sup[i]), int(cnt[i])) for i in order])
+    return ranked
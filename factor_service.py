@@ -0,0 +1,254 @@
+"""
+Local HTTP/JSON factor lookup service.
+
+Loads Phase1_Master_Consolidated.xlsx (28 tabs) and each family's
+Factor_Top5_Summary once, keeps them in memory and answers:
+
+  GET  /health
+  GET  /lookup?family=DFG&size=10.00 X 2.00&material=Alu
+  POST /lookup/batch      {"items": [{"family": ..., "size": ..., "material": ...}, ...]}
+  GET  /top5?family=DFG
+
+Sizes with no green row in the consolidated tab fall back to the
+nearest-neighbour estimate from estimate_missing_sizes.SizeIndex.
+Results are served from an LRU cache; the data (and cache) reload automatically
+when any source workbook changes on disk.
+
+Usage: python factor_service.py [port]
+"""
+
+import json
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from apply_markings_and_top5_factor import parse_num
+from build_phase1_master_workbook import OUT_PATH, SOURCE_FILES, SOURCE_SHEETS, sheet_out_name
+from estimate_missing_sizes import SizeIndex, parse_size_text, row_coords, sheet_for
+
+DEFAULT_PORT = 8765
+CACHE_SIZE = 4096
+RELOAD_CHECK_S = 2.0
+ROW_FIELDS = [
+    "Size", "Size Key", "Month", "Type_of_Insulation", "Insulation Per %",
+    "Likely Insulation % Increase", "factor", "Top 5 Likely Factor",
+    "Factor Reliability Score", "Actual Bare wt", "Scrap",
+]
+
+
+def coord_key(coords):
+    return tuple(round(float(c), 4) for c in coords)
+
+
+class FactorData:
+    """
+    Immutable snapshot of the consolidated workbook and per-family summaries.
+    cached_lookup is an LRU cache of lookup owned by this snapshot, so a reload
+    starts with an empty cache and a lookup still running on the old snapshot
+    can only fill the old one.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.mtimes = {}
+        self.rows = {}      # (family, sheet) -> {coord_key: [row dicts]}
+        self.indexes = {}   # (family, sheet) -> SizeIndex
+        self.top5 = {}      # family -> [summary row dicts]
+        self.cached_lookup = lru_cache(maxsize=CACHE_SIZE)(self.lookup)
+
+    @staticmethod
+    def source_paths():
+        return [OUT_PATH] + [p for _, p in SOURCE_FILES]
+
+    @staticmethod
+    def current_mtimes():
+        return {str(p): p.stat().st_mtime for p in FactorData.source_paths() if p.exists()}
+
+    @classmethod
+    def load(cls, generation=0):
+        tabs = {}
+        if OUT_PATH.exists():
+            xl = pd.ExcelFile(OUT_PATH)
+            tabs = {tab: pd.read_excel(xl, sheet_name=tab, dtype=str).fillna("") for tab in xl.sheet_names}
+        top5 = {}
+        for family, path in SOURCE_FILES:
+            if path.exists() and "Factor_Top5_Summary" in pd.ExcelFile(path).sheet_names:
+                summary = pd.read_excel(path, sheet_name="Factor_Top5_Summary").fillna("")
+                top5[family] = summary.to_dict("records")
+        data = cls.from_tabs(tabs, top5, generation)
+        data.mtimes = cls.current_mtimes()
+        return data
+
+    @classmethod
+    def from_tabs(cls, tabs: dict, top5: dict, generation=0):
+        """Index consolidated tabs ({tab name: DataFrame}) already in memory."""
+        data = cls()
+        data.generation = generation
+        data.top5 = dict(top5)
+        for family, _ in SOURCE_FILES:
+            for base_sheet in SOURCE_SHEETS:
+                tab = sheet_out_name(family, base_sheet)
+                if tab not in tabs:
+                    continue
+                df = tabs[tab]
+                is_wire = "Wire" in base_sheet
+                by_coords = {}
+                for _, row in df.iterrows():
+                    coords = row_coords(row, is_wire)
+                    if coords is None:
+                        continue
+                    rec = {c: row.get(c, "") for c in ROW_FIELDS if c in df.columns}
+                    by_coords.setdefault(coord_key(coords), []).append(rec)
+                reliability = {
+                    idx: parse_num(v) or 0.0
+                    for idx, v in df.get("Factor Reliability Score", pd.Series(dtype=str)).items()
+                }
+                data.rows[(family, base_sheet)] = by_coords
+                data.indexes[(family, base_sheet)] = SizeIndex.from_sheet(df, reliability, is_wire)
+        return data
+
+    def lookup(self, family: str, size: str, material: str) -> dict:
+        """Observed green rows for the size, else the nearest-neighbour estimate."""
+        shape, coords = parse_size_text(size)
+        if shape is None:
+            return {"family": family, "size": size, "error": "unparseable size"}
+        sheet = sheet_for(shape, material)
+        result = {"family": family, "size": size, "sheet": sheet, "generation": self.generation}
+        observed = self.rows.get((family, sheet), {}).get(coord_key(coords), [])
+        if observed:
+            result["source"] = "observed"
+            result["rows"] = observed
+            return result
+        index = self.indexes.get((family, sheet))
+        if index is None or len(index) == 0:
+            result["source"] = "none"
+            return result
+        est = index.estimate([coords]).iloc[0]
+        result["source"] = "estimate"
+        result["estimate"] = {
+            "factor": None if pd.isna(est["est_factor"]) else float(est["est_factor"]),
+            "likely_pct": None if pd.isna(est["est_likely_pct"]) else float(est["est_likely_pct"]),
+            "nearest_size_key": str(est["nearest_size_key"]),
+            "nearest_distance_mm": float(est["nearest_distance_mm"]),
+        }
+        return result
+
+
+class FactorService:
+    """Holds the current FactorData snapshot and swaps it when sources change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.data = FactorData.load()
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_S:
+            return
+        with self._lock:
+            if now - self._last_check < RELOAD_CHECK_S:
+                return
+            self._last_check = now
+            if FactorData.current_mtimes() == self.data.mtimes:
+                return
+            try:
+                data = FactorData.load(self.data.generation + 1)
+            except Exception as exc:  # half-written or locked workbook; keep serving, retry at the next check
+                print(f"Reload failed, serving generation {self.data.generation}: {type(exc).__name__}: {exc}")
+                return
+            self.data = data
+            print(f"Reloaded source workbooks (generation {self.data.generation})")
+
+    def lookup(self, family: str, size: str, material: str) -> dict:
+        return self.data.cached_lookup(family, size, material)
+
+    def top5_summary(self, family: str):
+        return self.data.top5.get(family, [])
+
+
+class Handler(BaseHTTPRequestHandler):
+    service: FactorService = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.service.maybe_reload()
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/health":
+            info = self.service.data.cached_lookup.cache_info()
+            self._send(
+                {
+                    "status": "ok",
+                    "generation": self.service.data.generation,
+                    "tabs": len(self.service.data.rows),
+                    "cache": {"hits": info.hits, "misses": info.misses, "size": info.currsize},
+                }
+            )
+        elif url.path == "/lookup":
+            if not all(k in q for k in ("family", "size", "material")):
+                self._send({"error": "family, size and material are required"}, 400)
+                return
+            self._send(self.service.lookup(q["family"], q["size"], q["material"]))
+        elif url.path == "/top5":
+            self._send({"family": q.get("family", ""), "summary": self.service.top5_summary(q.get("family", ""))})
+        else:
+            self._send({"error": "not found"}, 404)
+
+    def do_POST(self):
+        self.service.maybe_reload()
+        if urlparse(self.path).path != "/lookup/batch":
+            self._send({"error": "not found"}, 404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            items = json.loads(self.rfile.read(length) or b"{}").get("items", [])
+        except (ValueError, AttributeError):
+            self._send({"error": "invalid JSON body"}, 400)
+            return
+        if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+            self._send({"error": "items must be a list of objects"}, 400)
+            return
+        results = [
+            self.service.lookup(str(it.get("family", "")), str(it.get("size", "")), str(it.get("material", "")))
+            for it in items
+        ]
+        self._send({"results": results})
+
+
+class FactorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    Handler.service = FactorService()
+    server = FactorServer(("127.0.0.1", port), Handler)
+    print(f"Factor service on http://127.0.0.1:{port} ({len(Handler.service.data.rows)} tabs loaded)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Load test for factor_service.py: fires concurrent /lookup requests and reports
+throughput and p50/p90/p99 latency.
+
+Usage: python factor_service_loadtest.py [base_url] [requests] [concurrency]
+Example: python factor_service_loadtest.py http://127.0.0.1:8765 5000 16
+"""
+
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+FAMILIES = ["DFG", "Poly", "PolyCotton", "PolyDFG", "PolyPaper", "EnamelDFG", "Cotton"]
+STRIP_WIDTHS = [4.5, 5.0, 6.0, 8.0, 9.5, 10.0, 12.5, 15.0, 20.0]
+STRIP_THICKNESSES = [0.9, 1.2, 1.8, 2.0, 2.6, 3.0, 4.0, 5.0, 6.25]
+WIRE_SIZES = [f"{g} swg" for g in range(0, 13)] + ["2.50 mm", "3.00 mm", "4.50 mm", "5.60 mm"]
+
+
+def sample_paths(n, seed=7):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(n):
+        if rng.random() < 0.7:
+            size = f"{rng.choice(STRIP_WIDTHS):.2f} X {rng.choice(STRIP_THICKNESSES):.2f}"
+        else:
+            size = rng.choice(WIRE_SIZES)
+        q = {"family": rng.choice(FAMILIES), "size": size, "material": rng.choice(["Alu", "Cop"])}
+        paths.append("/lookup?" + urlencode(q))
+    return paths
+
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def main():
+    base = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8765"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    paths = sample_paths(n)
+
+    def hit(path):
+        """(latency ms, HTTP status); 0 when the request got no HTTP response."""
+        t0 = time.perf_counter()
+        try:
+            with urlopen(base + path) as resp:
+                resp.read()
+                status = resp.status
+        except HTTPError as e:
+            e.read()
+            status = e.code
+        except URLError:
+            status = 0
+        return (time.perf_counter() - t0) * 1000.0, status
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(hit, paths))
+    elapsed = time.perf_counter() - t_start
+
+    lat = sorted(ms for ms, _ in results)
+    errors = Counter(status for _, status in results if status != 200)
+    print(f"Requests: {n}, concurrency: {concurrency}, errors: {sum(errors.values())}")
+    if errors:
+        print("  by status: " + ", ".join(f"{status or 'no response'}: {count}" for status, count in sorted(errors.items())))
+    print(f"Throughput: {n / elapsed:.1f} req/s")
+    print(f"Latency ms: p50={percentile(lat, 50):.2f} p90={percentile(lat, 90):.2f} "
+          f"p99={percentile(lat, 99):.2f} max={lat[-1]:.2f} mean={statistics.mean(lat):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,12 @@
 import itertools
-import shutil
-from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
 
+from backup_store import backup_file
+
 
 MISSING_TOKENS = {"", "---", "--", "#VALUE!", "nan", "None"}
 
@@ -149,9 +149,7 @@ def main() -> None:
     if not xlsx_path.exists():
         raise FileNotFoundError(f"Workbook not found: {xlsx_path}")
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = xlsx_path.with_suffix(f".xlsx.bak_{ts}")
-    shutil.copy2(xlsx_path, backup_path)
+    backup = backup_file(xlsx_path)
 
     xls = pd.ExcelFile(xlsx_path)
     processed: dict[str, pd.DataFrame] = {}
@@ -166,7 +164,7 @@ def main() -> None:
     apply_formatting(xlsx_path)
 
     print("Updated workbook:", xlsx_path)
-    print("Backup created:", backup_path)
+    print(f"Backup: {backup['sha256'][:12]} ({'unchanged, not stored again' if backup['skipped'] else 'stored'})")
     for sheet, df in processed.items():
         dup_rows = (df["Duplicate?"] == "Duplicate").sum()
         marked_rows = (df["Recommended % Marked"] == "Yes").sum()
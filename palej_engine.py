@@ -0,0 +1,306 @@
+"""
+In-process engine over the phase-1 scripts: load once, chain steps, write when asked.
+
+PalejEngine keeps, per insulation family:
+- sheets:    the 4 typed tabs ({sheet name: DataFrame}, str cells as read by the scripts)
+- summaries: Factor_Top5_Summary (and the row labels from compute_top5_factor_labels)
+- master:    the consolidated green tabs (build_phase1_master_workbook) and their top-3 bins
+- factor index: FactorData over the master tabs (observed rows + SizeIndex estimates)
+
+Steps reuse the script functions, so results match the run-once scripts:
+  extract      run_insulation_pipeline.extract_sheets
+  ingest       append-only: parse new months and the latest stored one (seen rows dropped),
+               re-mark touched size keys
+  factor       run_insulation_pipeline.add_factor_to_sheets
+  mark         apply_markings_and_top5_factor.process_sheet + top-5 labels
+  consolidate  build_phase1_master_workbook.dedupe_green_rows
+               (+ enforce_unique_master_tabs.dedupe_tab with unique=True)
+  lookup       factor_service.FactorData.lookup
+
+Nothing is written until save_family / save_master. All paths default to BASE
+and can be pointed elsewhere. checkpoint / restore pickle one family's frames
+(fast binary restart point between stages; xlsx stays the human-facing output).
+
+Example:
+  engine = PalejEngine(base="data").load()
+  engine.extract("poly data.pdf", "Poly"); engine.factor("Poly"); engine.mark("Poly")
+  engine.consolidate()
+  engine.lookup("Poly", "10.00 X 2.00", "Alu")
+"""
+
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from apply_markings_and_top5_factor import apply_row_labels, build_size_key, compute_top5_factor_labels, process_sheet
+from build_phase1_master_workbook import (
+    BASE,
+    OUT_PATH,
+    SOURCE_FILES,
+    SOURCE_SHEETS,
+    dedupe_green_rows,
+    fill_top3_factor,
+    sheet_out_name,
+    top3_factor_bins,
+)
+from enforce_unique_master_tabs import OUT_PATH as UNIQUE_OUT_PATH
+from enforce_unique_master_tabs import dedupe_tab
+from extract_insulation_pdf import ROW_HASHES_NAME, ParsedRow, ParseStats, RowDeduper, month_key, parse_pdf_rows, sorted_partitions
+from factor_service import FactorData
+from run_insulation_pipeline import SHEET_NAMES, add_factor_to_sheets, extract_sheets, normalize_sheets, write_workbook
+
+SUMMARY_SHEET = "Factor_Top5_Summary"
+
+
+class PalejEngine:
+    """Warm, reusable state for extract -> factor -> mark -> consolidate -> lookup."""
+
+    def __init__(self, base: Path | str = BASE, source_files: dict | None = None, master_path: Path | str | None = None):
+        self.base = Path(base)
+        # Same file names as SOURCE_FILES, resolved against base unless given explicitly
+        self.source_files = (
+            {family: Path(p) for family, p in source_files.items()}
+            if source_files
+            else {family: self.base / path.name for family, path in SOURCE_FILES}
+        )
+        self.master_path = Path(master_path) if master_path else self.base / OUT_PATH.name
+        self.sheets = {}     # family -> {sheet name: DataFrame}
+        self.summaries = {}  # family -> Factor_Top5_Summary DataFrame
+        self.labels = {}     # family -> label_data from compute_top5_factor_labels
+        self.master = {}     # consolidated tab -> DataFrame
+        self.top3 = {}       # family -> top-3 factor bins of the consolidated tabs
+        self._index = None   # FactorData over master, built on first lookup
+
+    def load(self, families: list[str] | None = None):
+        """Read each family workbook once (4 tabs + summary). Missing workbooks are skipped."""
+        for family in families or list(self.source_files):
+            path = self.source_files[family]
+            if not path.exists():
+                continue
+            xl = pd.ExcelFile(path)
+            self.sheets[family] = {
+                s: pd.read_excel(xl, sheet_name=s, dtype=str).fillna("") for s in SOURCE_SHEETS if s in xl.sheet_names
+            }
+            self.summaries[family] = (
+                pd.read_excel(xl, sheet_name=SUMMARY_SHEET, dtype=str).fillna("")
+                if SUMMARY_SHEET in xl.sheet_names
+                else pd.DataFrame()
+            )
+            xl.close()
+            self.labels.pop(family, None)
+        self._invalidate()
+        return self
+
+    def _invalidate(self):
+        self.master = {}
+        self.top3 = {}
+        self._index = None
+
+    def families(self) -> list[str]:
+        return [family for family in self.source_files if family in self.sheets]
+
+    def extract(self, pdf_path: Path | str, family: str, method: str = "text", backend: str = "pdfplumber") -> dict | None:
+        """Parse a PDF into the 4 normalized sheets for family (CSV side outputs go to base)."""
+        pdf_path = Path(pdf_path) if Path(pdf_path).is_absolute() else self.base / pdf_path
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        sheets = extract_sheets(str(pdf_path), family, method, backend, out_dir=self.base)
+        if sheets is None:
+            return None
+        self.sheets[family] = sheets
+        self.summaries.pop(family, None)
+        self.labels.pop(family, None)
+        self._invalidate()
+        return sheets
+
+    def stored_months(self, family: str) -> set[str]:
+        """month_key of every month with at least one stored row of family."""
+        return {month_key(m) for df in self.sheets.get(family, {}).values() for m in df.get("Month", [])}
+
+    def ingest(self, pdf_path: Path | str, family: str, method: str = "text", backend: str = "pdfplumber") -> dict:
+        """
+        Append-only refresh from a PDF that grows month by month. Month sections
+        already stored for family are skipped unparsed, except the latest one,
+        which may have been stored part way through the month; rows already seen
+        in an earlier PDF ({family}_row_hashes.bin) are dropped, so only its new
+        rows are kept (without a saved seen set every stored month is skipped,
+        since stored rows could not be told apart). New rows get their
+        factor, are appended to the end of each sheet, and only Size Keys that
+        received rows are re-marked. The top-5 reduce then runs over all rows (its
+        reliability scores are min-max normalized over the whole family).
+        A family with nothing loaded goes through extract / factor / mark.
+        Returns {sheet name: rows appended}.
+        """
+        if family not in self.sheets:
+            sheets = self.extract(pdf_path, family, method, backend)
+            if sheets is None:
+                return {}
+            self.factor(family)
+            self.mark(family)
+            return {name: len(df) for name, df in self.sheets[family].items()}
+
+        pdf_path = Path(pdf_path) if Path(pdf_path).is_absolute() else self.base / pdf_path
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        stats = ParseStats()
+        hashes_path = str(self.base / ROW_HASHES_NAME.format(prefix=family))
+        skip = self.stored_months(family)
+        if skip - {""} and Path(hashes_path).exists():
+            skip.discard(max(skip))
+        dedupe = RowDeduper.load(hashes_path)
+        entries = parse_pdf_rows(str(pdf_path), method, backend, skip_months=frozenset(skip), stats=stats, dedupe=dedupe)
+        dedupe.save(hashes_path)
+        stats.write(
+            str(self.base / f"{family}_parse_report.json"),
+            pdf=pdf_path.name, prefix=family, method=method, backend=backend, skipped_months=sorted(skip),
+        )
+        if not entries:
+            return {}
+
+        df = pd.DataFrame.from_records(entries, columns=ParsedRow._fields)
+        fresh = add_factor_to_sheets(normalize_sheets(sorted_partitions(df)), family)
+        added, sheets = {}, {}
+        for name in SHEET_NAMES:
+            old, new = self.sheets[family].get(name, pd.DataFrame()), fresh[name]
+            added[name] = len(new)
+            if new.empty:
+                sheets[name] = old
+                continue
+            new = new.assign(**{"Size Key": build_size_key(new)})
+            merged = pd.concat([old, new], ignore_index=True).fillna("")
+            sheets[name] = process_sheet(merged, size_keys=set(new["Size Key"]))
+        if not any(added.values()):
+            return added
+
+        label_data, summary_df = compute_top5_factor_labels(sheets)
+        self.sheets[family] = apply_row_labels(sheets, label_data)
+        self.labels[family] = label_data
+        self.summaries[family] = summary_df
+        self._invalidate()
+        return added
+
+    def factor(self, family: str) -> dict:
+        """(Re)compute the 'factor' column of every sheet of family."""
+        self.sheets[family] = add_factor_to_sheets(self.sheets[family], family)
+        self._invalidate()
+        return self.sheets[family]
+
+    def mark(self, family: str) -> pd.DataFrame:
+        """Duplicate / green markings per sheet, then top-5 factor labels over all sheets."""
+        sheets = {name: process_sheet(df) for name, df in self.sheets[family].items()}
+        label_data, summary_df = compute_top5_factor_labels(sheets)
+        self.sheets[family] = apply_row_labels(sheets, label_data)
+        self.labels[family] = label_data
+        self.summaries[family] = summary_df
+        self._invalidate()
+        return summary_df
+
+    def consolidated_tabs(self, unique: bool = False) -> tuple[dict, dict]:
+        """({tab: green rows}, {family: top-3 factor bins}) without touching the engine state."""
+        master, top3 = {}, {}
+        for family in self.families():
+            top3[family] = top3_factor_bins(self.summaries.get(family))
+            for src_sheet in SOURCE_SHEETS:
+                df = self.sheets[family].get(src_sheet)
+                if df is None:
+                    continue
+                tab = dedupe_green_rows(df)
+                master[sheet_out_name(family, src_sheet)] = dedupe_tab(tab) if unique else tab
+        return master, top3
+
+    def consolidate(self, unique: bool = False) -> dict:
+        """Green rows per family tab, one row per size/insulation combo (per size key with unique=True)."""
+        self.master, self.top3 = self.consolidated_tabs(unique)
+        self._index = None
+        return self.master
+
+    @property
+    def index(self) -> FactorData:
+        if self._index is None:
+            if not self.master:
+                self.consolidate()
+            top5 = {family: df.fillna("").to_dict("records") for family, df in self.summaries.items()}
+            self._index = FactorData.from_tabs(self.master, top5)
+        return self._index
+
+    def lookup(self, family: str, size: str, material: str) -> dict:
+        """Same answer as GET /lookup of factor_service, from the in-memory master tabs."""
+        return self.index.lookup(family, size, material)
+
+    def top5(self, family: str) -> list[dict]:
+        return self.index.top5.get(family, [])
+
+    def checkpoint(self, family: str, path: Path | str, **meta) -> Path:
+        """Pickle family's sheets, summary and labels with meta (no xlsx round-trip)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "sheets": self.sheets[family],
+            "summary": self.summaries.get(family),
+            "labels": self.labels.get(family),
+            "meta": meta,
+        }
+        with open(path, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def checkpoint_meta(path: Path | str) -> dict | None:
+        """meta of a checkpoint written by checkpoint(), None when there is none."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, "rb") as fh:
+            return pickle.load(fh)["meta"]
+
+    def restore(self, family: str, path: Path | str, expect: dict | None = None) -> dict | None:
+        """
+        Load a checkpoint written by checkpoint() and return its meta. With
+        expect, a checkpoint whose meta differs on any of those keys (or a
+        missing file) is not applied and None is returned.
+        """
+        path = Path(path)
+        if not path.exists():
+            if expect is not None:
+                return None
+            raise FileNotFoundError(f"Checkpoint not found: {path}")
+        with open(path, "rb") as fh:
+            state = pickle.load(fh)
+        if expect is not None and any(state["meta"].get(k) != v for k, v in expect.items()):
+            return None
+        self.sheets[family] = state["sheets"]
+        if state["summary"] is not None:
+            self.summaries[family] = state["summary"]
+        if state["labels"] is not None:
+            self.labels[family] = state["labels"]
+        self._invalidate()
+        return state["meta"]
+
+    def save_family(self, family: str, out_dir: Path | str | None = None) -> Path:
+        """Write {family}_Data.xlsx (4 tabs + summary, formatted) like the pipeline."""
+        summary = self.summaries.get(family)
+        if summary is None:
+            summary = self.mark(family)
+        return write_workbook(family, self.sheets[family], summary, Path(out_dir) if out_dir else self.base)
+
+    def save_master(self, path: Path | str | None = None, unique: bool = False) -> Path:
+        """
+        Write the consolidated workbook with the top-3 factor bins highlighted.
+        The unique tabs are built for the file only; master and index keep the full tabs.
+        """
+        if unique:
+            master, top3 = self.consolidated_tabs(unique=True)
+        else:
+            if not self.master:
+                self.consolidate()
+            master, top3 = self.master, self.top3
+        path = Path(path) if path else (self.base / UNIQUE_OUT_PATH.name if unique else self.master_path)
+        tab_bins = {
+            sheet_out_name(family, src_sheet): bins for family, bins in top3.items() for src_sheet in SOURCE_SHEETS
+        }
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for tab, df in master.items():
+                df.to_excel(writer, sheet_name=tab, index=False)
+                fill_top3_factor(writer.sheets[tab], tab_bins.get(tab, []))
+        return path
@@ -0,0 +1,255 @@
+"""
+Embedded SQLite store for all parsed production rows across insulation families.
+
+One table (production_rows) holds every row of every {PREFIX}_Data.xlsx tab with
+indexes on family, material, shape, size key and month, so cross-family
+questions become indexed queries instead of loading 28 tabs into pandas.
+factor_summary holds the per-family Factor_Top5_Summary written by store_marking.py.
+
+Usage:
+  python production_store.py build                       # load all family workbooks
+  python production_store.py query family=DFG material=Aluminium size_key="10.0 x 2.0"
+  python production_store.py summary
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from apply_markings_and_top5_factor import parse_num
+from build_phase1_master_workbook import BASE, SOURCE_FILES, SOURCE_SHEETS
+from extract_insulation_pdf import month_key
+from run_insulation_pipeline import swg_to_mm
+
+DB_PATH = BASE / "palej_production.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS production_rows (
+    id INTEGER PRIMARY KEY,
+    family TEXT NOT NULL,
+    material TEXT NOT NULL,
+    shape TEXT NOT NULL,
+    size_key TEXT NOT NULL,
+    size TEXT,
+    width REAL,
+    thickness REAL,
+    wire_value TEXT,
+    wire_unit TEXT,
+    dia_mm REAL,
+    month TEXT,
+    month_key TEXT,
+    insulation_type TEXT,
+    insulation_1 TEXT,
+    insulation_2 TEXT,
+    total_insulation TEXT,
+    bare_wt REAL,
+    final_qty REAL,
+    insulation_wt REAL,
+    scrap REAL,
+    insulation_pct REAL,
+    invoice_no TEXT,
+    factor REAL,
+    likely_pct REAL,
+    recommended INTEGER NOT NULL DEFAULT 0,
+    top5_label TEXT,
+    reliability REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_rows_family_material_shape ON production_rows (family, material, shape);
+CREATE INDEX IF NOT EXISTS ix_rows_size_key ON production_rows (size_key, family);
+CREATE INDEX IF NOT EXISTS ix_rows_month_key ON production_rows (month_key, family);
+CREATE INDEX IF NOT EXISTS ix_rows_strip_dims ON production_rows (width, thickness);
+CREATE INDEX IF NOT EXISTS ix_rows_dia ON production_rows (dia_mm);
+CREATE INDEX IF NOT EXISTS ix_rows_partition ON production_rows (family, material, shape, size_key, id);
+CREATE TABLE IF NOT EXISTS factor_summary (
+    family TEXT NOT NULL,
+    factor_value REAL NOT NULL,
+    support_score REAL,
+    row_count INTEGER,
+    avg_kg REAL,
+    avg_scrap_rate REAL,
+    rank INTEGER,
+    PRIMARY KEY (family, factor_value)
+);
+"""
+
+COLUMNS = [
+    "family", "material", "shape", "size_key", "size", "width", "thickness",
+    "wire_value", "wire_unit", "dia_mm", "month", "month_key", "insulation_type",
+    "insulation_1", "insulation_2", "total_insulation", "bare_wt", "final_qty",
+    "insulation_wt", "scrap", "insulation_pct", "invoice_no", "factor", "likely_pct",
+    "recommended", "top5_label", "reliability", "source",
+]
+
+QUERY_FILTERS = ["family", "material", "shape", "size_key", "month", "month_key", "insulation_type"]
+
+
+def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _text(row, *cols):
+    for c in cols:
+        v = row.get(c)
+        if v is not None and str(v).strip() not in ("", "nan", "None"):
+            return str(v).strip()
+    return ""
+
+
+def sheet_records(family: str, sheet_name: str, df: pd.DataFrame, source: str = ""):
+    """Yield one insert tuple per row of a processed 4-tab sheet."""
+    material = "Aluminium" if sheet_name.startswith("Alu") else "Copper"
+    shape = "Wire" if "Wire" in sheet_name else "Strip"
+    for _, row in df.iterrows():
+        wire_value = _text(row, "Wire Value", "Wire_Value")
+        wire_unit = _text(row, "Wire Unit", "Wire_Unit")
+        if shape == "Wire":
+            dia = swg_to_mm(wire_value) if wire_unit.upper() == "SWG" else parse_num(wire_value)
+        else:
+            dia = None
+        month = _text(row, "Month")
+        rec = {
+            "family": family,
+            "material": material,
+            "shape": shape,
+            "size_key": _text(row, "Size Key", "Size"),
+            "size": _text(row, "Size"),
+            "width": parse_num(row.get("Width")),
+            "thickness": parse_num(row.get("Thickness")),
+            "wire_value": wire_value,
+            "wire_unit": wire_unit,
+            "dia_mm": dia,
+            "month": month,
+            "month_key": month_key(month),
+            "insulation_type": _text(row, "Type_of_Insulation", "Type of Insulation"),
+            "insulation_1": _text(row, "Insulation_1", "Insulation-1"),
+            "insulation_2": _text(row, "Insulation_2", "Insulation-2"),
+            "total_insulation": _text(row, "Total_Insulation", "Total Insulation"),
+            "bare_wt": parse_num(row.get("Actual Bare wt", row.get("Actual_Bare_Wt_kg"))),
+            "final_qty": parse_num(row.get("Final Dis.Qty.", row.get("Final_Dis_Qty"))),
+            "insulation_wt": parse_num(row.get("Insulation wt kg", row.get("Insulation_Wt"))),
+            "scrap": parse_num(row.get("Scrap")),
+            "insulation_pct": parse_num(row.get("Insulation Per %", row.get("Insulation_Pct"))),
+            "invoice_no": _text(row, "Invoice_No_GST2526"),
+            "factor": parse_num(row.get("factor")),
+            "likely_pct": parse_num(row.get("Likely Insulation % Increase")),
+            "recommended": 1 if _text(row, "Recommended % Marked") == "Yes" else 0,
+            "top5_label": _text(row, "Top 5 Likely Factor"),
+            "reliability": parse_num(row.get("Factor Reliability Score")),
+            "source": source,
+        }
+        yield tuple(rec[c] for c in COLUMNS)
+
+
+def load_family(conn: sqlite3.Connection, family: str, sheets: dict, source: str = "") -> int:
+    """Replace all stored rows of one family with the given {sheet_name: df} tabs."""
+    insert = f"INSERT INTO production_rows ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+    n = 0
+    with conn:
+        conn.execute("DELETE FROM production_rows WHERE family = ?", (family,))
+        for sheet_name, df in sheets.items():
+            if sheet_name not in SOURCE_SHEETS:
+                continue
+            records = list(sheet_records(family, sheet_name, df, source))
+            conn.executemany(insert, records)
+            n += len(records)
+    return n
+
+
+def load_workbook_file(conn: sqlite3.Connection, family: str, path: Path) -> int:
+    xl = pd.ExcelFile(path)
+    sheets = {
+        s: pd.read_excel(path, sheet_name=s, dtype=str).fillna("")
+        for s in SOURCE_SHEETS
+        if s in xl.sheet_names
+    }
+    return load_family(conn, family, sheets, source=Path(path).name)
+
+
+def query_rows(conn: sqlite3.Connection, limit: int | None = None, order_by: str = "family, material, shape, size_key", **filters) -> pd.DataFrame:
+    """
+    Indexed row lookup. Filters are equality matches on QUERY_FILTERS columns;
+    month_from / month_to take 'YYYY-MM' bounds on month_key.
+    """
+    clauses, params = [], []
+    for col, val in filters.items():
+        if val is None:
+            continue
+        if col == "month_from":
+            clauses.append("month_key >= ?")
+        elif col == "month_to":
+            clauses.append("month_key <= ?")
+        elif col in QUERY_FILTERS:
+            clauses.append(f"{col} = ?")
+        else:
+            raise ValueError(f"Unsupported filter: {col}")
+        params.append(val)
+    sql = "SELECT * FROM production_rows"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {order_by}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def size_summary(conn: sqlite3.Connection, **filters) -> pd.DataFrame:
+    """Per family/material/shape/size key: row count, kg, green-selected likely % and mean factor."""
+    df = query_rows(conn, **filters)
+    if df.empty:
+        return df
+    grp = df.groupby(["family", "material", "shape", "size_key"], sort=True)
+    return grp.agg(
+        rows=("id", "count"),
+        total_bare_kg=("bare_wt", "sum"),
+        mean_factor=("factor", "mean"),
+        likely_pct=("likely_pct", "first"),
+        months=("month_key", "nunique"),
+    ).reset_index()
+
+
+def family_summary(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(
+        """
+        SELECT family, material, shape, COUNT(*) AS rows,
+               COUNT(DISTINCT size_key) AS size_keys,
+               MIN(month_key) AS first_month, MAX(month_key) AS last_month
+        FROM production_rows
+        GROUP BY family, material, shape
+        ORDER BY family, material, shape
+        """,
+        conn,
+    )
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "query", "summary"):
+        print("Usage: python production_store.py build | summary | query key=value ...")
+        sys.exit(1)
+
+    conn = connect()
+    cmd = sys.argv[1]
+    if cmd == "build":
+        for family, path in SOURCE_FILES:
+            if not path.exists():
+                print(f"  skip {family}: missing {path}")
+                continue
+            n = load_workbook_file(conn, family, path)
+            print(f"  {family}: {n} rows")
+        print(f"Store: {DB_PATH}")
+    elif cmd == "summary":
+        print(family_summary(conn).to_string(index=False))
+    else:
+        filters = dict(arg.split("=", 1) for arg in sys.argv[2:])
+        limit = filters.pop("limit", None)
+        df = query_rows(conn, limit=int(limit) if limit else None, **filters)
+        print(df.to_string(index=False))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import math
 import shutil
-from datetime import datetime
 from pathlib import Path
 import itertools
 
@@ -8,6 +7,8 @@ import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
 
+from backup_store import backup_file
+
 
 MISSING_TOKENS = {"", "---", "--", "#VALUE!", "nan", "None"}
 
@@ -247,9 +248,7 @@ def main():
     if not xlsx_path.exists():
         raise FileNotFoundError(f"Workbook not found: {xlsx_path}")
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = xlsx_path.with_suffix(f".xlsx.bak_{ts}")
-    shutil.copy2(xlsx_path, backup_path)
+    backup = backup_file(xlsx_path)
 
     xls = pd.ExcelFile(xlsx_path)
     processed = {}
@@ -275,7 +274,7 @@ def main():
         print("Updated workbook:", xlsx_path)
     else:
         print("Workbook is locked, wrote updated file to:", temp_out)
-    print("Backup created:", backup_path)
+    print(f"Backup: {backup['sha256'][:12]} ({'unchanged, not stored again' if backup['skipped'] else 'stored'})")
     for sheet, df in processed.items():
         marked = (df["Recommended % Marked"] == "Yes").sum()
         sizes = df["Size Key"].nunique() if "Size Key" in df.columns else df["Size"].nunique()
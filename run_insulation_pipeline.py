@@ -1,22 +1,38 @@
 """
 Full pipeline for insulation PDFs: extract → clean → Excel → factor → markings.
-Usage: python run_insulation_pipeline.py <pdf_path> <prefix>
-Example: python run_insulation_pipeline.py "poly data.pdf" Poly
+Usage: python run_insulation_pipeline.py <pdf_path> <prefix> [<pdf_path> <prefix> ...] [--words | --pdfium] [--serial | --append | --refresh [--resume]]
+Example: python run_insulation_pipeline.py "poly data.pdf" Poly "cotton data.pdf" Cotton
+Per-sheet factor/marking stages and the families given run concurrently on one
+process pool (top-5 is reduced per family over its 4 sheets); --serial runs
+everything in this process, one pair after another.
+--words uses column-band word extraction instead of extract_text lines.
+--pdfium reads the text lines with pypdfium2 instead of pdfplumber (same rows, faster).
+--append parses only months not yet in {prefix}_Data.xlsx, appends them and
+re-marks only the size keys that received rows (monthly refresh).
+--refresh runs the given PDFs and the downstream master workbooks in one
+process, handing frames between stages in memory (refresh_pipeline);
+--resume reuses its checkpoints for PDFs that did not change.
 """
 
+import os
 import re
 import shutil
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from itertools import repeat
 from pathlib import Path
 
 import pandas as pd
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
 
-from extract_insulation_pdf import process_pdf
+from extract_insulation_pdf import ROW_HASHES_NAME, RowDeduper, process_pdf, report_summary
 
 BASE = Path(r"c:\Projects\Palej Calculation App")
+CHECKPOINT_DIR = BASE / "checkpoints"
 DENSITY_ALU = 2.709
 DENSITY_CU = 8.89
 MISSING = {"", "---", "--", "#VALUE!", "nan", "None"}
@@ -162,18 +178,34 @@ def add_factor_to_sheets(sheets, prefix):
     return sheets
 
 
-def run_pipeline(pdf_path: str, prefix: str):
-    pdf_path = BASE / pdf_path if not Path(pdf_path).is_absolute() else Path(pdf_path)
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+SHEET_NAMES = ["Aluminium Strips", "Copper Strips", "Aluminium Wires", "Copper Wires"]
 
-    result = process_pdf(str(pdf_path), prefix, str(BASE))
+
+def extract_sheets(
+    pdf_path: str,
+    prefix: str,
+    method: str = "text",
+    backend: str = "pdfplumber",
+    out_dir: Path = BASE,
+    dedupe: RowDeduper | None = None,
+) -> dict | None:
+    """
+    Extract and clean one PDF into the 4 normalized sheets (None when nothing
+    was parsed). dedupe: seen set shared with earlier PDFs of prefix (process_pdf).
+    """
+    result = process_pdf(pdf_path, prefix, str(out_dir), method=method, backend=backend, dedupe=dedupe)
     if result["total"] == 0:
         print(f"No data extracted from {pdf_path}")
-        return
+        return None
 
     print(f"Extracted {result['total']} entries")
-    dfs = result["dfs"]
+    print(f"  Parse: {report_summary(result['report'])} -> {Path(result['report_path']).name}")
+    return normalize_sheets(result["dfs"])
+
+
+def normalize_sheets(dfs: dict) -> dict:
+    """process_pdf partitions (al_strips, cu_strips, al_wires, cu_wires) -> the 4 cleaned, normalized sheets."""
+    dfs = dict(dfs)
 
     # Clean: remove rows with missing Insulation Per %
     def clean(df):
@@ -192,8 +224,6 @@ def run_pipeline(pdf_path: str, prefix: str):
         if before != after:
             print(f"  {k}: removed {before - after} rows with missing Insulation Per %")
 
-    # Sheet names
-    sheet_names = ["Aluminium Strips", "Copper Strips", "Aluminium Wires", "Copper Wires"]
     strip_cols = [
         "Month", "Covering_No", "Size", "Width", "Thickness",
         "Type_of_Insulation", "Insulation_1", "Insulation_2", "Total_Insulation",
@@ -218,48 +248,248 @@ def run_pipeline(pdf_path: str, prefix: str):
         df = dfs[key]
         avail = [c for c in cols if c in df.columns]
         sheets[name] = normalize_columns(df[avail].copy(), is_strip)
+    return sheets
 
-    # Add factor
-    sheets = add_factor_to_sheets(sheets, prefix)
 
-    # Apply markings (import logic from apply_markings)
-    from apply_markings_and_top5_factor import (
-        apply_formatting,
-        apply_row_labels,
-        compute_top5_factor_labels,
-        process_sheet as process_sheet_markings,
-    )
+def mark_sheet(prefix: str, name: str, df: pd.DataFrame) -> tuple[str, pd.DataFrame]:
+    """Per-sheet map stage: factor, then duplicate / green markings (sheets are independent here)."""
+    from apply_markings_and_top5_factor import process_sheet as process_sheet_markings
 
-    for name in sheets:
-        sheets[name] = process_sheet_markings(sheets[name])
-    label_data, summary_df = compute_top5_factor_labels(sheets)
-    sheets = apply_row_labels(sheets, label_data)
+    df = add_factor_to_sheets({name: df}, prefix)[name]
+    return name, process_sheet_markings(df)
 
-    out_path = BASE / f"{prefix}_Data.xlsx"
+
+def write_workbook(prefix: str, sheets: dict, summary_df: pd.DataFrame, out_dir: Path = BASE) -> Path:
+    from apply_markings_and_top5_factor import apply_formatting
+
+    out_path = out_dir / f"{prefix}_Data.xlsx"
     try:
         with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-            for name in sheet_names:
+            for name in SHEET_NAMES:
                 sheets[name].to_excel(writer, sheet_name=name, index=False)
             summary_df.to_excel(writer, sheet_name="Factor_Top5_Summary", index=False)
     except PermissionError:
-        out_path = BASE / f"{prefix}_Data_updated.xlsx"
+        out_path = out_dir / f"{prefix}_Data_updated.xlsx"
         with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-            for name in sheet_names:
+            for name in SHEET_NAMES:
                 sheets[name].to_excel(writer, sheet_name=name, index=False)
             summary_df.to_excel(writer, sheet_name="Factor_Top5_Summary", index=False)
 
     apply_formatting(out_path)
+    return out_path
+
+
+def run_pipeline(
+    pdf_path: str | list[str], prefix: str, method: str = "text", backend: str = "pdfplumber", pool=None, store_lock=None
+):
+    """
+    One family end to end, from one PDF or from several PDFs of the family
+    (e.g. overlapping month ranges). Several PDFs are extracted in order with
+    one shared RowDeduper, so rows an earlier PDF already gave are dropped, and
+    their sheets go into one workbook. With a process pool, extraction, the 4
+    per-sheet factor/marking stages and the workbook write run in the pool; the
+    top-5 reduce over all sheets and the store load stay in the calling thread.
+    Without a pool everything runs in this process.
+    """
+    from apply_markings_and_top5_factor import apply_row_labels, compute_top5_factor_labels
+
+    pdf_paths = [pdf_path] if isinstance(pdf_path, (str, Path)) else pdf_path
+    pdf_paths = [BASE / p if not Path(p).is_absolute() else Path(p) for p in pdf_paths]
+    for path in pdf_paths:
+        if not path.exists():
+            raise FileNotFoundError(f"PDF not found: {path}")
+
+    call = (lambda fn, *a: pool.submit(fn, *a).result()) if pool else (lambda fn, *a: fn(*a))
+    # A pool worker extends a pickled copy of the seen set; later PDFs reload the one it saved
+    hashes_path = str(BASE / ROW_HASHES_NAME.format(prefix=prefix))
+    parts = []
+    for i, path in enumerate(pdf_paths):
+        dedupe = RowDeduper.load(hashes_path) if i else RowDeduper()
+        part = call(extract_sheets, str(path), prefix, method, backend, BASE, dedupe)
+        if part is not None:
+            parts.append(part)
+    if not parts:
+        return
+    sheets = {name: pd.concat([part[name] for part in parts], ignore_index=True) for name in SHEET_NAMES}
+
+    stage = pool.map if pool else map
+    sheets = dict(stage(mark_sheet, repeat(prefix), list(sheets), list(sheets.values())))
+
+    # Reduce: top-5 factor bins need rows of all four sheets
+    label_data, summary_df = compute_top5_factor_labels(sheets)
+    sheets = apply_row_labels(sheets, label_data)
+    out_path = call(write_workbook, prefix, sheets, summary_df)
+
+    from production_store import connect, load_family
+
+    with store_lock or nullcontext():
+        conn = connect()
+        stored = load_family(conn, prefix, sheets, source=out_path.name)
+        conn.close()
 
     print(f"\nSaved: {out_path}")
+    print(f"Store: {stored} rows loaded for {prefix}")
     print(f"Top 5 factors: {label_data['top5']}")
-    for name in sheet_names:
+    for name in SHEET_NAMES:
         df = sheets[name]
         print(f"  {name}: {len(df)} rows, factor filled: {df['factor'].astype(str).str.strip().ne('').sum()}")
     return out_path
 
 
+def run_pipelines(jobs: list[tuple[str, str]], method: str = "text", backend: str = "pdfplumber", workers: int | None = None) -> dict:
+    """
+    Run several (pdf_path, prefix) pairs on one shared process pool so that
+    families overlap. Pairs with the same prefix go through one run_pipeline in
+    the given order (one seen set, one workbook); store loads are serialized.
+    Returns {prefix: [out_path]}.
+    """
+    by_prefix = {}
+    for pdf_path, prefix in jobs:
+        by_prefix.setdefault(prefix, []).append(pdf_path)
+    store_lock = threading.Lock()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        def run_family(prefix):
+            return [run_pipeline(by_prefix[prefix], prefix, method, backend, pool, store_lock)]
+
+        with ThreadPoolExecutor(max_workers=len(by_prefix)) as threads:
+            return dict(zip(by_prefix, threads.map(run_family, by_prefix)))
+
+
+def append_pipeline(pdf_path: str, prefix: str, method: str = "text", backend: str = "pdfplumber"):
+    """
+    Append-only monthly refresh of {prefix}_Data.xlsx: only months not yet in
+    the workbook are parsed, and only size keys with new rows are re-marked
+    (PalejEngine.ingest). Falls back to a full run when there is no workbook yet.
+    """
+    from palej_engine import PalejEngine
+    from production_store import connect, load_family
+
+    engine = PalejEngine(source_files={prefix: BASE / f"{prefix}_Data.xlsx"}).load()
+    added = engine.ingest(pdf_path, prefix, method, backend)
+    if not any(added.values()):
+        print(f"No new rows for {prefix} (stored months: {', '.join(sorted(engine.stored_months(prefix)))})")
+        return None
+    out_path = engine.save_family(prefix)
+
+    conn = connect()
+    stored = load_family(conn, prefix, engine.sheets[prefix], source=out_path.name)
+    conn.close()
+
+    print(f"\nSaved: {out_path}")
+    print(f"Store: {stored} rows loaded for {prefix}")
+    print(f"Top 5 factors: {engine.labels[prefix]['top5']}")
+    for name in SHEET_NAMES:
+        print(f"  {name}: +{added.get(name, 0)} rows, {len(engine.sheets[prefix][name])} total")
+    return out_path
+
+
+def file_signature(path: Path) -> list | None:
+    if not path.exists():
+        return None
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def refresh_pipeline(
+    jobs: list[tuple[str, str]],
+    method: str = "text",
+    backend: str = "pdfplumber",
+    resume: bool = False,
+    checkpoint_dir: Path = CHECKPOINT_DIR,
+) -> dict:
+    """
+    Full refresh without xlsx as the transport between stages. The chain
+    run_pipeline -> {prefix}_Data.xlsx -> build_phase1_master_workbook ->
+    Phase1_Master_Consolidated.xlsx -> enforce_unique_master_tabs runs on one
+    PalejEngine: extracted, factored and marked frames go straight to
+    consolidation, the search index and the unique pass. xlsx is written once
+    per artifact at the end ({prefix}_Data.xlsx, the master and its _Unique
+    variant). Families given use their fresh frames in the master even where
+    SOURCE_FILES names another workbook (Poly_Data_updated.xlsx).
+
+    Each family's frames are checkpointed as checkpoint_dir/{family}.pkl.
+    Families not given are taken from their checkpoint while the workbook it
+    records is unchanged (the {family}_Data.xlsx of an earlier refresh, else
+    the SOURCE_FILES workbook), else read from the SOURCE_FILES workbook once.
+    With resume=True a given PDF whose size / mtime, method and backend match
+    its checkpoint is not parsed again. Returns {artifact: path}.
+    """
+    from build_phase1_master_workbook import SOURCE_FILES
+    from build_search_index import JSON_NAME, OUT_DIR, build_search_index, fabrication_docs, master_docs
+    from palej_engine import PalejEngine
+    from production_store import connect, load_family
+
+    engine = PalejEngine()
+    refreshed = {}
+    for pdf_arg, prefix in jobs:
+        pdf_path = BASE / pdf_arg if not Path(pdf_arg).is_absolute() else Path(pdf_arg)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        meta = {"pdf": pdf_path.name, "pdf_signature": file_signature(pdf_path), "method": method, "backend": backend}
+        if resume and engine.restore(prefix, checkpoint_dir / f"{prefix}.pkl", expect=meta) is not None:
+            print(f"{prefix}: unchanged, restored from checkpoint")
+        else:
+            if engine.extract(pdf_arg, prefix, method, backend) is None:
+                continue
+            engine.factor(prefix)
+            engine.mark(prefix)
+        refreshed[prefix] = meta
+
+    for family, path in SOURCE_FILES:
+        if family in refreshed:
+            continue
+        ckpt = checkpoint_dir / f"{family}.pkl"
+        # A refreshed family was checkpointed with the workbook it wrote ({family}_Data.xlsx), not its SOURCE_FILES one
+        workbook = engine.base / (PalejEngine.checkpoint_meta(ckpt) or {}).get("workbook", path.name)
+        expect = {"workbook": workbook.name, "workbook_signature": file_signature(workbook)}
+        if engine.restore(family, ckpt, expect=expect) is not None:
+            continue
+        engine.load([family])
+        if family in engine.sheets:
+            engine.checkpoint(family, ckpt, workbook=path.name, workbook_signature=file_signature(path))
+
+    outputs = {}
+    conn = connect()
+    for prefix, meta in refreshed.items():
+        out_path = engine.save_family(prefix)
+        stored = load_family(conn, prefix, engine.sheets[prefix], source=out_path.name)
+        engine.checkpoint(
+            prefix, checkpoint_dir / f"{prefix}.pkl", **meta, workbook=out_path.name, workbook_signature=file_signature(out_path)
+        )
+        outputs[out_path.name] = out_path
+        print(f"{prefix}: {out_path.name}, store {stored} rows, top 5 {engine.labels.get(prefix, {}).get('top5')}")
+    conn.close()
+
+    master_path = engine.save_master()
+    outputs[master_path.name] = master_path
+    index = build_search_index(master_docs(engine.master) + fabrication_docs())
+    outputs[JSON_NAME] = OUT_DIR / JSON_NAME
+    unique_path = engine.save_master(unique=True)
+    outputs[unique_path.name] = unique_path
+    print(f"Master: {master_path.name} ({len(engine.master)} tabs), unique: {unique_path.name}")
+    print(f"Search index: {index['doc_count']} docs, {len(index['tokens'])} size tokens")
+    return outputs
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python run_insulation_pipeline.py <pdf_path> <prefix>")
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2 or len(args) % 2:
+        print("Usage: python run_insulation_pipeline.py <pdf_path> <prefix> [<pdf_path> <prefix> ...] [--words | --pdfium] [--serial | --append | --refresh [--resume]]")
         sys.exit(1)
-    run_pipeline(sys.argv[1], sys.argv[2])
+    method = "words" if "--words" in sys.argv else "text"
+    backend = "pypdfium2" if "--pdfium" in sys.argv else "pdfplumber"
+    pairs = list(zip(args[0::2], args[1::2]))
+    if "--refresh" in sys.argv:
+        refresh_pipeline(pairs, method=method, backend=backend, resume="--resume" in sys.argv)
+    elif "--append" in sys.argv:
+        for pdf_path, prefix in pairs:
+            append_pipeline(pdf_path, prefix, method=method, backend=backend)
+    elif "--serial" in sys.argv:
+        by_prefix = {}
+        for pdf_path, prefix in pairs:
+            by_prefix.setdefault(prefix, []).append(pdf_path)
+        for prefix, pdf_paths in by_prefix.items():
+            run_pipeline(pdf_paths, prefix, method=method, backend=backend)
+    else:
+        run_pipelines(pairs, method=method, backend=backend)
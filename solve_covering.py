@@ -0,0 +1,191 @@
+"""
+Batch inverse solver: covering thickness implied by each row's Insulation Per %.
+
+For a given factor (default: each family's top-1 factor bin from
+Factor_Top5_Summary) the strip and wire area equations are solved for covering
+in closed form over whole NumPy columns, then compared with the covering
+recorded in Insulation_1/Insulation_2/Total_Insulation.
+
+Rows are flagged when the implied covering is implausible:
+  no_solution  - pct/size/density missing or non-positive
+  too_thin     - implied covering < MIN_PLAUSIBLE_MM
+  too_thick    - implied covering > MAX_PLAUSIBLE_MM
+  off_record   - implied / recorded covering outside RECORD_RATIO_RANGE
+
+Usage: python solve_covering.py [factor] [out.csv]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_phase1_master_workbook import BASE, SOURCE_FILES, SOURCE_SHEETS
+from calc_engine import DENSITY_ALU, DENSITY_CU, strip_covering_for_pct, wire_covering_for_pct
+from run_insulation_pipeline import SWG_TO_MM
+
+OUT_PATH = BASE / "covering_solver_report.csv"
+MIN_PLAUSIBLE_MM = 0.05
+MAX_PLAUSIBLE_MM = 3.0
+RECORD_RATIO_RANGE = (0.5, 2.0)
+
+MISSING = {"", "---", "--", "#VALUE!", "nan", "None"}
+
+
+def numeric_column(df: pd.DataFrame, *names) -> np.ndarray:
+    """First present column parsed as float (missing tokens -> NaN)."""
+    for name in names:
+        if name in df.columns:
+            s = df[name].astype(str).str.strip()
+            s = s.where(~s.isin(MISSING), "").str.replace(",", ".", regex=False)
+            return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+    return np.full(len(df), np.nan)
+
+
+def lower_bound_column(df: pd.DataFrame, *names) -> np.ndarray:
+    """Like numeric_column, but ranges such as '0.50-.55' give their lower bound."""
+    for name in names:
+        if name in df.columns:
+            s = df[name].astype(str).str.strip()
+            s = s.where(~s.isin(MISSING) & ~s.str.startswith("-"), "")
+            lower = s.str.split("-", n=1).str[0].str.strip().str.replace(",", ".", regex=False)
+            return pd.to_numeric(lower, errors="coerce").to_numpy(dtype=float)
+    return np.full(len(df), np.nan)
+
+
+def density_column(df: pd.DataFrame) -> np.ndarray:
+    mat = df.get("Alu / Cop", df.get("Material", pd.Series("", index=df.index))).astype(str).str.strip().str.upper()
+    return np.select(
+        [mat.str.startswith("ALU"), mat.str.startswith("COP") | mat.str.startswith("CU")],
+        [DENSITY_ALU, DENSITY_CU],
+        default=np.nan,
+    )
+
+
+def diameter_column(df: pd.DataFrame) -> np.ndarray:
+    """Wire diameter in mm: SWG labels/gauges via SWG_TO_MM, mm values as-is."""
+    raw = df.get("Wire Value", df.get("Wire_Value", pd.Series("", index=df.index))).astype(str).str.strip()
+    unit = df.get("Wire Unit", df.get("Wire_Unit", pd.Series("", index=df.index))).astype(str).str.strip().str.upper()
+    value = numeric_column(pd.DataFrame({"v": raw}), "v")
+    labels = raw.map({k: v for k, v in SWG_TO_MM.items() if isinstance(k, str)})
+    gauge = np.where(np.isnan(value), -1, np.round(value)).astype(int)
+    by_gauge = pd.Series(gauge).map({k: v for k, v in SWG_TO_MM.items() if isinstance(k, int)}).to_numpy(dtype=float)
+    swg_mm = np.where(labels.notna().to_numpy(), labels.to_numpy(dtype=float, na_value=np.nan), by_gauge)
+    return np.where((unit == "SWG").to_numpy(), swg_mm, value)
+
+
+def recorded_covering(df: pd.DataFrame) -> np.ndarray:
+    """Vectorised effective covering: lower(Ins1) + lower(Ins2), else Ins1, else Total (NaN if none)."""
+    ins1 = lower_bound_column(df, "Insulation_1", "Insulation-1")
+    ins2 = lower_bound_column(df, "Insulation_2", "Insulation-2")
+    total = lower_bound_column(df, "Total_Insulation", "Total Insulation")
+    return np.where(~np.isnan(ins1) & ~np.isnan(ins2), ins1 + ins2, np.where(~np.isnan(ins1), ins1, total))
+
+
+def sheet_arrays(df: pd.DataFrame, is_wire: bool) -> dict:
+    """Per-row numeric columns needed by the vectorised solvers."""
+    arrays = {
+        "pct": numeric_column(df, "Insulation Per %", "Insulation_Pct"),
+        "density": density_column(df),
+        "recorded_covering": recorded_covering(df),
+    }
+    if is_wire:
+        arrays["dia"] = diameter_column(df)
+    else:
+        arrays["width"] = numeric_column(df, "Width")
+        arrays["thickness"] = numeric_column(df, "Thickness")
+    return arrays
+
+
+def implied_covering(arrays: dict, factor, is_wire: bool) -> np.ndarray:
+    if is_wire:
+        return wire_covering_for_pct(arrays["dia"], arrays["pct"], factor, arrays["density"])
+    return strip_covering_for_pct(arrays["width"], arrays["thickness"], arrays["pct"], factor, arrays["density"])
+
+
+def covering_flags(implied: np.ndarray, recorded: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = implied / recorded
+    lo, hi = RECORD_RATIO_RANGE
+    return np.select(
+        [
+            ~np.isfinite(implied) | (implied <= 0),
+            implied < MIN_PLAUSIBLE_MM,
+            implied > MAX_PLAUSIBLE_MM,
+            np.isfinite(ratio) & ((ratio < lo) | (ratio > hi)),
+        ],
+        ["no_solution", "too_thin", "too_thick", "off_record"],
+        default="",
+    )
+
+
+def family_top1_factor(path: Path):
+    if not path.exists() or "Factor_Top5_Summary" not in pd.ExcelFile(path).sheet_names:
+        return None
+    summary = pd.read_excel(path, sheet_name="Factor_Top5_Summary")
+    ranked = summary[pd.to_numeric(summary.get("rank"), errors="coerce") == 1]
+    return float(ranked["factor_value"].iloc[0]) if not ranked.empty else None
+
+
+def solve_family(family: str, sheets: dict, factor: float) -> pd.DataFrame:
+    """Implied covering for every row of one family's 4 tabs at the given factor."""
+    parts = []
+    for name, df in sheets.items():
+        is_wire = "Wire" in name
+        arrays = sheet_arrays(df, is_wire)
+        implied = implied_covering(arrays, factor, is_wire)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "family": family,
+                    "sheet": name,
+                    "Size": df.get("Size", pd.Series("", index=df.index)).to_numpy(),
+                    "Insulation Per %": arrays["pct"],
+                    "factor_used": factor,
+                    "recorded_covering": arrays["recorded_covering"],
+                    "implied_covering": np.round(implied, 4),
+                    "covering_flag": covering_flags(implied, arrays["recorded_covering"]),
+                }
+            )
+        )
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def main():
+    fixed_factor = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    out_path = Path(sys.argv[2]) if len(sys.argv) > 2 else OUT_PATH
+
+    family_sheets = {}
+    for family, path in SOURCE_FILES:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing source workbook: {path}")
+        xl = pd.ExcelFile(path)
+        family_sheets[family] = (
+            {s: pd.read_excel(xl, sheet_name=s, dtype=str).fillna("") for s in SOURCE_SHEETS if s in xl.sheet_names},
+            fixed_factor if fixed_factor is not None else (family_top1_factor(path) or 1.0),
+        )
+
+    t0 = time.perf_counter()
+    report = pd.concat(
+        [solve_family(family, sheets, factor) for family, (sheets, factor) in family_sheets.items()],
+        ignore_index=True,
+    )
+    elapsed = time.perf_counter() - t0
+    report.to_csv(out_path, index=False)
+
+    print(f"Solved {len(report)} rows across {len(family_sheets)} families in {elapsed * 1000:.1f} ms")
+    print(f"Report: {out_path}")
+    summary = report.groupby(["family", "sheet"]).agg(
+        rows=("implied_covering", "size"),
+        factor=("factor_used", "first"),
+        median_implied=("implied_covering", "median"),
+        median_recorded=("recorded_covering", "median"),
+        flagged=("covering_flag", lambda f: int((f != "").sum())),
+    )
+    print(summary.to_string())
+
+
+if __name__ == "__main__":
+    main()
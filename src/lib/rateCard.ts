@@ -0,0 +1,125 @@
+/**
+ * Precomputed rate card (build_rate_card.py -> public/rate_card.json + .bin).
+ * Load once, then every quote line is a lookup instead of a recompute.
+ * Sizes are the catalog grid plus every size in the master workbook when the
+ * card was built; any other size (and wires given neither as SWG nor mm) returns null.
+ */
+
+export interface RateCardSection {
+    name: "width_or_dia" | "thickness" | "bare_kg_km" | "insulation_pct";
+    dtype: "float32" | "uint16";
+    shape: number[];
+    offset: number;
+    scale?: number;
+}
+
+export interface RateCardMeta {
+    families: string[];
+    family_presets: Record<string, string>;
+    materials: string[];
+    densities: number[];
+    strip_count: number;
+    wire_swg: number[];
+    /** wire diameters (mm) produced without an SWG gauge */
+    wire_mm: number[];
+    coverings: Record<string, { STRIP: number; WIRE: number }>;
+    /** [family][material][rank] factor used for each rank */
+    factor_bins: number[][][];
+    binary: string;
+    sections: RateCardSection[];
+}
+
+export interface RateCard {
+    meta: RateCardMeta;
+    bareKgKm: Float32Array;
+    insulationPct: Uint16Array;
+    pctScale: number;
+    sizeIndex: Map<string, number>;
+}
+
+export interface RateLookup {
+    family: string;
+    material: "Aluminium" | "Copper";
+    /** 0 = most supported factor bin */
+    rank?: number;
+    shape: "STRIP" | "WIRE";
+    width?: number;
+    thickness?: number;
+    /** WIRE: SWG gauge, or diameter in mm when swg is not given */
+    swg?: number;
+    dia?: number;
+}
+
+export interface RateResult {
+    factor: number;
+    covering: number;
+    bareKgKm: number;
+    insulatedKgKm: number;
+    percentIncrease: number;
+}
+
+const stripKey = (width: number, thickness: number) => `S${width.toFixed(2)}x${thickness.toFixed(2)}`;
+const wireKey = (swg: number) => `W${swg}`;
+const mmKey = (dia: number) => `M${dia.toFixed(2)}`;
+
+export async function loadRateCard(basePath = ""): Promise<RateCard | null> {
+    const metaRes = await fetch(`${basePath}/rate_card.json`);
+    if (!metaRes.ok) return null;
+    const meta: RateCardMeta = await metaRes.json();
+    const binRes = await fetch(`${basePath}/${meta.binary}`);
+    if (!binRes.ok) return null;
+    const buffer = await binRes.arrayBuffer();
+
+    const section = (name: RateCardSection["name"]) => {
+        const s = meta.sections.find((x) => x.name === name)!;
+        const count = s.shape.reduce((a, b) => a * b, 1);
+        return {
+            s,
+            data: s.dtype === "float32" ? new Float32Array(buffer, s.offset, count) : new Uint16Array(buffer, s.offset, count),
+        };
+    };
+
+    const widthOrDia = section("width_or_dia").data;
+    const thickness = section("thickness").data;
+    const sizeIndex = new Map<string, number>();
+    for (let i = 0; i < meta.strip_count; i++) sizeIndex.set(stripKey(widthOrDia[i], thickness[i]), i);
+    meta.wire_swg.forEach((swg, j) => sizeIndex.set(wireKey(swg), meta.strip_count + j));
+    const mmStart = meta.strip_count + meta.wire_swg.length;
+    (meta.wire_mm ?? []).forEach((dia, j) => sizeIndex.set(mmKey(dia), mmStart + j));
+
+    const pct = section("insulation_pct");
+    return {
+        meta,
+        bareKgKm: section("bare_kg_km").data as Float32Array,
+        insulationPct: pct.data as Uint16Array,
+        pctScale: pct.s.scale ?? 1,
+        sizeIndex,
+    };
+}
+
+export function lookupRate(card: RateCard, q: RateLookup): RateResult | null {
+    const { meta } = card;
+    const f = meta.families.indexOf(q.family);
+    const m = meta.materials.indexOf(q.material);
+    const rank = q.rank ?? 0;
+    const key =
+        q.shape === "STRIP"
+            ? stripKey(q.width ?? 0, q.thickness ?? 0)
+            : q.swg !== undefined
+              ? wireKey(q.swg)
+              : mmKey(q.dia ?? -1);
+    const size = card.sizeIndex.get(key);
+    const ranks = meta.factor_bins[0]?.[0]?.length ?? 0;
+    if (f < 0 || m < 0 || size === undefined || rank < 0 || rank >= ranks) return null;
+
+    const sizes = card.bareKgKm.length / meta.materials.length;
+    const bareKgKm = card.bareKgKm[m * sizes + size];
+    const percentIncrease = card.insulationPct[((f * meta.materials.length + m) * ranks + rank) * sizes + size] / card.pctScale;
+    return {
+        factor: meta.factor_bins[f][m][rank],
+        covering: meta.coverings[q.family][q.shape],
+        bareKgKm,
+        insulatedKgKm: bareKgKm * (1 + percentIncrease / 100),
+        percentIncrease,
+    };
+}
@@ -0,0 +1,123 @@
+/**
+ * Prebuilt size search index (build_search_index.py -> public/search_index.json).
+ * Load once; size typeahead is a binary search over the sorted token table.
+ */
+
+export interface SearchIndex {
+    version: number;
+    doc_count: number;
+    families: string[];
+    insulations: string[];
+    materials: string[];
+    sources: string[];
+    /** sorted unique normalized size tokens ("10.00X2.00", "10SWG", "5.60MM") */
+    tokens: string[];
+    /** token i owns docs [token_offsets[i], token_offsets[i + 1]) */
+    token_offsets: number[];
+    docs: {
+        size: string[];
+        family: number[];
+        insulation: number[];
+        material: number[];
+        source: number[];
+        pct: (number | null)[];
+        factor: (number | null)[];
+        month: string[];
+        tab: string[];
+    };
+    /** sorted doc ids, aligned with insulations / materials */
+    postings: { insulation: number[][]; material: number[][] };
+}
+
+export interface SearchFilter {
+    insulation?: string;
+    material?: string;
+    limit?: number;
+}
+
+export interface SearchHit {
+    doc: number;
+    size: string;
+    token: string;
+    family: string;
+    insulation: string;
+    material: string;
+    source: string;
+    pct: number | null;
+    factor: number | null;
+    month: string;
+}
+
+export async function loadSearchIndex(basePath = ""): Promise<SearchIndex | null> {
+    const res = await fetch(`${basePath}/search_index.json`);
+    if (!res.ok) return null;
+    return res.json();
+}
+
+/**
+ * Typed text -> token prefix, same rules as size_token in build_search_index.py:
+ * numbers followed by X or M(M) are padded to 2 decimals, the number still
+ * being typed is left as is ("4.50 X 2" -> "4.50X2", "5.6 mm" -> "5.60MM").
+ */
+export function normalizeSizeQuery(query: string): string {
+    const text = query.replace(/\s+/g, "").toUpperCase().replace(/[×*]/g, "X");
+    return text.replace(/\d+(?:\.\d*)?(?=X|M)/g, (n) => Number(n).toFixed(2));
+}
+
+function lowerBound(tokens: string[], prefix: string): number {
+    let lo = 0;
+    let hi = tokens.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (tokens[mid] < prefix) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+}
+
+/** Token range [start, end) whose tokens start with the normalized query. */
+export function tokenRange(index: SearchIndex, query: string): [number, number] {
+    const prefix = normalizeSizeQuery(query);
+    const start = lowerBound(index.tokens, prefix);
+    let end = start;
+    while (end < index.tokens.length && index.tokens[end].startsWith(prefix)) end++;
+    return [start, end];
+}
+
+/** Sorted doc ids of an insulation type / material (null = no filter when value is empty). */
+export function postingsFor(index: SearchIndex, facet: "insulation" | "material", value?: string): number[] | null {
+    if (!value) return null;
+    const names = facet === "insulation" ? index.insulations : index.materials;
+    const i = names.indexOf(value);
+    return i < 0 ? [] : index.postings[facet][i];
+}
+
+export function searchSizes(index: SearchIndex, query: string, filter: SearchFilter = {}): SearchHit[] {
+    const [start, end] = tokenRange(index, query);
+    const { docs } = index;
+    const insulation = filter.insulation ? index.insulations.indexOf(filter.insulation) : -1;
+    const material = filter.material ? index.materials.indexOf(filter.material) : -1;
+    if ((filter.insulation && insulation < 0) || (filter.material && material < 0)) return [];
+
+    const limit = filter.limit ?? 50;
+    const hits: SearchHit[] = [];
+    for (let t = start; t < end && hits.length < limit; t++) {
+        for (let d = index.token_offsets[t]; d < index.token_offsets[t + 1] && hits.length < limit; d++) {
+            if (insulation >= 0 && docs.insulation[d] !== insulation) continue;
+            if (material >= 0 && docs.material[d] !== material) continue;
+            hits.push({
+                doc: d,
+                size: docs.size[d],
+                token: index.tokens[t],
+                family: index.families[docs.family[d]],
+                insulation: index.insulations[docs.insulation[d]],
+                material: index.materials[docs.material[d]],
+                source: index.sources[docs.source[d]],
+                pct: docs.pct[d],
+                factor: docs.factor[d],
+                month: docs.month[d],
+            });
+        }
+    }
+    return hits;
+}
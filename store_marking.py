@@ -0,0 +1,348 @@
+"""
+Out-of-core marking and consolidation over the production store.
+
+process_sheet / compute_top5_factor_labels / dedupe_green_rows need a whole
+family in pandas. Here the history stays in palej_production.sqlite and is
+streamed per partition (family, material, shape), ordered by size key, in
+chunks of at most CHUNK_ROWS rows that never split a size key:
+
+  pass 1  green selection per size key (select_green_row) -> likely_pct, recommended;
+          per factor bin only linear sums are kept (count, kg, total, scrap rate,
+          match, completeness) plus the family-wide min / max of kg, total and
+          scrap rate, which is all the reliability min-max normalization needs
+  reduce  per-bin support from those sums -> factor_summary table and top-5 bins
+  pass 2  per-row reliability and Top 5 label written back to the store
+  consolidate  dedupe_green_rows per chunk of green rows (combos never cross
+          size keys); only the consolidated tabs are held in memory
+
+Updates go through temp tables and one UPDATE ... FROM per family, so memory is
+bounded by the chunk size and the number of factor bins, not the history.
+
+Usage: python store_marking.py [family ...] [--chunk N] [--db path] [--out master.xlsx]
+Example:
+  python store_marking.py
+  python store_marking.py DFG Poly --chunk 20000 --out Phase1_Master_Consolidated_Store.xlsx
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from apply_markings_and_top5_factor import (
+    REL_W_COMPLETE,
+    REL_W_KG,
+    REL_W_MATCH,
+    REL_W_SCRAP,
+    REL_W_TOTAL,
+    rank_factor_bins,
+    select_green_row,
+)
+from build_phase1_master_workbook import SOURCE_SHEETS, dedupe_green_rows, fill_top3_factor, sheet_out_name
+from production_store import DB_PATH, connect
+
+CHUNK_ROWS = 50_000
+BUCKET_STEP = 0.05
+ROW_COLUMNS = [
+    "id", "size_key", "insulation_type", "insulation_pct", "bare_wt", "final_qty",
+    "insulation_wt", "scrap", "factor", "likely_pct",
+]
+# store column -> sheet column expected by select_green_row / dedupe_green_rows
+SHEET_COLUMNS = {
+    "size_key": "Size Key",
+    "insulation_type": "Type_of_Insulation",
+    "insulation_pct": "Insulation Per %",
+    "bare_wt": "Actual Bare wt",
+    "final_qty": "Final Dis.Qty.",
+    "insulation_wt": "Insulation wt kg",
+    "scrap": "Scrap",
+}
+# (material, shape) in SOURCE_SHEETS order
+PARTITIONS = [(s.split()[0], s.split()[1].rstrip("s")) for s in SOURCE_SHEETS]
+
+
+def num(v):
+    return None if v is None or (isinstance(v, float) and math.isnan(v)) else float(v)
+
+
+def partitions(conn, family: str) -> list[tuple[str, str]]:
+    found = conn.execute(
+        "SELECT DISTINCT material, shape FROM production_rows WHERE family = ?", (family,)
+    ).fetchall()
+    return sorted(found, key=lambda p: PARTITIONS.index(p) if p in PARTITIONS else len(PARTITIONS))
+
+
+def partition_chunks(conn, family: str, material: str, shape: str, columns: list[str], chunk_rows: int = CHUNK_ROWS, where: str = ""):
+    """Yield DataFrames of whole size-key groups (rows ordered by size_key, id), about chunk_rows at a time."""
+    cur = conn.execute(
+        f"SELECT {', '.join(columns)} FROM production_rows "
+        f"WHERE family = ? AND material = ? AND shape = ? {where} ORDER BY size_key, id",
+        (family, material, shape),
+    )
+    key_pos = columns.index("size_key")
+    carry = []
+    while True:
+        batch = cur.fetchmany(chunk_rows)
+        if not batch:
+            break
+        rows = carry + batch
+        cut = len(rows)
+        while cut > 0 and rows[cut - 1][key_pos] == rows[-1][key_pos]:
+            cut -= 1
+        if cut == 0:
+            # one size key larger than a chunk: keep reading until it ends
+            carry = rows
+            continue
+        yield pd.DataFrame.from_records(rows[:cut], columns=columns)
+        carry = rows[cut:]
+    if carry:
+        yield pd.DataFrame.from_records(carry, columns=columns)
+
+
+def row_features(rec, likely) -> dict | None:
+    """build_reliability_rows for one store row (None when factor or % is missing)."""
+    factor, pct = num(rec["factor"]), num(rec["insulation_pct"])
+    if factor is None or pct is None:
+        return None
+    kg = num(rec["bare_wt"]) or 0.0
+    total = num(rec["final_qty"]) or 0.0
+    scrap = num(rec["scrap"])
+    present = [pct, factor, num(rec["bare_wt"]), num(rec["final_qty"]), scrap, likely]
+    if likely is None:
+        match = 0.5
+    else:
+        base = max(1.0, abs(likely) * 0.25)
+        match = max(0.0, 1.0 - abs(pct - likely) / base)
+    return {
+        "kg": kg,
+        "total": total,
+        "scrap_rate": (scrap / kg) if (scrap is not None and kg > 0) else None,
+        "match": match,
+        "completeness": sum(v is not None for v in present) / len(present),
+        "factor_bin": round(factor / BUCKET_STEP) * BUCKET_STEP,
+    }
+
+
+class BinStats:
+    """Family-wide min / max and per-bin linear sums for compute_top5_factor_labels."""
+
+    def __init__(self):
+        self.bins = {}
+        self.kg = [math.inf, -math.inf]
+        self.total = [math.inf, -math.inf]
+        self.rate = [math.inf, -math.inf]
+        self.missing_rates = 0
+
+    def add(self, f: dict):
+        b = self.bins.setdefault(
+            f["factor_bin"],
+            {"count": 0, "kg": 0.0, "total": 0.0, "rate": 0.0, "rates": 0, "missing": 0, "match": 0.0, "complete": 0.0},
+        )
+        b["count"] += 1
+        b["kg"] += f["kg"]
+        b["total"] += f["total"]
+        b["match"] += f["match"]
+        b["complete"] += f["completeness"]
+        for acc, v in ((self.kg, f["kg"]), (self.total, f["total"])):
+            acc[0], acc[1] = min(acc[0], v), max(acc[1], v)
+        if f["scrap_rate"] is None:
+            b["missing"] += 1
+            self.missing_rates += 1
+        else:
+            b["rate"] += f["scrap_rate"]
+            b["rates"] += 1
+            self.rate[0], self.rate[1] = min(self.rate[0], f["scrap_rate"]), max(self.rate[1], f["scrap_rate"])
+
+    def rate_bounds(self):
+        """(worst, min, max) of the filled scrap rates (missing -> worst x 1.1), None without observed rates."""
+        if self.rate[0] == math.inf:
+            return None
+        worst = self.rate[1]
+        lo, hi = self.rate
+        if self.missing_rates:
+            lo, hi = min(lo, worst * 1.1), max(hi, worst * 1.1)
+        return worst, lo, hi
+
+    @staticmethod
+    def scaled(total, n, bounds):
+        """Sum of normalize() over n values whose raw sum is total."""
+        lo, hi = bounds
+        return float(n) if math.isclose(lo, hi) else (total - n * lo) / (hi - lo)
+
+    def reliability(self, f: dict) -> float:
+        kg = self.scaled(f["kg"], 1, self.kg)
+        total = self.scaled(f["total"], 1, self.total)
+        rb = self.rate_bounds()
+        if rb is None:
+            scrap = 0.5
+        else:
+            worst, lo, hi = rb
+            rate = f["scrap_rate"] if f["scrap_rate"] is not None else worst * 1.1
+            scrap = 1.0 - self.scaled(rate, 1, (lo, hi))
+        return REL_W_KG * kg + REL_W_TOTAL * total + REL_W_SCRAP * scrap + REL_W_MATCH * f["match"] + REL_W_COMPLETE * f["completeness"]
+
+    def summary_rows(self) -> list[dict]:
+        rb = self.rate_bounds()
+        rows = []
+        for k, b in self.bins.items():
+            n = b["count"]
+            if rb is None:
+                scrap = 0.5 * n
+            else:
+                worst, lo, hi = rb
+                scrap = n - self.scaled(b["rate"] + b["missing"] * worst * 1.1, n, (lo, hi))
+            support = (
+                REL_W_KG * self.scaled(b["kg"], n, self.kg)
+                + REL_W_TOTAL * self.scaled(b["total"], n, self.total)
+                + REL_W_SCRAP * scrap
+                + REL_W_MATCH * b["match"]
+                + REL_W_COMPLETE * b["complete"]
+            )
+            rows.append(
+                {
+                    "factor_value": k,
+                    "support_score": round(support, 6),
+                    "row_count": n,
+                    "avg_kg": round(b["kg"] / n, 6) if n else 0,
+                    "avg_scrap_rate": round(b["rate"] / b["rates"], 8) if b["rates"] else "",
+                }
+            )
+        return rows
+
+
+def likely_value(likely_pct: float) -> float:
+    # Same rounding as the 'Likely Insulation % Increase' text written by process_sheet
+    return float(f"{likely_pct:.9f}".rstrip("0").rstrip("."))
+
+
+def mark_family(conn, family: str, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Re-mark one family in the store; returns its Factor_Top5_Summary."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS marks (id INTEGER PRIMARY KEY, likely_pct REAL, recommended INTEGER)")
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, top5_label TEXT, reliability REAL)")
+    conn.execute("DELETE FROM temp.marks")
+    conn.execute("DELETE FROM temp.labels")
+    parts = partitions(conn, family)
+
+    # Pass 1: green selection per size key, per-bin sums
+    stats = BinStats()
+    for material, shape in parts:
+        for chunk in partition_chunks(conn, family, material, shape, ROW_COLUMNS, chunk_rows):
+            sheet = chunk.rename(columns=SHEET_COLUMNS).set_index("id")
+            marks = []
+            for _, grp in sheet.groupby("Size Key", sort=False):
+                selected_idx, likely_pct = select_green_row(grp)
+                likely = None if selected_idx is None else likely_value(likely_pct)
+                for row_id in grp.index:
+                    marks.append((int(row_id), likely, int(row_id == selected_idx)))
+            conn.executemany("INSERT INTO temp.marks VALUES (?, ?, ?)", marks)
+            likely_by_id = {m[0]: m[1] for m in marks}
+            for rec in chunk.to_dict("records"):
+                f = row_features(rec, likely_by_id[int(rec["id"])])
+                if f is not None:
+                    stats.add(f)
+    with conn:
+        conn.execute(
+            "UPDATE production_rows SET likely_pct = m.likely_pct, recommended = m.recommended "
+            "FROM temp.marks AS m WHERE production_rows.id = m.id"
+        )
+
+    if not stats.bins:
+        return pd.DataFrame()
+    summary_df, top5 = rank_factor_bins(stats.summary_rows())
+    rank_map = {f: i + 1 for i, f in enumerate(top5)}
+
+    # Pass 2: per-row reliability and top-5 label
+    for material, shape in parts:
+        for chunk in partition_chunks(conn, family, material, shape, ROW_COLUMNS, chunk_rows):
+            labels = []
+            for rec in chunk.to_dict("records"):
+                f = row_features(rec, num(rec["likely_pct"]))
+                if f is None:
+                    labels.append((int(rec["id"]), "", None))
+                    continue
+                rank = rank_map.get(f["factor_bin"])
+                label = f"Top-{rank} ({f['factor_bin']:.2f})" if rank else ""
+                labels.append((int(rec["id"]), label, round(stats.reliability(f), 6)))
+            conn.executemany("INSERT INTO temp.labels VALUES (?, ?, ?)", labels)
+    with conn:
+        conn.execute(
+            "UPDATE production_rows SET top5_label = l.top5_label, reliability = l.reliability "
+            "FROM temp.labels AS l WHERE production_rows.id = l.id"
+        )
+        conn.execute("DELETE FROM factor_summary WHERE family = ?", (family,))
+        conn.executemany(
+            "INSERT INTO factor_summary VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (family, r["factor_value"], r["support_score"], r["row_count"], r["avg_kg"],
+                 None if r["avg_scrap_rate"] == "" else r["avg_scrap_rate"], None if r["rank"] == "" else int(r["rank"]))
+                for r in summary_df.to_dict("records")
+            ],
+        )
+    return summary_df
+
+
+def consolidate_family(conn, family: str, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """{consolidated tab: DataFrame} of green rows, one per size / insulation combo (store columns)."""
+    tabs = {}
+    for material, shape in partitions(conn, family):
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(production_rows)")]
+        parts = []
+        for chunk in partition_chunks(conn, family, material, shape, columns, chunk_rows, where="AND recommended = 1"):
+            sheet = chunk.rename(columns=SHEET_COLUMNS)
+            sheet["Recommended % Marked"] = "Yes"
+            kept = dedupe_green_rows(sheet).drop(columns=["Recommended % Marked"])
+            parts.append(kept.rename(columns={v: k for k, v in SHEET_COLUMNS.items()}))
+        if parts:
+            tabs[sheet_out_name(family, f"{material} {shape}s")] = pd.concat(parts, ignore_index=True)
+    return tabs
+
+
+def top3_bins(conn, family: str) -> list[float]:
+    return [
+        r[0]
+        for r in conn.execute(
+            "SELECT factor_value FROM factor_summary WHERE family = ? ORDER BY support_score DESC LIMIT 3", (family,)
+        )
+    ]
+
+
+def write_consolidated(conn, families: list[str], out_path: Path, chunk_rows: int = CHUNK_ROWS) -> Path:
+    tabs, bins = {}, {}
+    for family in families:
+        for tab, df in consolidate_family(conn, family, chunk_rows).items():
+            tabs[tab] = df
+            bins[tab] = top3_bins(conn, family)
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        for tab, df in tabs.items():
+            df.to_excel(writer, sheet_name=tab, index=False)
+            fill_top3_factor(writer.sheets[tab], bins[tab])
+    return out_path
+
+
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ("--chunk", "--db", "--out"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i : i + 2]
+    chunk_rows = int(opts.get("--chunk", CHUNK_ROWS))
+    conn = connect(Path(opts["--db"]) if "--db" in opts else DB_PATH)
+    families = args or [r[0] for r in conn.execute("SELECT DISTINCT family FROM production_rows ORDER BY family")]
+
+    for family in families:
+        summary = mark_family(conn, family, chunk_rows)
+        top5 = summary.head(5)["factor_value"].round(2).tolist() if not summary.empty else []
+        green = conn.execute(
+            "SELECT COUNT(*), SUM(recommended) FROM production_rows WHERE family = ?", (family,)
+        ).fetchone()
+        print(f"{family}: {green[0]} rows, {green[1] or 0} green, top 5 factors {top5}")
+    if "--out" in opts:
+        print(f"Saved: {write_consolidated(conn, families, Path(opts['--out']), chunk_rows)}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
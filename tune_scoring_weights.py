@@ -0,0 +1,270 @@
+"""
+Weight search for the green-row selection and top-5 factor reliability scores.
+
+Candidates are 8-vectors: selection weights (kg, scrap, match), applied to
+both the green pick (GREEN_W_*) and the reselect pick (WEIGHT_* of
+reselect_likely_insulation_pct), and reliability weights (kg, total, scrap,
+match, complete) as used by REL_W_*. Each family is evaluated in its own process:
+
+  1. per Size Key group, the inlier subset and the three selection scores are
+     precomputed once (same rules as select_green_row);
+  2. selection scores for every candidate are one (rows x 3) @ (3 x m) product,
+     and the winner per group for every candidate comes from one lexsort
+     (green tie-break: kg desc, pct asc; reselect tie-break additionally
+     scrap rate asc and distance to median asc before pct);
+  3. the chosen likely % feeds the reliability match score, reliability is a
+     matrix product, and top-5 bins for all candidates come from bin_support.
+
+Candidate 0 is always the current constants (baseline; its reselect pick
+uses WEIGHT_*). Per family and
+candidate the report has: groups whose green / reselect pick changed, mean
+absolute likely % shift, top-5 bins, overlap with the baseline top 5, and the
+top-1 share of total support.
+
+Usage:
+  python tune_scoring_weights.py grid [step] [out.csv]
+  python tune_scoring_weights.py random [samples] [seed] [out.csv]
+Example: python tune_scoring_weights.py grid 0.25
+"""
+
+import itertools
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from apply_markings_and_top5_factor import (
+    GREEN_W_KG,
+    GREEN_W_MATCH,
+    GREEN_W_SCRAP,
+    build_size_key,
+    normalize,
+    parse_num,
+    pick_inlier_subset,
+)
+from build_phase1_master_workbook import BASE, SOURCE_FILES, SOURCE_SHEETS
+from factor_features import FEATURE_NAMES, REL_WEIGHTS, bin_support, build_reliability_features, factor_bin_index, top_bins
+from reselect_likely_insulation_pct import WEIGHT_KG, WEIGHT_MATCH, WEIGHT_SCRAP
+
+OUT_PATH = BASE / "scoring_weight_search.csv"
+SEL_NAMES = ["sel_kg", "sel_scrap", "sel_match"]
+REL_NAMES = [f"rel_{n}" for n in FEATURE_NAMES]
+DEFAULT_GRID_STEP = 0.25
+DEFAULT_SAMPLES = 200
+DEFAULT_SEED = 7
+
+
+def simplex_grid(dim: int, step: float) -> np.ndarray:
+    """All weight vectors of length dim on the step lattice that sum to 1."""
+    n = int(round(1 / step))
+    points = [c for c in itertools.product(range(n + 1), repeat=dim - 1) if sum(c) <= n]
+    return np.array([list(c) + [n - sum(c)] for c in points], dtype=float) / n
+
+
+def baseline_weights() -> np.ndarray:
+    return np.concatenate([[GREEN_W_KG, GREEN_W_SCRAP, GREEN_W_MATCH], REL_WEIGHTS])
+
+
+def reselect_weights(cands: np.ndarray) -> np.ndarray:
+    """Selection weights for the reselect pick: candidate 0 is reselect's own WEIGHT_*."""
+    weights = cands[:, :3].copy()
+    weights[0] = [WEIGHT_KG, WEIGHT_SCRAP, WEIGHT_MATCH]
+    return weights
+
+
+def candidate_weights(mode: str, arg=None, seed=DEFAULT_SEED) -> np.ndarray:
+    """(m, 8) candidate matrix, row 0 = current constants."""
+    if mode == "grid":
+        step = float(arg) if arg is not None else DEFAULT_GRID_STEP
+        sel, rel = simplex_grid(3, step), simplex_grid(5, step)
+        cands = np.hstack([np.repeat(sel, len(rel), axis=0), np.tile(rel, (len(sel), 1))])
+    elif mode == "random":
+        rng = np.random.default_rng(seed)
+        samples = int(arg) if arg is not None else DEFAULT_SAMPLES
+        cands = np.hstack([rng.dirichlet(np.ones(3), samples), rng.dirichlet(np.ones(5), samples)])
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+    return np.vstack([baseline_weights(), cands])
+
+
+def selection_features(sheets: dict) -> dict:
+    """
+    Inlier rows of every Size Key group with their selection scores.
+    Returns arrays (one entry per inlier row): group, sheet, index, pct, kg,
+    filled_rate, median_dev, scores (n, 3) in SEL_NAMES order; plus
+    row_group {sheet: {index: group}} for every row with a usable pct.
+    """
+    out = {k: [] for k in ["group", "sheet", "index", "pct", "kg", "filled_rate", "median_dev", "scores"]}
+    row_group = {}
+    gid = 0
+    for sheet_name, df in sheets.items():
+        row_group[sheet_name] = {}
+        for _, grp in df.groupby(build_size_key(df), sort=False):
+            rows = []
+            for idx, row in grp.iterrows():
+                pct = parse_num(row.get("Insulation Per %"))
+                if pct is None:
+                    continue
+                kg = (
+                    parse_num(row.get("Actual Bare wt"))
+                    or parse_num(row.get("Final Dis.Qty."))
+                    or parse_num(row.get("Insulation wt kg"))
+                    or 0.0
+                )
+                rows.append({"idx": idx, "pct": pct, "kg": float(kg), "scrap": parse_num(row.get("Scrap"))})
+            if not rows:
+                continue
+            for r in rows:
+                row_group[sheet_name][r["idx"]] = gid
+
+            rows = pick_inlier_subset(rows)
+            pcts = [r["pct"] for r in rows]
+            center = float(pd.Series(pcts).median())
+            p_range = max(pcts) - min(pcts)
+            rates = [None if r["scrap"] is None or r["kg"] <= 0 else r["scrap"] / r["kg"] for r in rows]
+            observed = [x for x in rates if x is not None]
+            if observed:
+                filled = [x if x is not None else max(observed) * 1.1 for x in rates]
+                scrap_scores = [1.0 - x for x in normalize(filled)]
+            else:
+                filled = [999999.0 for _ in rows]
+                scrap_scores = [0.5 for _ in rows]
+            if math.isclose(p_range, 0.0):
+                match_scores = [1.0 for _ in rows]
+            else:
+                match_scores = [max(0.0, 1.0 - abs(p - center) / (p_range / 2.0)) for p in pcts]
+
+            kg_scores = normalize([r["kg"] for r in rows])
+            for i, r in enumerate(rows):
+                out["group"].append(gid)
+                out["sheet"].append(sheet_name)
+                out["index"].append(r["idx"])
+                out["pct"].append(r["pct"])
+                out["kg"].append(r["kg"])
+                out["filled_rate"].append(filled[i])
+                out["median_dev"].append(abs(r["pct"] - center))
+                out["scores"].append((kg_scores[i], scrap_scores[i], match_scores[i]))
+            gid += 1
+
+    arrays = {k: np.asarray(v, dtype=object if k == "sheet" else float) for k, v in out.items()}
+    arrays["group"] = arrays["group"].astype(np.int64)
+    arrays["scores"] = arrays["scores"].reshape(-1, 3)
+    arrays["row_group"] = row_group
+    arrays["n_groups"] = gid
+    return arrays
+
+
+def select_rows(sel: dict, weights: np.ndarray, tiebreak: str) -> np.ndarray:
+    """(groups, m) position of the chosen inlier row for every candidate column."""
+    score = np.round(sel["scores"] @ weights.T, 12)
+    n, m = score.shape
+
+    def wide(a):
+        return np.broadcast_to(a[:, None], (n, m))
+
+    if tiebreak == "green":
+        keys = (wide(sel["pct"]), -wide(sel["kg"]), -score, wide(sel["group"]))
+    else:
+        keys = (wide(sel["pct"]), wide(sel["median_dev"]), wide(sel["filled_rate"]), -wide(sel["kg"]), -score, wide(sel["group"]))
+    order = np.lexsort(keys, axis=0)
+    starts = np.r_[0, np.flatnonzero(np.diff(sel["group"][order[:, 0]])) + 1]
+    return order[starts]
+
+
+def evaluate_family(job) -> pd.DataFrame:
+    """Worker: all candidate metrics for one family workbook."""
+    family, path, cands = job
+    xl = pd.ExcelFile(path)
+    sheets = {s: pd.read_excel(xl, sheet_name=s, dtype=str).fillna("") for s in SOURCE_SHEETS if s in xl.sheet_names}
+    xl.close()
+
+    sel = selection_features(sheets)
+    green = select_rows(sel, cands[:, :3], "green")
+    reselect = select_rows(sel, reselect_weights(cands), "reselect")
+    likely = sel["pct"][green]  # (groups, m)
+
+    feats = build_reliability_features(sheets)
+    groups = np.array(
+        [sel["row_group"][s].get(i, -1) for s, i in zip(feats["sheet"], feats["index"])], dtype=np.int64
+    )
+    row_likely = np.where(groups[:, None] >= 0, likely[np.maximum(groups, 0)], np.nan)
+    base = np.maximum(1.0, np.abs(row_likely) * 0.25)
+    with np.errstate(invalid="ignore"):
+        match = np.where(
+            np.isnan(row_likely), 0.5, np.maximum(0.0, 1.0 - np.abs(feats["pct"][:, None] - row_likely) / base)
+        )
+    j_match = FEATURE_NAMES.index("match")
+    fixed = np.delete(feats["features"], j_match, axis=1)
+    rel_w = cands[:, 3:]
+    reliability = fixed @ np.delete(rel_w, j_match, axis=1).T + match * rel_w[:, j_match][None, :]
+
+    n, m = reliability.shape
+    ids, support, count = bin_support(np.broadcast_to(factor_bin_index(feats["factor"])[:, None], (n, m)), reliability)
+    ranked = top_bins(ids, support, count)
+    base_top5 = {b for b, _, _ in ranked[0]}
+
+    records = []
+    for j in range(m):
+        top = [b for b, _, _ in ranked[j]]
+        rec = {"family": family, "candidate": j}
+        rec.update(dict(zip(SEL_NAMES + REL_NAMES, np.round(cands[j], 4))))
+        rec.update(
+            {
+                "groups": sel["n_groups"],
+                "green_changed": int((green[:, j] != green[:, 0]).sum()),
+                "reselect_changed": int((reselect[:, j] != reselect[:, 0]).sum()),
+                "likely_shift_mean": round(float(np.abs(likely[:, j] - likely[:, 0]).mean()), 6) if len(likely) else 0.0,
+                "top5_overlap": len(base_top5 & set(top)),
+                "top1_same": bool(top and ranked[0] and top[0] == ranked[0][0][0]),
+                "top1_share": round(ranked[j][0][1] / support[j].sum(), 4) if top and support[j].sum() > 0 else 0.0,
+                "top5": " ".join(f"{b:.2f}" for b in top),
+            }
+        )
+        records.append(rec)
+    return pd.DataFrame(records)
+
+
+def main():
+    args = sys.argv[1:]
+    mode = args[0] if args else "grid"
+    if mode == "grid":
+        cands = candidate_weights(mode, args[1] if len(args) > 1 else None)
+        out_path = Path(args[2]) if len(args) > 2 else OUT_PATH
+    else:
+        seed = int(args[2]) if len(args) > 2 else DEFAULT_SEED
+        cands = candidate_weights(mode, args[1] if len(args) > 1 else None, seed)
+        out_path = Path(args[3]) if len(args) > 3 else OUT_PATH
+
+    jobs = []
+    for family, path in SOURCE_FILES:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing source workbook: {path}")
+        jobs.append((family, path, cands))
+
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        report = pd.concat(list(pool.map(evaluate_family, jobs)), ignore_index=True)
+    report.to_csv(out_path, index=False)
+
+    overall = report.groupby("candidate").agg(
+        green_changed=("green_changed", "sum"),
+        reselect_changed=("reselect_changed", "sum"),
+        likely_shift_mean=("likely_shift_mean", "mean"),
+        top5_overlap=("top5_overlap", "mean"),
+        top1_same=("top1_same", "mean"),
+        top1_share=("top1_share", "mean"),
+    )
+    overall = pd.concat([pd.DataFrame(cands, columns=SEL_NAMES + REL_NAMES).round(3), overall], axis=1)
+    print(f"Evaluated {len(cands)} weight vectors x {len(jobs)} families")
+    print(f"Report: {out_path}")
+    print("Baseline (current constants):")
+    print(overall.head(1).to_string())
+    print("Highest mean top-1 share:")
+    print(overall.iloc[1:].sort_values(["top1_share", "top5_overlap"], ascending=False).head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
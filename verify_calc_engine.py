@@ -0,0 +1,310 @@
+"""
+Parity harness for calc_engine.py against src/lib/calculators/engine.ts.
+
+1. Constants: DENSITY, LME, PRODUCTION and INSULATION_TYPES are read from the
+   engine.ts source and compared with the Python tables.
+2. Fixtures: the cases of verify_math.js, docs/math_verification.ts and
+   docs/verify_calculators.ts with their expected values and tolerances.
+3. Batch: random size / material / insulation / covering combinations through
+   the vectorised calculators vs a line-by-line scalar port of engine.ts.
+
+Usage: python verify_calc_engine.py [batch_size] [seed]
+Exit code 1 when any check fails.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import calc_engine as ce
+
+ENGINE_TS = Path(__file__).resolve().parent / "src" / "lib" / "calculators" / "engine.ts"
+DEFAULT_BATCH = 20000
+DEFAULT_SEED = 11
+BATCH_RTOL = 1e-12
+
+# (source, label, calculator, kwargs, {result field: (expected, tolerance)})
+FIXTURES = [
+    ("verify_math.js", "factor test", "factor",
+     dict(width=10, thickness=2, covering=0.5, percentage_increase=5, density=2.709),
+     {"value": (0.43344, 1e-5)}),
+    ("verify_math.js", "strip % increase", "strip",
+     dict(width=10, thickness=2, insulation_thickness=0.5, factor=0.43344, density=2.709, final_wt_reqd=100, qty_per_spool=25),
+     {"percent_increase": (5.00, 0.005)}),
+    ("verify_math.js", "LME copper", "lme",
+     dict(lme=9500, sbi_rate=83.5),
+     {"csp_rate": (857.87, 0.005)}),
+    # math_verification.ts tests 1-2 expect Polyester factors 1.396 / 1.08, which predate
+    # the current engine.ts table (1.40 / 1.30); verify_calculators.ts covers the current values.
+    ("math_verification.ts", "Polyester strip thickness", "thickness",
+     dict(name="Polyester", shape="STRIP"), {"value": (0.50, 1e-9)}),
+    ("math_verification.ts", "Polyester wire thickness", "thickness",
+     dict(name="Polyester", shape="WIRE"), {"value": (0.40, 1e-9)}),
+    ("math_verification.ts", "Poly+DFG dual layer strip (audit math)", "dual_strip",
+     dict(width=10, thickness=3, poly_cov=0.35, dfg_cov=0.50, poly_factor=1.08, dfg_factor=1.45, density=2.709, final_wt_reqd=100, qty_per_spool=25),
+     {"poly_percent": (6.209, 0.001), "dfg_percent": (10.96, 0.001), "weight_after_poly": (90.12, 0.005), "bare_wt_reqd": (84.85, 0.005)}),
+    ("verify_calculators.ts", "strip single layer", "strip",
+     dict(width=10, thickness=2, insulation_thickness=0.5, factor=1.5, density=2.709, final_wt_reqd=100, qty_per_spool=25),
+     {"bare_area": (20, 0.001), "insulated_area": (26.25, 0.001), "percent_increase": (17.304, 0.1), "bare_wt_reqd": (85.255, 0.1), "meters_per_spool": (461.4, 1)}),
+    ("verify_calculators.ts", "wire single layer", "wire",
+     dict(dia=4, insulation_thickness=0.5, factor=1.5, density=2.709, final_wt_reqd=100, qty_per_spool=25),
+     {"bare_area": (12.56, 0.01), "percent_increase": (14.71, 0.1), "bare_wt_reqd": (87.18, 0.1)}),
+    ("verify_calculators.ts", "dual layer, combined factor", "strip",
+     dict(width=10, thickness=2, insulation_thickness=0.85, factor=1.45, density=2.709, final_wt_reqd=100, qty_per_spool=25),
+     {"insulated_area": (10.85 * 2.85, 0.01), "percent_increase": (29.23, 0.1), "bare_wt_reqd": (77.05, 0.5)}),
+    ("verify_calculators.ts", "DFG Alu factor", "factor_preset", dict(name="Dfg 225 yarn", material="ALUMINIUM"), {"value": (1.45, 0.001)}),
+    ("verify_calculators.ts", "DFG Cu factor", "factor_preset", dict(name="Dfg 225 yarn", material="COPPER"), {"value": (1.45, 0.001)}),
+    ("verify_calculators.ts", "Polyester Alu factor", "factor_preset", dict(name="Polyester", material="ALUMINIUM"), {"value": (1.40, 0.001)}),
+    ("verify_calculators.ts", "Polyester Cu factor", "factor_preset", dict(name="Polyester", material="COPPER"), {"value": (1.30, 0.001)}),
+    ("verify_calculators.ts", "Poly+DFG Alu 8 kV", "factor_preset", dict(name="Poly + Dfg 225", material="ALUMINIUM", kv="8 kV"), {"value": (1.45, 0.001)}),
+    ("verify_calculators.ts", "Poly+DFG Alu 18 kV", "factor_preset", dict(name="Poly + Dfg 225", material="ALUMINIUM", kv="18 kV"), {"value": (1.35, 0.001)}),
+    ("verify_calculators.ts", "Poly+DFG Cu 8 kV", "factor_preset", dict(name="Poly + Dfg 225", material="COPPER", kv="8 kV"), {"value": (1.45, 0.001)}),
+    ("verify_calculators.ts", "Poly+Paper Alu", "factor_preset", dict(name="Poly + Paper", material="ALUMINIUM"), {"value": (0.95, 0.001)}),
+    ("verify_calculators.ts", "Poly+Paper Cu", "factor_preset", dict(name="Poly + Paper", material="COPPER"), {"value": (0.95, 0.001)}),
+    ("verify_calculators.ts", "Poly+DFG strip default", "thickness", dict(name="Poly + Dfg 225", shape="STRIP"), {"value": (0.85, 0.001)}),
+    ("verify_calculators.ts", "Polyester strip default", "thickness", dict(name="Polyester", shape="STRIP"), {"value": (0.50, 0.001)}),
+    ("verify_calculators.ts", "Poly+Paper strip default", "thickness", dict(name="Poly + Paper", shape="STRIP"), {"value": (0.50, 0.001)}),
+    ("verify_calculators.ts", "Poly+Paper wire default", "thickness", dict(name="Poly + Paper", shape="WIRE"), {"value": (0.40, 0.001)}),
+    ("verify_calculators.ts", "Enamel strip default", "thickness", dict(name="Enamel", shape="STRIP"), {"value": (0.12, 0.001)}),
+    ("verify_calculators.ts", "factor reverse formula", "factor",
+     dict(width=10, thickness=2, covering=0.5, percentage_increase=10, density=2.709),
+     {"value": ((20 * 2.709 * 10) / ((26.25 - 20) * 100), 0.01)}),
+    ("verify_calculators.ts", "LME copper", "lme",
+     dict(lme=10000, sbi_rate=90),
+     {"lme_plus_premium": (10190, 0.1), "csp_rate": (970.8, 1), "wwmai_rate": (1018.56, 0.5)}),
+]
+
+CALCULATORS = {
+    "strip": ce.calculate_strip_insulation,
+    "wire": ce.calculate_wire_insulation,
+    "dual_strip": ce.calculate_dual_layer_strip_insulation,
+    "dual_wire": ce.calculate_dual_layer_wire_insulation,
+    "lme": ce.calculate_lme_copper,
+    "factor": lambda **kw: {"value": ce.calculate_factor(**kw)},
+    "factor_preset": lambda **kw: {"value": ce.insulation_factor(**kw)},
+    "thickness": lambda **kw: {"value": ce.default_thickness(**kw)},
+}
+
+
+def _js_literal_to_json(text: str):
+    text = re.sub(r"([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)\s*:", r'\1"\2":', text)
+    text = re.sub(r",(\s*[}\]])", r"\1", text)
+    return json.loads(text)
+
+
+def read_ts_constants(path: Path = ENGINE_TS) -> dict:
+    """DENSITY, LME, PRODUCTION and INSULATION_TYPES from the engine.ts CONSTANTS object."""
+    src = path.read_text(encoding="utf-8")
+    out = {}
+    for key in ["DENSITY", "LME", "PRODUCTION"]:
+        block = re.search(rf"\b{key}:\s*(\{{[^}}]*\}})", src).group(1)
+        out[key] = _js_literal_to_json(block)
+    types = re.search(r"INSULATION_TYPES:\s*(\[.*?\])\s*as\s+InsulationType\[\]", src, re.S).group(1)
+    out["INSULATION_TYPES"] = _js_literal_to_json(types)
+    return out
+
+
+def check_constants() -> list[str]:
+    ts = read_ts_constants()
+    failures = []
+    expected = {
+        "DENSITY": {"ALUMINIUM": ce.DENSITY_ALU, "COPPER": ce.DENSITY_CU},
+        "LME": {
+            "PREMIUM": ce.LME_PREMIUM,
+            "MULTIPLIER_CSP": ce.LME_MULTIPLIER_CSP,
+            "MULTIPLIER_WWMAI": ce.LME_MULTIPLIER_WWMAI,
+            "HANDLING_CHARGES": ce.LME_HANDLING_CHARGES,
+        },
+        "PRODUCTION": {"DEFAULT_SPEED_M_HR": ce.PRODUCTION_SPEED_M_HR},
+        "INSULATION_TYPES": ce.INSULATION_TYPES,
+    }
+    for key, py in expected.items():
+        if key == "INSULATION_TYPES":
+            ts_types, py_types = {t["name"]: t for t in ts[key]}, {t["name"]: t for t in py}
+            for name in sorted(set(ts_types) | set(py_types)):
+                if ts_types.get(name) != py_types.get(name):
+                    failures.append(f"constants {key} '{name}': engine.ts {ts_types.get(name)} != calc_engine {py_types.get(name)}")
+        elif ts[key] != py:
+            failures.append(f"constants {key}: engine.ts {ts[key]} != calc_engine {py}")
+    return failures
+
+
+def check_fixtures() -> list[str]:
+    failures = []
+    for source, label, calc, kwargs, expected in FIXTURES:
+        result = CALCULATORS[calc](**kwargs)
+        for field, (want, tol) in expected.items():
+            got = float(result[field])
+            if not abs(got - want) < tol:
+                failures.append(f"{source}: {label}: {field} = {got:.6f}, expected ~{want} (tol {tol})")
+    return failures
+
+
+# Scalar ports of engine.ts, statement for statement (reference for the batch check)
+def _ts_strip(width, thickness, insulationThickness, factor, density, finalWtReqd, qtyPerSpool):
+    bareArea = width * thickness
+    insulatedWidth = width + insulationThickness
+    insulatedThickness = thickness + insulationThickness
+    insulatedArea = insulatedWidth * insulatedThickness
+    weightIncreaseFactor = (insulatedArea - bareArea) * factor * 100 / (bareArea * density)
+    bareWtReqd = (finalWtReqd / (100 + weightIncreaseFactor)) * 100
+    metersPerSpool = (qtyPerSpool * 1000) / (bareArea * density)
+    productionKgHr = (bareArea * density * ce.PRODUCTION_SPEED_M_HR) / 1000
+    return {
+        "bare_area": bareArea, "insulated_area": insulatedArea, "bare_wt_reqd": bareWtReqd,
+        "percent_increase": weightIncreaseFactor, "meters_per_spool": metersPerSpool,
+        "production_kg_hr": productionKgHr, "total_hours_reqd": bareWtReqd / productionKgHr,
+        "covered_width_or_dia": insulatedWidth, "covered_thickness": insulatedThickness,
+    }
+
+
+def _ts_wire(dia, insulationThickness, factor, density, finalWtReqd, qtyPerSpool):
+    bareArea = 0.785 * dia * dia
+    coveredDia = dia + insulationThickness
+    insulatedArea = 0.785 * coveredDia * coveredDia
+    weightIncreaseFactor = (insulatedArea - bareArea) * factor * 100 / (bareArea * density)
+    bareWtReqd = (finalWtReqd / (100 + weightIncreaseFactor)) * 100
+    metersPerSpool = (qtyPerSpool * 1000) / (bareArea * density)
+    productionKgHr = (bareArea * density * ce.PRODUCTION_SPEED_M_HR) / 1000
+    return {
+        "bare_area": bareArea, "insulated_area": insulatedArea, "bare_wt_reqd": bareWtReqd,
+        "percent_increase": weightIncreaseFactor, "meters_per_spool": metersPerSpool,
+        "production_kg_hr": productionKgHr, "total_hours_reqd": bareWtReqd / productionKgHr,
+        "covered_width_or_dia": coveredDia,
+    }
+
+
+def _ts_dual(bareArea, polyArea, dfgArea, polyFactor, dfgFactor, density, finalWtReqd, qtyPerSpool):
+    polyPercent = (polyArea - bareArea) * polyFactor * 100 / (bareArea * density)
+    dfgPercent = (dfgArea - polyArea) * dfgFactor * 100 / (polyArea * density)
+    weightAfterPoly = (finalWtReqd / (100 + dfgPercent)) * 100
+    bareWtReqd = (weightAfterPoly / (100 + polyPercent)) * 100
+    metersPerSpool = (qtyPerSpool * 1000) / (bareArea * density)
+    productionKgHr = (bareArea * density * ce.PRODUCTION_SPEED_M_HR) / 1000
+    return {
+        "bare_area": bareArea, "insulated_area": dfgArea, "bare_wt_reqd": bareWtReqd,
+        "percent_increase": ((finalWtReqd - bareWtReqd) / bareWtReqd) * 100,
+        "meters_per_spool": metersPerSpool, "production_kg_hr": productionKgHr,
+        "total_hours_reqd": bareWtReqd / productionKgHr,
+        "poly_percent": polyPercent, "dfg_percent": dfgPercent, "weight_after_poly": weightAfterPoly,
+    }
+
+
+def _ts_dual_strip(width, thickness, polyCov, dfgCov, polyFactor, dfgFactor, density, finalWtReqd, qtyPerSpool):
+    bareArea = width * thickness
+    polyArea = (width + polyCov) * (thickness + polyCov)
+    dfgArea = (width + polyCov + dfgCov) * (thickness + polyCov + dfgCov)
+    out = _ts_dual(bareArea, polyArea, dfgArea, polyFactor, dfgFactor, density, finalWtReqd, qtyPerSpool)
+    out["covered_width_or_dia"] = width + polyCov + dfgCov
+    out["covered_thickness"] = thickness + polyCov + dfgCov
+    return out
+
+
+def _ts_dual_wire(dia, polyCov, dfgCov, polyFactor, dfgFactor, density, finalWtReqd, qtyPerSpool):
+    bareArea = 0.785 * dia * dia
+    polyArea = 0.785 * (dia + polyCov) * (dia + polyCov)
+    dfgArea = 0.785 * (dia + polyCov + dfgCov) * (dia + polyCov + dfgCov)
+    out = _ts_dual(bareArea, polyArea, dfgArea, polyFactor, dfgFactor, density, finalWtReqd, qtyPerSpool)
+    out["covered_width_or_dia"] = dia + polyCov + dfgCov
+    return out
+
+
+def _ts_factor(width, thickness, covering, percentageIncrease, density):
+    bareArea = width * thickness
+    insulatedArea = (width + covering) * (thickness + covering)
+    return (bareArea * density * percentageIncrease) / ((insulatedArea - bareArea) * 100)
+
+
+def random_batch(n: int, seed: int) -> dict:
+    """n combinations over catalog-like sizes, both materials and every insulation preset."""
+    rng = np.random.default_rng(seed)
+    names = [t["name"] for t in ce.INSULATION_TYPES]
+    materials = rng.choice(list(ce.MATERIAL_DENSITY), n)
+    shapes = rng.choice(["STRIP", "WIRE"], n)
+    type_names = rng.choice(names, n)
+    kvs = [rng.choice(["8 kV", "18 kV"]) if ce.INSULATION_BY_NAME[t].get("kVOptions") else None for t in type_names]
+    factor, density, covering = ce.resolve_presets(type_names, materials, shapes, kvs)
+    return {
+        "width": np.round(rng.uniform(4.0, 20.0, n), 2),
+        "thickness": np.round(rng.uniform(0.9, 6.25, n), 2),
+        "dia": np.round(rng.uniform(1.0, 10.0, n), 2),
+        "covering": covering + np.round(rng.uniform(-0.05, 0.25, n), 2),
+        "poly_cov": np.round(rng.uniform(0.05, 0.5, n), 2),
+        "dfg_cov": np.round(rng.uniform(0.2, 0.8, n), 2),
+        "factor": factor,
+        "dfg_factor": np.round(rng.uniform(0.7, 1.95, n), 2),
+        "density": density,
+        "pct": np.round(rng.uniform(1.0, 60.0, n), 3),
+        "final_wt": np.round(rng.uniform(10.0, 2000.0, n), 1),
+        "qty": np.round(rng.uniform(5.0, 50.0, n), 1),
+    }
+
+
+def check_batch(n: int = DEFAULT_BATCH, seed: int = DEFAULT_SEED) -> list[str]:
+    b = random_batch(n, seed)
+    runs = {
+        "calculateStripInsulation": (
+            ce.calculate_strip_insulation(b["width"], b["thickness"], b["covering"], b["factor"], b["density"], b["final_wt"], b["qty"]),
+            lambda i: _ts_strip(b["width"][i], b["thickness"][i], b["covering"][i], b["factor"][i], b["density"][i], b["final_wt"][i], b["qty"][i]),
+        ),
+        "calculateWireInsulation": (
+            ce.calculate_wire_insulation(b["dia"], b["covering"], b["factor"], b["density"], b["final_wt"], b["qty"]),
+            lambda i: _ts_wire(b["dia"][i], b["covering"][i], b["factor"][i], b["density"][i], b["final_wt"][i], b["qty"][i]),
+        ),
+        "calculateDualLayerStripInsulation": (
+            ce.calculate_dual_layer_strip_insulation(
+                b["width"], b["thickness"], b["poly_cov"], b["dfg_cov"], b["factor"], b["dfg_factor"], b["density"], b["final_wt"], b["qty"]
+            ),
+            lambda i: _ts_dual_strip(
+                b["width"][i], b["thickness"][i], b["poly_cov"][i], b["dfg_cov"][i], b["factor"][i], b["dfg_factor"][i],
+                b["density"][i], b["final_wt"][i], b["qty"][i],
+            ),
+        ),
+        "calculateDualLayerWireInsulation": (
+            ce.calculate_dual_layer_wire_insulation(
+                b["dia"], b["poly_cov"], b["dfg_cov"], b["factor"], b["dfg_factor"], b["density"], b["final_wt"], b["qty"]
+            ),
+            lambda i: _ts_dual_wire(
+                b["dia"][i], b["poly_cov"][i], b["dfg_cov"][i], b["factor"][i], b["dfg_factor"][i], b["density"][i], b["final_wt"][i], b["qty"][i]
+            ),
+        ),
+        "calculateFactor": (
+            {"value": ce.calculate_factor(b["width"], b["thickness"], b["covering"], b["pct"], b["density"])},
+            lambda i: {"value": _ts_factor(b["width"][i], b["thickness"][i], b["covering"][i], b["pct"][i], b["density"][i])},
+        ),
+    }
+
+    failures = []
+    for name, (batch, scalar) in runs.items():
+        reference = [scalar(i) for i in range(n)]
+        for field, values in batch.items():
+            expected = np.array([r[field] for r in reference])
+            if not np.allclose(values, expected, rtol=BATCH_RTOL, atol=0.0):
+                worst = int(np.nanargmax(np.abs(values - expected) / np.abs(expected)))
+                failures.append(f"batch {name}.{field}: row {worst} {values[worst]!r} != {expected[worst]!r}")
+        print(f"  {name}: {n} rows x {len(batch)} fields")
+    return failures
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BATCH
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SEED
+
+    print(f"Constants vs {ENGINE_TS.name}")
+    failures = check_constants()
+    print(f"Fixtures ({len(FIXTURES)} cases)")
+    failures += check_fixtures()
+    print(f"Batch ({n} combinations, seed {seed})")
+    failures += check_batch(n, seed)
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print(f"\n{'FAILED' if failures else 'PASSED'}: {len(failures)} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
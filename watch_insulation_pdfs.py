@@ -0,0 +1,184 @@
+"""
+Watch the project folder and run the insulation pipeline for new or changed PDFs.
+
+- Polls the folder every POLL_SECONDS (stdlib only, works on Windows shares).
+- Debounce: a PDF is queued only when its size and mtime are unchanged between
+  two polls and it has not been modified for SETTLE_SECONDS (partial copies
+  are never picked up).
+- Prefix comes from PDF_PREFIXES (same table as the SOP, section 3.1);
+  unknown PDFs are reported once and ignored.
+- Jobs run in a bounded process pool whose workers import the pipeline once
+  (pandas, pdfplumber, openpyxl stay warm), at most one job per prefix.
+- State (last processed size/mtime, status, output) is kept in STATE_PATH so
+  restarts do not re-run unchanged PDFs.
+
+Usage: python watch_insulation_pdfs.py [folder] [--once] [--skip-existing]
+  --once           process settled PDFs once and exit
+  --skip-existing  record PDFs already present as processed without running
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from build_phase1_master_workbook import BASE
+
+STATE_PATH = BASE / "pdf_watch_state.json"
+POLL_SECONDS = 2.0
+SETTLE_SECONDS = 3.0
+MAX_WORKERS = 2
+
+# SOP 3.1 Insulation Type Mapping (file name, lower case) -> pipeline prefix
+PDF_PREFIXES = {
+    "dfg data.pdf": "DFG",
+    "poly data.pdf": "Poly",
+    "poly cotton.pdf": "PolyCotton",
+    "polydfg data.pdf": "PolyDFG",
+    "poly paper or paper data.pdf": "PolyPaper",
+    "enamel dfg.pdf": "EnamelDFG",
+    "cotton data.pdf": "Cotton",
+}
+
+
+def prefix_for(path: Path) -> str | None:
+    return PDF_PREFIXES.get(path.name.strip().lower())
+
+
+def signature(path: Path):
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def load_state(path: Path = STATE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state: dict, path: Path = STATE_PATH):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _warm_worker():
+    """Pool initializer: pay the heavy imports once per worker process."""
+    import run_insulation_pipeline  # noqa: F401
+    import apply_markings_and_top5_factor  # noqa: F401
+    import production_store  # noqa: F401
+
+
+def _run_job(pdf_path: str, prefix: str) -> dict:
+    from run_insulation_pipeline import run_pipeline
+
+    t0 = time.perf_counter()
+    out_path = run_pipeline(pdf_path, prefix)
+    return {"output": str(out_path) if out_path else "", "seconds": round(time.perf_counter() - t0, 2)}
+
+
+class PdfWatcher:
+    def __init__(self, folder: Path = BASE, state_path: Path | None = None, workers: int = MAX_WORKERS):
+        self.folder = Path(folder)
+        self.state_path = state_path or self.folder / STATE_PATH.name
+        self.state = load_state(self.state_path)
+        self.workers = workers
+        self.seen = {}  # name -> signature at previous poll
+        self.unknown = set()
+        self.running = {}  # prefix -> (future, name, signature)
+
+    def scan(self) -> list[Path]:
+        """PDFs that are settled and differ from their last processed signature."""
+        now = time.time()
+        ready = []
+        current = {}
+        for entry in os.scandir(self.folder):
+            if not entry.is_file() or not entry.name.lower().endswith(".pdf"):
+                continue
+            path = Path(entry.path)
+            if prefix_for(path) is None:
+                if entry.name not in self.unknown:
+                    self.unknown.add(entry.name)
+                    print(f"[watch] no prefix mapping for {entry.name}, ignoring")
+                continue
+            try:
+                sig = signature(path)
+            except OSError:
+                continue
+            current[entry.name] = sig
+            done = self.state.get(entry.name, {})
+            if [done.get("size"), done.get("mtime_ns")] == list(sig):
+                continue
+            if self.seen.get(entry.name) == sig and now - sig[1] / 1e9 >= SETTLE_SECONDS:
+                ready.append(path)
+        self.seen = current
+        return ready
+
+    def mark_existing(self):
+        for path in self.folder.glob("*.pdf"):
+            if prefix_for(path) is not None and path.name not in self.state:
+                size, mtime_ns = signature(path)
+                self.state[path.name] = {"size": size, "mtime_ns": mtime_ns, "status": "skipped"}
+        save_state(self.state, self.state_path)
+
+    def submit(self, pool, path: Path):
+        prefix = prefix_for(path)
+        if prefix in self.running:
+            return
+        print(f"[watch] {path.name} -> {prefix}")
+        self.running[prefix] = (pool.submit(_run_job, str(path), prefix), path.name, signature(path))
+
+    def collect(self):
+        for prefix, (future, name, sig) in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[prefix]
+            rec = {"size": sig[0], "mtime_ns": sig[1], "prefix": prefix, "finished": datetime.now().isoformat(timespec="seconds")}
+            try:
+                rec.update(future.result(), status="ok")
+                print(f"[watch] {name}: {rec['output']} in {rec['seconds']}s")
+            except Exception as exc:  # keep watching; record the failure for this signature
+                rec.update(status="error", error=f"{type(exc).__name__}: {exc}")
+                print(f"[watch] {name}: FAILED {rec['error']}")
+            self.state[name] = rec
+            save_state(self.state, self.state_path)
+
+    def run(self, once: bool = False):
+        print(f"[watch] {self.folder} every {POLL_SECONDS}s, {self.workers} workers")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker) as pool:
+            while True:
+                for path in self.scan():
+                    self.submit(pool, path)
+                self.collect()
+                if once and not self.running and not self.scan_pending():
+                    break
+                time.sleep(POLL_SECONDS)
+
+    def scan_pending(self) -> bool:
+        """True while some mapped PDF is still unsettled or waiting for its prefix slot."""
+        for name, sig in self.seen.items():
+            done = self.state.get(name, {})
+            if [done.get("size"), done.get("mtime_ns")] != list(sig):
+                return True
+        return False
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    folder = Path(args[0]) if args else BASE
+    watcher = PdfWatcher(folder)
+    if "--skip-existing" in sys.argv:
+        watcher.mark_existing()
+    try:
+        watcher.run(once="--once" in sys.argv)
+    except KeyboardInterrupt:
+        print("[watch] stopped")
+
+
+if __name__ == "__main__":
+    main()